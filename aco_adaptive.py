@@ -0,0 +1,88 @@
+import math
+from aco_convergence import pheromone_entropy
+
+
+class AdaptiveController:
+    """
+    Ajuste online de alpha, beta e rho a cada iteração.
+
+    Mede a diversidade (entropia normalizada dos feromônios, ver
+    aco_convergence) e a melhora relativa do melhor custo nas últimas
+    `window` iterações. Enquanto há melhora os parâmetros voltam devagar
+    aos valores iniciais; sem melhora:
+
+    - diversidade baixa (colônia convergindo cedo): reduz alpha e rho e
+      aumenta beta, para dar mais peso à heurística e explorar;
+    - diversidade alta (busca ainda espalhada): aumenta alpha e rho, para
+      intensificar em torno das melhores rotas.
+
+    Os valores ficam limitados aos intervalos informados.
+    """
+
+    def __init__(self, alpha_range=(0.5, 3.0), beta_range=(1.0, 6.0), rho_range=(0.05, 0.9),
+                 window=3, low_diversity=0.5, high_diversity=0.85, step=0.1, min_improvement=1e-3):
+        self.alpha_range = alpha_range
+        self.beta_range = beta_range
+        self.rho_range = rho_range
+        self.window = window
+        self.low_diversity = low_diversity
+        self.high_diversity = high_diversity
+        self.step = step
+        self.min_improvement = min_improvement
+
+        self.initial = None
+        self.best_costs = []
+        self.last_diversity = None
+
+    def state(self):
+        """Histórico necessário para continuar o ajuste após um checkpoint (ver ACOMaster.snapshot)"""
+        return {
+            "initial": list(self.initial) if self.initial is not None else None,
+            # Só as últimas window + 1 entradas são comparadas
+            "best_costs": self.best_costs[-(self.window + 1):],
+            "last_diversity": self.last_diversity,
+        }
+
+    def load_state(self, state):
+        self.initial = tuple(state["initial"]) if state.get("initial") is not None else None
+        self.best_costs = list(state.get("best_costs", []))
+        self.last_diversity = state.get("last_diversity")
+
+    def _clip(self, value, bounds):
+        return min(max(value, bounds[0]), bounds[1])
+
+    def _relax(self, current, initial):
+        return current + self.step * (initial - current)
+
+    def update(self, master):
+        """Ajusta master.alpha, master.beta e master.rho; devolve a ação tomada (ou None)"""
+        if self.initial is None:
+            self.initial = (master.alpha, master.beta, master.rho)
+
+        self.best_costs.append(master.best_cost)
+        if len(self.best_costs) <= self.window or not math.isfinite(master.best_cost):
+            return None
+
+        before = self.best_costs[-1 - self.window]
+        improvement = (before - master.best_cost) / before if math.isfinite(before) and before > 0 else 1.0
+        self.last_diversity = pheromone_entropy(master.pheromone)
+
+        if improvement > self.min_improvement:
+            alpha0, beta0, rho0 = self.initial
+            master.alpha = self._relax(master.alpha, alpha0)
+            master.beta = self._relax(master.beta, beta0)
+            master.rho = self._relax(master.rho, rho0)
+            return "melhorando"
+
+        if self.last_diversity < self.low_diversity:
+            master.alpha = self._clip(master.alpha * (1 - self.step), self.alpha_range)
+            master.beta = self._clip(master.beta * (1 + self.step), self.beta_range)
+            master.rho = self._clip(master.rho * (1 - self.step), self.rho_range)
+            return "explorar"
+
+        if self.last_diversity > self.high_diversity:
+            master.alpha = self._clip(master.alpha * (1 + self.step), self.alpha_range)
+            master.rho = self._clip(master.rho * (1 + self.step), self.rho_range)
+            return "intensificar"
+
+        return None
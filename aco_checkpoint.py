@@ -0,0 +1,110 @@
+import os
+import json
+import queue
+import logging
+import threading
+import numpy as np
+
+
+log = logging.getLogger("aco.checkpoint")
+
+
+def save_snapshot(file_path, snapshot):
+    """
+    Grava um snapshot binário (.npz) do estado do mestre.
+
+    A escrita é atômica: grava em um arquivo temporário e depois renomeia,
+    assim um crash no meio da escrita nunca corrompe o último checkpoint válido.
+    """
+    directory = os.path.dirname(file_path)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory)
+
+    tmp_path = file_path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        np.savez(
+            f,
+            pheromone=np.asarray(snapshot["pheromone"], dtype=np.float64),
+            best_path=np.asarray(snapshot["best_path"] or [], dtype=np.int32),
+            best_cost=np.float64(snapshot["best_cost"]),
+            best_timestamp=np.int64(snapshot["best_timestamp"]),
+            iteration=np.int64(snapshot["iteration"]),
+            lamport_time=np.int64(snapshot["lamport_time"]),
+            # Parâmetros atuais e estado da estratégia e do ajuste adaptativo, em JSON
+            state=np.str_(json.dumps(snapshot.get("state", {}))),
+        )
+    os.replace(tmp_path, file_path)
+
+
+def load_snapshot(file_path):
+    """Lê um snapshot gravado por save_snapshot e devolve um dicionário"""
+    with np.load(file_path) as data:
+        best_path = data["best_path"].tolist()
+        return {
+            "pheromone": data["pheromone"],
+            "best_path": best_path if best_path else None,
+            "best_cost": float(data["best_cost"]),
+            "best_timestamp": int(data["best_timestamp"]),
+            "iteration": int(data["iteration"]),
+            "lamport_time": int(data["lamport_time"]),
+            # Checkpoints antigos não têm o estado da estratégia/ajuste
+            "state": json.loads(str(data["state"])) if "state" in data else {},
+        }
+
+
+def resize_pheromone(pheromone, n):
+    """
+    Adapta uma matriz de feromônios de outro grafo para n nós (warm start).
+
+    O bloco em comum é copiado; linhas/colunas novas recebem a média da
+    matriz original, para não favorecer nem penalizar os nós novos.
+    """
+    source = np.asarray(pheromone, dtype=np.float64)
+    m = min(source.shape[0], n)
+    fill = float(source.mean()) if source.size else 1.0
+
+    resized = np.full((n, n), fill, dtype=np.float64)
+    resized[:m, :m] = source[:m, :m]
+    return resized.tolist()
+
+
+class CheckpointWriter:
+    """
+    Grava checkpoints em uma thread de fundo para não travar a coordenação.
+
+    A fila guarda no máximo um snapshot pendente: se a escrita anterior ainda
+    não terminou, o snapshot antigo é descartado e só o mais recente é gravado.
+    """
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.queue = queue.Queue(maxsize=1)
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def submit(self, snapshot):
+        """Agenda a escrita de um snapshot (substitui um pendente, se houver)"""
+        while True:
+            try:
+                self.queue.put_nowait(snapshot)
+                return
+            except queue.Full:
+                try:
+                    self.queue.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def _run(self):
+        while True:
+            snapshot = self.queue.get()
+            if snapshot is None:
+                break
+            try:
+                save_snapshot(self.file_path, snapshot)
+            except OSError as e:
+                log.error("[Checkpoint] ERRO ao gravar '%s': %s", self.file_path, e)
+
+    def close(self):
+        """Grava o que estiver pendente e encerra a thread"""
+        self.queue.put(None)
+        self.thread.join()
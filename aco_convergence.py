@@ -0,0 +1,107 @@
+import math
+import numpy as np
+
+
+def pheromone_entropy(pheromone):
+    """
+    Entropia média normalizada das linhas da matriz de feromônios, em [0, 1].
+
+    Cada linha (sem a diagonal) vira uma distribuição tau_ij / soma; 1 é a
+    matriz uniforme e valores perto de 0 indicam que quase todo o feromônio
+    está em uma ou duas arestas por nó, isto é, colapsou em uma rota.
+    Custa uma passada O(n^2) em NumPy.
+    """
+    tau = np.asarray(pheromone, dtype=np.float64)
+    n = tau.shape[0]
+    if n < 3:
+        return 0.0
+    rows = tau[~np.eye(n, dtype=bool)].reshape(n, n - 1)
+    totals = rows.sum(axis=1, keepdims=True)
+    p = np.divide(rows, totals, out=np.zeros_like(rows), where=totals > 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        terms = np.where(p > 0, p * np.log(p), 0.0)
+    return float(np.mean(-terms.sum(axis=1)) / np.log(n - 1))
+
+
+class StoppingCriteria:
+    """
+    Critérios de parada antecipada avaliados ao fim de cada iteração.
+
+    Todos são opcionais (None/0 = desligado): janela de estagnação do melhor
+    custo, custo alvo, orçamento de tempo de parede e limiar de entropia
+    dos feromônios. `check` devolve o motivo da parada ou None.
+    """
+
+    def __init__(self, stagnation=0, target_cost=None, time_budget=None,
+                 entropy_threshold=None):
+        self.stagnation = stagnation
+        self.target_cost = target_cost
+        self.time_budget = time_budget
+        self.entropy_threshold = entropy_threshold
+
+        self.best_cost = math.inf
+        self.stagnant_iterations = 0
+        self.last_entropy = None
+
+    @property
+    def enabled(self):
+        return bool(self.stagnation or self.target_cost is not None
+                    or self.time_budget or self.entropy_threshold)
+
+    def check(self, best_cost, elapsed, pheromone=None):
+        if best_cost < self.best_cost:
+            self.best_cost = best_cost
+            self.stagnant_iterations = 0
+        else:
+            self.stagnant_iterations += 1
+
+        if self.target_cost is not None and best_cost <= self.target_cost:
+            return f"custo alvo {self.target_cost:.2f} atingido"
+
+        if self.stagnation and self.stagnant_iterations >= self.stagnation:
+            return f"{self.stagnant_iterations} iterações sem melhora"
+
+        if self.time_budget and elapsed >= self.time_budget:
+            return f"orçamento de tempo de {self.time_budget:.1f}s esgotado"
+
+        if self.entropy_threshold and pheromone is not None:
+            self.last_entropy = pheromone_entropy(pheromone)
+            if self.last_entropy <= self.entropy_threshold:
+                return f"feromônios convergiram (entropia {self.last_entropy:.3f})"
+
+        return None
+
+    def describe(self):
+        parts = []
+        if self.stagnation:
+            parts.append(f"estagnação={self.stagnation}")
+        if self.target_cost is not None:
+            parts.append(f"alvo={self.target_cost}")
+        if self.time_budget:
+            parts.append(f"tempo={self.time_budget}s")
+        if self.entropy_threshold:
+            parts.append(f"entropia<={self.entropy_threshold}")
+        return ", ".join(parts) if parts else "nenhum"
+
+
+def add_stopping_arguments(parser):
+    """Opções de linha de comando dos critérios de parada antecipada"""
+    parser.add_argument('--stagnation', type=int, default=0,
+                        help='Para após N iterações sem melhorar o melhor custo (padrão: 0 = desabilitado)')
+    parser.add_argument('--target-cost', type=float, default=None,
+                        help='Para quando o melhor custo atingir este valor (padrão: desabilitado)')
+    parser.add_argument('--time-budget', type=float, default=None,
+                        help='Para após este tempo de execução, em segundos (padrão: desabilitado)')
+    parser.add_argument('--entropy-threshold', type=float, default=None,
+                        help='Para quando a entropia normalizada dos feromônios (0 a 1) cair até este valor '
+                             '(ex.: 0.3; padrão: desabilitado)')
+
+
+def stopping_criteria(args):
+    """Cria StoppingCriteria a partir de um argparse.Namespace"""
+    return StoppingCriteria(
+        stagnation=args.stagnation,
+        target_cost=args.target_cost,
+        time_budget=args.time_budget,
+        entropy_threshold=args.entropy_threshold,
+    )
@@ -0,0 +1,302 @@
+import math
+import random
+from bisect import bisect_right
+from itertools import accumulate
+from aco_sparse import CSRGraph, run_ant_sparse, run_ant_acs_sparse
+
+# O NumPy é importado dentro das funções que o usam: o motor python sem semente
+# não precisa dele, e o worker chega mais rápido à primeira formiga
+
+
+def seeded_rng(seed, *stream):
+    """
+    Gerador `random.Random` de um fluxo independente da execução `seed`.
+
+    O fluxo é identificado por inteiros não negativos, por exemplo
+    (worker, iteração, formiga), e derivado com SeedSequence: fluxos
+    diferentes não se sobrepõem e a mesma chave sempre gera a mesma
+    sequência, independente da ordem em que os fluxos são criados.
+    """
+    import numpy as np
+
+    state = np.random.SeedSequence(seed, spawn_key=stream).generate_state(4)
+    return random.Random(int.from_bytes(state.tobytes(), "little"))
+
+
+def _weights(pheromone, distance_matrix, current, neighbors, alpha, beta, eta):
+    """tau^alpha * eta^beta de cada vizinho; com `eta` (ver heuristic_matrix) sem nenhum pow quando alpha == 1"""
+    tau = pheromone[current]
+    if eta is None:
+        distances = distance_matrix[current]
+        return [tau[j] ** alpha * (1.0 / distances[j]) ** beta for j in neighbors]
+    heuristic = eta[current]
+    if alpha == 1:
+        return [tau[j] * heuristic[j] for j in neighbors]
+    return [tau[j] ** alpha * heuristic[j] for j in neighbors]
+
+
+def _weights_numpy(pheromone, row, current, neighbors, alpha, beta, eta):
+    """Mesmo que _weights, vetorizado"""
+    tau = pheromone[current, neighbors]
+    if alpha != 1:
+        tau = tau ** alpha
+    if eta is None:
+        return tau * (1.0 / row[neighbors]) ** beta
+    return tau * eta[current, neighbors]
+
+
+def run_ant(pheromone, distance_matrix, n, alpha, beta, start_node, rng=random, eta=None):
+    """
+    Constrói uma rota com a regra proporcional do Ant System (Python puro).
+
+    `pheromone` e `distance_matrix` são listas de listas n x n; `rng` é o
+    gerador usado nas escolhas (o módulo `random` ou um `random.Random`,
+    ver seeded_rng) e `eta`, opcional, o termo heurístico já calculado
+    (ver heuristic_matrix). Devolve (caminho, custo); se a formiga ficar sem
+    vizinhos, ou o último nó não tiver aresta de volta ao início, a rota
+    é inviável e o custo é infinito.
+    """
+    visited = [start_node]
+    total_cost = 0
+    current = start_node
+
+    while len(visited) < n:
+        neighbors = []
+        for j in range(n):
+            if j != current and j not in visited and distance_matrix[current][j] > 0:
+                neighbors.append(j)
+
+        if not neighbors:
+            break
+
+        probs = _weights(pheromone, distance_matrix, current, neighbors, alpha, beta, eta)
+
+        # Roleta: mesma soma acumulada e mesmo sorteio do motor NumPy
+        cumulative = list(accumulate(probs))
+        total = cumulative[-1]
+        if total == 0:
+            next_node = neighbors[rng.randrange(len(neighbors))]
+        else:
+            pick = bisect_right(cumulative, rng.random() * total)
+            next_node = neighbors[min(pick, len(neighbors) - 1)]
+
+        visited.append(next_node)
+        total_cost += distance_matrix[current][next_node]
+        current = next_node
+
+    # Beco sem saída ou sem aresta de volta ao início: rota inviável, nunca é a melhor
+    if len(visited) < n or distance_matrix[current][start_node] <= 0:
+        return visited, math.inf
+    total_cost += distance_matrix[current][start_node]
+
+    return visited, total_cost
+
+
+def run_ant_numpy(pheromone, distance_matrix, n, alpha, beta, start_node, rng=random, eta=None):
+    """
+    Mesma regra de run_ant, vetorizada com NumPy a cada passo.
+
+    `pheromone` e `distance_matrix` são np.ndarray n x n (ver prepare_matrix).
+    Compensa a partir de algumas dezenas de nós; para grafos pequenos o
+    overhead das chamadas NumPy é maior que o laço em Python puro.
+    """
+    import numpy as np
+
+    unvisited = np.ones(n, dtype=bool)
+    unvisited[start_node] = False
+    visited = [start_node]
+    total_cost = 0.0
+    current = start_node
+
+    for _ in range(n - 1):
+        row = distance_matrix[current]
+        neighbors = np.flatnonzero(unvisited & (row > 0))
+
+        if neighbors.size == 0:
+            break
+
+        weights = _weights_numpy(pheromone, row, current, neighbors, alpha, beta, eta)
+        cumulative = np.cumsum(weights)
+        total = cumulative[-1]
+
+        if total == 0:
+            next_node = int(neighbors[rng.randrange(neighbors.size)])
+        else:
+            pick = int(np.searchsorted(cumulative, rng.random() * total, side='right'))
+            next_node = int(neighbors[min(pick, neighbors.size - 1)])
+
+        unvisited[next_node] = False
+        visited.append(next_node)
+        total_cost += row[next_node]
+        current = next_node
+
+    # Beco sem saída ou sem aresta de volta ao início: rota inviável, nunca é a melhor
+    if len(visited) < n or distance_matrix[current][start_node] <= 0:
+        return visited, math.inf
+    total_cost += distance_matrix[current][start_node]
+
+    return visited, float(total_cost)
+
+
+def run_ant_acs(pheromone, distance_matrix, n, alpha, beta, start_node, q0=0.9, local_rho=0.1, tau0=1.0,
+                rng=random, eta=None):
+    """
+    Constrói uma rota com a regra do Ant Colony System (Python puro).
+
+    Com probabilidade q0 escolhe a aresta de maior tau^alpha * eta^beta
+    (exploitation); senão usa a regra proporcional do AS. Cada aresta
+    percorrida sofre a atualização local tau = (1 - local_rho) * tau +
+    local_rho * tau0, por isso `pheromone` é modificada no lugar e deve
+    ser uma cópia privada do worker.
+    """
+    visited = [start_node]
+    total_cost = 0
+    current = start_node
+
+    while len(visited) < n:
+        neighbors = []
+        for j in range(n):
+            if j != current and j not in visited and distance_matrix[current][j] > 0:
+                neighbors.append(j)
+
+        if not neighbors:
+            break
+
+        probs = _weights(pheromone, distance_matrix, current, neighbors, alpha, beta, eta)
+
+        cumulative = list(accumulate(probs))
+        total = cumulative[-1]
+        if total == 0:
+            next_node = neighbors[rng.randrange(len(neighbors))]
+        elif rng.random() < q0:
+            next_node = neighbors[max(range(len(probs)), key=probs.__getitem__)]
+        else:
+            pick = bisect_right(cumulative, rng.random() * total)
+            next_node = neighbors[min(pick, len(neighbors) - 1)]
+
+        # Atualização local (grafo simétrico)
+        decayed = (1 - local_rho) * pheromone[current][next_node] + local_rho * tau0
+        pheromone[current][next_node] = decayed
+        pheromone[next_node][current] = decayed
+
+        visited.append(next_node)
+        total_cost += distance_matrix[current][next_node]
+        current = next_node
+
+    # Beco sem saída ou sem aresta de volta ao início: rota inviável, nunca é a melhor
+    if len(visited) < n or distance_matrix[current][start_node] <= 0:
+        return visited, math.inf
+    total_cost += distance_matrix[current][start_node]
+
+    return visited, total_cost
+
+
+def run_ant_acs_numpy(pheromone, distance_matrix, n, alpha, beta, start_node, q0=0.9, local_rho=0.1, tau0=1.0,
+                      rng=random, eta=None):
+    """Mesma regra de run_ant_acs, vetorizada com NumPy (ver run_ant_numpy)"""
+    import numpy as np
+
+    unvisited = np.ones(n, dtype=bool)
+    unvisited[start_node] = False
+    visited = [start_node]
+    total_cost = 0.0
+    current = start_node
+
+    for _ in range(n - 1):
+        row = distance_matrix[current]
+        neighbors = np.flatnonzero(unvisited & (row > 0))
+
+        if neighbors.size == 0:
+            break
+
+        weights = _weights_numpy(pheromone, row, current, neighbors, alpha, beta, eta)
+        cumulative = np.cumsum(weights)
+        total = cumulative[-1]
+
+        if total == 0:
+            next_node = int(neighbors[rng.randrange(neighbors.size)])
+        elif rng.random() < q0:
+            next_node = int(neighbors[int(np.argmax(weights))])
+        else:
+            pick = int(np.searchsorted(cumulative, rng.random() * total, side='right'))
+            next_node = int(neighbors[min(pick, neighbors.size - 1)])
+
+        decayed = (1 - local_rho) * pheromone[current, next_node] + local_rho * tau0
+        pheromone[current, next_node] = decayed
+        pheromone[next_node, current] = decayed
+
+        unvisited[next_node] = False
+        visited.append(next_node)
+        total_cost += row[next_node]
+        current = next_node
+
+    # Beco sem saída ou sem aresta de volta ao início: rota inviável, nunca é a melhor
+    if len(visited) < n or distance_matrix[current][start_node] <= 0:
+        return visited, math.inf
+    total_cost += distance_matrix[current][start_node]
+
+    return visited, float(total_cost)
+
+
+# Motores de construção disponíveis: nome -> (função, formato da matriz)
+ENGINES = {
+    "python": (run_ant, "list"),
+    "numpy": (run_ant_numpy, "array"),
+    # Distâncias em CSRGraph (só as arestas existentes); feromônio em listas
+    "sparse": (run_ant_sparse, "list"),
+}
+
+# Regra do Ant Colony System para cada motor (mesmo formato de matriz)
+ACS_ENGINES = {
+    "python": run_ant_acs,
+    "numpy": run_ant_acs_numpy,
+    "sparse": run_ant_acs_sparse,
+}
+
+
+def prepare_matrix(engine, flat_values, n):
+    """Converte uma matriz achatada (protobuf) no formato que o motor espera"""
+    if ENGINES[engine][1] == "array":
+        import numpy as np
+        return np.asarray(flat_values, dtype=np.float64).reshape(n, n)
+    return [[flat_values[i * n + j] for j in range(n)] for i in range(n)]
+
+
+def empty_matrix(engine, n):
+    """Matriz n x n ainda sem valores no formato do motor, preenchida linha a linha (ver utils_grpc.receive_matrix)"""
+    if ENGINES[engine][1] == "array":
+        import numpy as np
+        return np.empty((n, n), dtype=np.float64)
+    return [None] * n
+
+
+def prepare_distance(engine, flat_values, n):
+    """Como prepare_matrix, mas para a matriz de distâncias: no motor sparse vira um CSRGraph"""
+    if engine == "sparse":
+        return CSRGraph.from_flat(flat_values, n)
+    return prepare_matrix(engine, flat_values, n)
+
+
+def empty_distance(engine, n):
+    """Como empty_matrix, para a matriz de distâncias recebida por streaming"""
+    if engine == "sparse":
+        return CSRGraph(n)
+    return empty_matrix(engine, n)
+
+
+def heuristic_matrix(engine, distance, beta):
+    """
+    Termo heurístico eta^beta = (1 / d)^beta de todas as arestas, no formato
+    do motor (0 onde não há aresta). Só depende do grafo e de beta: o
+    worker calcula uma vez e passa como `eta` aos motores, que então não
+    repetem o pow a cada passo de cada formiga.
+    """
+    if engine == "sparse":
+        return distance.heuristic(beta)
+    if ENGINES[engine][1] == "array":
+        import numpy as np
+        eta = np.zeros_like(distance)
+        edges = distance > 0
+        eta[edges] = (1.0 / distance[edges]) ** beta
+        return eta
+    return [[(1.0 / d) ** beta if d > 0 else 0.0 for d in row] for row in distance]
@@ -0,0 +1,128 @@
+import sys
+import json
+import heapq
+import queue
+import argparse
+import threading
+from collections import deque
+
+
+class EventLog:
+    """
+    Log de eventos com memória limitada e exportação em streaming.
+
+    Mantém apenas os últimos `capacity` eventos em um ring buffer (para o
+    resumo impresso no fim da execução) e, se `file_path` for informado,
+    grava todos os eventos em um arquivo JSONL append-only a partir de
+    uma thread de fundo, sem bloquear quem registra o evento.
+
+    O timestamp de Lamport é obtido por quem chama, antes de append, e
+    várias threads registram ao mesmo tempo (RPCs, heartbeats): o arquivo
+    sai quase, mas não estritamente, em ordem de Lamport. read_events
+    ordena ao ler.
+    """
+
+    def __init__(self, capacity=1000, file_path=None, source="master"):
+        self.recent = deque(maxlen=capacity)
+        self.source = source
+        self.total_events = 0
+        self.lock = threading.Lock()
+        self.file_path = file_path
+        self.queue = None
+        self.thread = None
+
+        if file_path:
+            self.queue = queue.SimpleQueue()
+            self.thread = threading.Thread(target=self._write_loop, daemon=True)
+            self.thread.start()
+
+    def append(self, lamport_time, event_type, worker_id, received_time=None, cost=None):
+        """Registra um evento (timestamp, tipo_evento, worker_id, recebido, custo)"""
+        event = (lamport_time, event_type, worker_id, received_time, cost)
+        with self.lock:
+            self.recent.append(event)
+            self.total_events += 1
+            if self.queue is not None:
+                self.queue.put(event)
+
+    def sorted_recent(self):
+        """Eventos do ring buffer ordenados por timestamp de Lamport"""
+        with self.lock:
+            recent = list(self.recent)
+        return sorted(recent, key=lambda e: (e[0], e[2]))
+
+    def __len__(self):
+        return len(self.recent)
+
+    def _write_loop(self):
+        with open(self.file_path, 'a', encoding='utf-8') as f:
+            while True:
+                event = self.queue.get()
+                if event is None:
+                    break
+                f.write(self._to_json(event))
+                f.write("\n")
+                # Só força o flush quando a fila esvazia, para agrupar escritas
+                if self.queue.empty():
+                    f.flush()
+
+    def _to_json(self, event):
+        lamport_time, event_type, worker_id, received_time, cost = event
+        record = {"lamport": lamport_time, "event": event_type, "worker": worker_id, "source": self.source}
+        if received_time is not None:
+            record["received"] = received_time
+        if cost is not None:
+            record["cost"] = cost
+        return json.dumps(record, separators=(',', ':'))
+
+    def close(self):
+        """Esvazia a fila de escrita e fecha o arquivo"""
+        if self.thread is not None:
+            self.queue.put(None)
+            self.thread.join()
+            self.thread = None
+
+
+def event_key(event):
+    """Ordem total dos eventos: Lamport e, no empate, origem e worker"""
+    return event["lamport"], event.get("source", ""), event["worker"]
+
+
+def read_events(file_path):
+    """
+    Lê um arquivo JSONL de eventos e devolve os eventos ordenados por
+    event_key. O arquivo gravado pelo EventLog pode ter eventos de threads
+    diferentes fora de ordem (ver EventLog); como quase tudo já está em
+    ordem, a ordenação em memória custa pouco.
+    """
+    with open(file_path, 'r', encoding='utf-8') as f:
+        events = [json.loads(line) for line in f if line.strip()]
+
+    events.sort(key=event_key)
+    return events
+
+
+def merge_event_files(file_paths):
+    """Mescla vários logs de eventos em um único fluxo ordenado por Lamport"""
+    streams = [read_events(path) for path in file_paths]
+    return heapq.merge(*streams, key=event_key)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Mescla logs de eventos (JSONL) ordenando por relógio de Lamport')
+    parser.add_argument('files', nargs='+', help='Arquivos JSONL gravados pelo mestre')
+    parser.add_argument('--output', '-o', type=str, default=None, help='Arquivo de saída (padrão: stdout)')
+    args = parser.parse_args()
+
+    out = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    try:
+        for event in merge_event_files(args.files):
+            out.write(json.dumps(event, separators=(',', ':')))
+            out.write("\n")
+    finally:
+        if args.output:
+            out.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+import math
+import random
+from aco_strategies import deposit
+
+
+class Island:
+    """
+    Colônia local de um worker no modo ilhas.
+
+    Mantém a própria matriz de feromônios e a melhor rota da ilha, e roda
+    várias iterações sem falar com o mestre. Expõe os mesmos atributos que
+    as estratégias de aco_strategies usam no mestre (pheromone, rho, q, n,
+    solutions_current_iteration, solution_pool, best_path, best_cost,
+    current_iteration), então a atualização de feromônios é exatamente a
+    do modo global.
+    """
+
+    def __init__(self, pheromone, strategy, rho, q):
+        self.pheromone = pheromone
+        self.strategy = strategy
+        self.n = len(pheromone)
+        self.rho = rho
+        self.q = q
+
+        self.current_iteration = 0
+        self.best_path = None
+        self.best_cost = math.inf
+        self.solutions_current_iteration = []
+        self.solution_pool = None  # Cada formiga deposita, mesmo com rotas repetidas
+
+    def receive_migrant(self, path, cost):
+        """Incorpora a melhor rota de outra ilha: reforça suas arestas e, se melhor, adota como melhor da ilha"""
+        if cost < self.best_cost:
+            self.best_path = path
+            self.best_cost = cost
+        deposit(self.pheromone, path, self.q / cost)
+
+    def run_iteration(self, construct, distance_matrix, num_ants, alpha, beta, worker_id=0, ant_rng=None):
+        """
+        Executa uma iteração local (formigas + atualização) e devolve o custo
+        médio das rotas. `ant_rng(ant_num)` fornece o gerador de cada formiga
+        (ver aco_engine.seeded_rng); sem ele é usado o módulo random.
+        """
+        total_cost = 0.0
+        for ant_num in range(num_ants):
+            rng = ant_rng(ant_num) if ant_rng else random
+            path, cost = construct(self.pheromone, distance_matrix, self.n, alpha, beta, ant_num % self.n, rng=rng)
+            total_cost += cost
+            if len(path) < self.n:
+                continue
+            self.solutions_current_iteration.append((path, cost, ant_num, worker_id))
+            if cost < self.best_cost:
+                self.best_path = path
+                self.best_cost = cost
+
+        self.strategy.update(self)
+        self.solutions_current_iteration.clear()
+        self.current_iteration += 1
+        return total_cost / max(num_ants, 1)
+
+
+def plan_migration(island_bests, topology="ring", rng=random):
+    """
+    Decide qual ilha envia sua melhor rota para qual.
+
+    `island_bests` mapeia worker_id -> (caminho, custo). No anel cada ilha
+    recebe da anterior (ordem dos IDs); no modo aleatório cada ilha recebe
+    de outra ilha sorteada. Devolve destino -> (caminho, custo).
+    """
+    ids = sorted(island_bests)
+    if len(ids) < 2:
+        return {}
+
+    if topology == "ring":
+        sources = {ids[k]: ids[k - 1] for k in range(len(ids))}
+    else:
+        sources = {dest: rng.choice([src for src in ids if src != dest]) for dest in ids}
+
+    return {dest: island_bests[src] for dest, src in sources.items()}
+
+
+TOPOLOGIES = ("ring", "random")
@@ -0,0 +1,283 @@
+import time
+import logging
+import argparse
+import threading
+from collections import deque
+import aco_distributed_pb2
+import aco_distributed_pb2_grpc
+from aco_master import ACOMaster
+from aco_sessions import SessionRouter
+from aco_strategies import STRATEGIES
+from utils_gen_graphs import load_graph_or_exit
+from utils_logging import setup_logging, add_logging_arguments
+from utils_grpc import create_channel, make_server, add_grpc_arguments, grpc_config
+
+
+log = logging.getLogger("aco.jobs")
+
+
+class Job:
+    """
+    Um job da fila: grafo, parâmetros, estado e o ACOMaster que o executa.
+    Ao terminar só o resultado fica (ver finish): o grafo e o mestre, com
+    a matriz de feromônios, são liberados.
+    """
+
+    def __init__(self, job_id, name, graph, iterations, num_ants, params):
+        self.job_id = job_id
+        self.name = name
+        self.graph = graph
+        self.iterations = iterations
+        self.num_ants = num_ants
+        self.params = params
+        self.state = "queued"
+        self.message = ""
+        self.master = None
+        self.started_at = None
+
+        # Resultado, copiado do mestre no fim do job
+        self.iteration = 0
+        self.best_cost = 0.0
+        self.best_path = []
+        self.wall_time = 0.0
+
+    def finish(self):
+        """Guarda o resultado e descarta o grafo e o ACOMaster"""
+        master = self.master
+        if master is not None:
+            self.iteration = master.current_iteration
+            self.best_cost = master.best_cost
+            self.best_path = list(master.best_path or [])
+            self.wall_time = master.total_duration or (time.time() - self.started_at)
+        self.master = None
+        self.graph = None
+        self.state = "done"
+
+
+class JobQueueMaster(SessionRouter):
+    """
+    Mestre multi-tenant: recebe jobs (grafo + parâmetros) pela RPC SubmitJob
+    e executa até `max_active_jobs` ao mesmo tempo, cada um como uma sessão
+    do SessionRouter. Os demais esperam em fila (FIFO). Os workers nunca
+    recebem `finished`: ao fim de um job passam direto para o próximo, e a
+    matriz de distâncias de cada grafo fica em cache neles (graph_id).
+    Dos jobs concluídos só o resultado é mantido, e apenas dos
+    `max_finished_jobs` mais recentes.
+    """
+
+    def __init__(self, workers=2, max_active_jobs=2, iterations=10, num_ants=5, channel_config=None,
+                 max_finished_jobs=100):
+        super().__init__(channel_config)
+        self.workers = workers
+        self.max_active_jobs = max_active_jobs
+        self.max_finished_jobs = max_finished_jobs
+        self.default_iterations = iterations
+        self.default_ants = num_ants
+
+        self.jobs = {}
+        self.queue = deque()
+        self.finished = deque()  # IDs dos jobs concluídos, do mais antigo ao mais recente
+        self.active = 0
+        self.next_id = 1
+        self.jobs_lock = threading.Lock()
+
+    def submit(self, graph, name="", iterations=0, num_ants=0, **params):
+        """Enfileira um job e devolve seu ID"""
+        with self.jobs_lock:
+            job_id = f"job-{self.next_id:04d}"
+            self.next_id += 1
+            job = Job(job_id, name or job_id, graph,
+                      iterations or self.default_iterations, num_ants or self.default_ants, params)
+            self.jobs[job_id] = job
+            self.queue.append(job)
+
+        log.info("[Jobs] %s (%s) enfileirado | %d nós | %d iterações", job_id, job.name, len(graph), job.iterations)
+        self._schedule()
+        return job_id
+
+    def _schedule(self):
+        with self.jobs_lock:
+            while self.queue and self.active < self.max_active_jobs:
+                job = self.queue.popleft()
+                job.state = "running"
+                job.started_at = time.time()
+                self.active += 1
+                threading.Thread(target=self._run_job, args=(job,), daemon=True).start()
+
+    def _run_job(self, job):
+        try:
+            job.master = ACOMaster(job.graph, total_iterations=job.iterations, num_ants=job.num_ants,
+                                   session_id=job.job_id, channel_pool=self.channel_pool, **job.params)
+            self.add_session(job.master)
+            job.master.run_coordination(self.workers)
+            job.message = f"Melhor custo: {job.master.best_cost:.2f}"
+        except Exception as e:
+            log.exception("[Jobs] %s falhou", job.job_id)
+            job.message = f"Erro: {e}"
+        finally:
+            if job.master is not None:
+                job.master.event_log.close()
+            self.remove_session(job.job_id)
+            with self.jobs_lock:
+                job.finish()
+                self.active -= 1
+                self.finished.append(job.job_id)
+                while len(self.finished) > self.max_finished_jobs:
+                    self.jobs.pop(self.finished.popleft(), None)
+            log.info("[Jobs] %s concluído | %s", job.job_id, job.message)
+            self._schedule()
+
+    def status(self, job_id):
+        job = self.jobs.get(job_id)
+        if job is None:
+            return aco_distributed_pb2.JobStatus(job_id=job_id, state="unknown", message="Job desconhecido")
+
+        master = job.master
+        status = aco_distributed_pb2.JobStatus(
+            job_id=job.job_id,
+            name=job.name,
+            state=job.state,
+            total_iterations=job.iterations,
+            message=job.message,
+        )
+        if master is not None:
+            status.iteration = master.current_iteration
+            status.best_cost = master.best_cost
+            status.best_path.extend(master.best_path or [])
+            status.wall_time = master.total_duration or (time.time() - job.started_at)
+        elif job.state == "done":
+            status.iteration = job.iteration
+            status.best_cost = job.best_cost
+            status.best_path.extend(job.best_path)
+            status.wall_time = job.wall_time
+        return status
+
+    def SubmitJob(self, request, context):
+        n = request.matrix_size
+        if n < 2 or len(request.distance_matrix) != n * n:
+            return aco_distributed_pb2.JobStatus(state="rejected", message="Matriz de distâncias inválida")
+        if request.strategy and request.strategy not in STRATEGIES:
+            return aco_distributed_pb2.JobStatus(state="rejected", message=f"Estratégia desconhecida: {request.strategy}")
+
+        graph = [list(request.distance_matrix[i * n:(i + 1) * n]) for i in range(n)]
+        # Campos zerados usam os padrões do ACOMaster
+        params = {key: getattr(request, key) for key in ("alpha", "beta", "rho", "q") if getattr(request, key)}
+        if request.strategy:
+            params["strategy"] = request.strategy
+
+        job_id = self.submit(graph, request.name, request.iterations, request.num_ants, **params)
+        return self.status(job_id)
+
+    def GetJobStatus(self, request, context):
+        return self.status(request.job_id)
+
+
+def serve(args):
+    config = grpc_config(args)
+    queue_master = JobQueueMaster(args.workers, args.max_jobs, args.iterations, args.ants, config, args.keep_jobs)
+
+    server = make_server(max(10, 4 * args.workers), config)
+    aco_distributed_pb2_grpc.add_ACOMasterServiceServicer_to_server(queue_master, server)
+    server.add_insecure_port(f'[::]:{args.port}')
+    server.start()
+    log.info("[Jobs] Fila de jobs na porta %d | %d workers por job | até %d jobs simultâneos",
+             args.port, args.workers, args.max_jobs)
+
+    try:
+        server.wait_for_termination()
+    except KeyboardInterrupt:
+        log.warning("[Jobs] Interrompido pelo usuário...")
+    finally:
+        server.stop(grace=2)
+        queue_master.channel_pool.close()
+
+
+def print_status(status):
+    print(f"{status.job_id} ({status.name}) | {status.state} | iteração {status.iteration}/{status.total_iterations}"
+          f" | melhor custo {status.best_cost:.2f} | {status.wall_time:.2f}s {status.message}")
+    if status.state == "done" and status.best_path:
+        print(f"  Melhor caminho: {list(status.best_path)}")
+
+
+def submit(args):
+    graph = load_graph_or_exit(args.graph)
+    n = len(graph)
+    request = aco_distributed_pb2.JobRequest(
+        name=args.name or args.graph,
+        distance_matrix=[val for row in graph for val in row],
+        matrix_size=n,
+        iterations=args.iterations,
+        num_ants=args.ants,
+        alpha=args.alpha,
+        beta=args.beta,
+        rho=args.rho,
+        q=args.q,
+        strategy=args.strategy,
+    )
+
+    # A matriz do grafo vai inteira no SubmitJob: o canal precisa do limite de mensagem maior
+    with create_channel(args.master, grpc_config(args)) as channel:
+        stub = aco_distributed_pb2_grpc.ACOMasterServiceStub(channel)
+        status = stub.SubmitJob(request)
+        print_status(status)
+        while args.wait and status.state in ("queued", "running"):
+            time.sleep(1.0)
+            status = stub.GetJobStatus(aco_distributed_pb2.JobStatusRequest(job_id=status.job_id))
+        if args.wait:
+            print_status(status)
+
+
+def status(args):
+    with create_channel(args.master, grpc_config(args)) as channel:
+        stub = aco_distributed_pb2_grpc.ACOMasterServiceStub(channel)
+        for job_id in args.job_ids:
+            print_status(stub.GetJobStatus(aco_distributed_pb2.JobStatusRequest(job_id=job_id)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Mestre ACO com fila de jobs (vários grafos sobre os mesmos workers)')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    serve_parser = commands.add_parser('serve', help='Sobe o mestre com fila de jobs')
+    serve_parser.add_argument('--port', type=int, default=50051, help='Porta do servidor (padrão: 50051)')
+    serve_parser.add_argument('--workers', type=int, default=2, help='Workers esperados por job (padrão: 2)')
+    serve_parser.add_argument('--max-jobs', type=int, default=2, help='Jobs executados ao mesmo tempo (padrão: 2)')
+    serve_parser.add_argument('--keep-jobs', type=int, default=100,
+                              help='Jobs concluídos cujo resultado fica disponível para consulta (padrão: 100)')
+    serve_parser.add_argument('--iterations', type=int, default=10, help='Iterações padrão por job (padrão: 10)')
+    serve_parser.add_argument('--ants', type=int, default=5, help='Formigas padrão por worker (padrão: 5)')
+    add_grpc_arguments(serve_parser)
+    add_logging_arguments(serve_parser)
+
+    submit_parser = commands.add_parser('submit', help='Submete um grafo como job')
+    submit_parser.add_argument('--master', type=str, default='localhost:50051',
+                               help='Endereço do mestre (padrão: localhost:50051)')
+    submit_parser.add_argument('--graph', type=str, required=True, help='Caminho do arquivo JSON do grafo')
+    submit_parser.add_argument('--name', type=str, default='', help='Nome do job (padrão: caminho do grafo)')
+    submit_parser.add_argument('--iterations', type=int, default=0, help='Iterações (padrão: o do servidor)')
+    submit_parser.add_argument('--ants', type=int, default=0, help='Formigas por worker (padrão: o do servidor)')
+    submit_parser.add_argument('--alpha', type=float, default=0, help='Alpha (padrão: 1.0)')
+    submit_parser.add_argument('--beta', type=float, default=0, help='Beta (padrão: 3.0)')
+    submit_parser.add_argument('--rho', type=float, default=0, help='Rho (padrão: 0.5)')
+    submit_parser.add_argument('--q', type=float, default=0, help='Q (padrão: 10)')
+    submit_parser.add_argument('--strategy', type=str, default='', choices=[''] + sorted(STRATEGIES),
+                               help='Estratégia de atualização (padrão: as)')
+    submit_parser.add_argument('--wait', action='store_true', help='Aguarda o job terminar e mostra o resultado')
+    add_grpc_arguments(submit_parser)
+    add_logging_arguments(submit_parser)
+
+    status_parser = commands.add_parser('status', help='Consulta o estado de jobs')
+    status_parser.add_argument('--master', type=str, default='localhost:50051',
+                               help='Endereço do mestre (padrão: localhost:50051)')
+    status_parser.add_argument('job_ids', nargs='+', help='IDs dos jobs')
+    add_grpc_arguments(status_parser)
+    add_logging_arguments(status_parser)
+
+    args = parser.parse_args()
+    setup_logging(args.log_level, args.log_rate)
+
+    {"serve": serve, "submit": submit, "status": status}[args.command](args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,235 @@
+import math
+import time
+import random
+import logging
+import argparse
+from concurrent import futures
+from aco_master import ACOMaster
+from aco_engine import ENGINES, ACS_ENGINES, prepare_matrix, prepare_distance, heuristic_matrix, seeded_rng
+from aco_solution_pool import top_tours
+from aco_strategies import add_strategy_arguments, strategy_options
+from aco_convergence import add_stopping_arguments, stopping_criteria
+from utils_gen_graphs import load_graph_or_exit
+from utils_logging import setup_logging, add_logging_arguments
+
+
+log = logging.getLogger("aco.local")
+
+POOLS = ("thread", "process")
+
+# Matriz de distâncias de cada processo do pool (ver _init_process) e seus eta^beta por beta
+_process_distance = None
+_process_heuristics = {}
+
+# Valores de beta com eta^beta em cache (o ajuste adaptativo muda beta ao longo da execução)
+HEURISTIC_CACHE_SIZE = 8
+
+
+def construct_tours(engine, options, pheromone_flat, distance, n, num_ants, alpha, beta, seed, worker_id, iteration,
+                    top_k=1, eta=None):
+    """
+    Executa as formigas de um worker em uma iteração, como ACOWorker.run_ants,
+    e devolve (as `top_k` melhores rotas distintas como (caminho, custo), custo total).
+
+    Usa os mesmos fluxos de RNG do modo distribuído (worker, iteração,
+    formiga), então com a mesma semente e os mesmos IDs as rotas são iguais.
+    `eta` é o termo heurístico do grafo (ver cached_heuristic).
+    """
+    if options.get("strategy") == "acs":
+        acs = ACS_ENGINES[engine]
+
+        def construct(*args, **kwargs):
+            return acs(*args, q0=options["q0"], local_rho=options["local_rho"], tau0=options["tau0"], **kwargs)
+    else:
+        construct = ENGINES[engine][0]
+
+    # Cópia privada: no ACS as formigas alteram os feromônios
+    pheromone = prepare_matrix(engine, pheromone_flat, n)
+    # Sem semente cada tarefa precisa do próprio gerador: processos criados por
+    # fork herdariam o mesmo estado do módulo random
+    unseeded = random.Random() if seed is None else None
+
+    best_path = None
+    best_cost = float('inf')
+    total_cost = 0.0
+    complete = []
+    for ant_num in range(num_ants):
+        rng = unseeded or seeded_rng(seed, worker_id, iteration, ant_num)
+        path, cost = construct(pheromone, distance, n, alpha, beta, ant_num % n, rng=rng, eta=eta)
+        total_cost += cost
+        if top_k > 1 and math.isfinite(cost):
+            complete.append((cost, ant_num, path))
+        if best_path is None or cost < best_cost:
+            best_path = path
+            best_cost = cost
+    if top_k > 1 and complete:
+        return top_tours(complete, top_k), total_cost
+    return [(best_path, best_cost)], total_cost
+
+
+def cached_heuristic(cache, engine, distance, beta):
+    """eta^beta de `distance` para `beta`, guardado em `cache` (dict beta -> matriz, os mais antigos saem primeiro)"""
+    eta = cache.get(beta)
+    if eta is None:
+        eta = cache[beta] = heuristic_matrix(engine, distance, beta)
+        while len(cache) > HEURISTIC_CACHE_SIZE:
+            del cache[next(iter(cache))]
+    return eta
+
+
+def _init_process(engine, distance_flat, n):
+    global _process_distance
+    _process_distance = prepare_distance(engine, distance_flat, n)
+    _process_heuristics.clear()
+
+
+def _construct_in_process(engine, options, pheromone_flat, n, num_ants, alpha, beta, *args):
+    eta = cached_heuristic(_process_heuristics, engine, _process_distance, beta)
+    return construct_tours(engine, options, pheromone_flat, _process_distance, n, num_ants, alpha, beta, *args, eta=eta)
+
+
+class LocalMaster(ACOMaster):
+    """
+    ACOMaster sem gRPC: cada iteração roda as formigas dos `workers` workers
+    virtuais em um pool de threads ou processos deste mesmo processo e aplica
+    a mesma atualização de feromônios, histórico, ajuste adaptativo e
+    critérios de parada do mestre distribuído (run_coordination).
+
+    Modo ilhas não é suportado: as colônias locais vivem nos workers.
+    """
+
+    def __init__(self, graph_matrix, workers=2, engine="python", pool="thread", top_k=1, **kwargs):
+        super().__init__(graph_matrix, **kwargs)
+        self.workers = workers
+        self.engine = engine
+        self.pool_kind = pool
+        self.top_k = max(1, top_k)
+
+        distance_flat = [val for row in graph_matrix for val in row]
+        if pool == "process":
+            self.pool = futures.ProcessPoolExecutor(max_workers=workers, initializer=_init_process,
+                                                    initargs=(engine, distance_flat, self.n))
+        else:
+            self.pool = futures.ThreadPoolExecutor(max_workers=workers)
+            self.distance = prepare_distance(engine, distance_flat, self.n)
+            self.heuristics = {}
+
+    def _submit_worker(self, worker_id, options, pheromone_flat):
+        args = (self.n, self.num_ants_per_worker, self.alpha, self.beta, self.seed, worker_id, self.current_iteration,
+                self.top_k)
+        if self.pool_kind == "process":
+            return self.pool.submit(_construct_in_process, self.engine, options, pheromone_flat, *args)
+        eta = cached_heuristic(self.heuristics, self.engine, self.distance, self.beta)
+        return self.pool.submit(construct_tours, self.engine, options, pheromone_flat, self.distance, *args, eta=eta)
+
+    def _run_iteration(self, expected_workers):
+        log.debug("[Local] ITERACAO %d/%d iniciada", self.current_iteration + 1, self.total_iterations)
+
+        options = self.strategy.work_options(self)
+        pheromone_flat = [val for row in self.pheromone for val in row]
+
+        with self.stage_seconds.time(stage="wait"):
+            # IDs 1..N, como os workers do modo distribuído
+            jobs = {worker_id: self._submit_worker(worker_id, options, pheromone_flat)
+                    for worker_id in range(1, self.workers + 1)}
+            results = {worker_id: job.result() for worker_id, job in jobs.items()}
+
+        with self.lock:
+            for worker_id, (tours, total_cost) in results.items():
+                timestamp = self.lamport_clock.increment()
+                cost = tours[0][1]
+                self.event_log.append(timestamp, "SUBMIT_SOLUTION", worker_id, timestamp, cost)
+                self.ants_total.inc(self.num_ants_per_worker, worker=worker_id)
+                log.debug("[Local] Worker %d | Melhor local: %.2f | Media: %.2f", worker_id, cost,
+                          total_cost / max(self.num_ants_per_worker, 1))
+                for path, tour_cost in tours:
+                    if path is not None:
+                        self._record_solution(worker_id, self.current_iteration, path, tour_cost, timestamp)
+
+            with self.stage_seconds.time(stage="update"):
+                self._update_pheromones()
+
+            num_solutions = len(self.solutions_current_iteration)
+            self.solutions_current_iteration.clear()
+            self.workers_completed.clear()
+            self.current_iteration += 1
+
+        return True, num_solutions
+
+    def close(self):
+        self.pool.shutdown()
+        self.event_log.close()
+
+
+def run_local(graph_matrix, iterations=10, num_ants=5, workers=2, engine="python", pool="thread", **kwargs):
+    """
+    Executa o ACO inteiro neste processo e devolve as medidas da execução
+    (mesmo formato de utils_benchmark.run_aco, mais o melhor caminho).
+
+    `kwargs` vão para o LocalMaster/ACOMaster: top_k, alpha, beta, rho, q,
+    strategy, strategy_opts, stopping, adaptive, seed...
+    """
+    if kwargs.get("islands"):
+        raise ValueError("O modo local não suporta ilhas")
+
+    master = LocalMaster(graph_matrix, workers=workers, engine=engine, pool=pool,
+                         total_iterations=iterations, num_ants=num_ants, **kwargs)
+    start = time.time()
+    try:
+        master.run_coordination(workers)
+    finally:
+        master.close()
+
+    return {
+        "wall_time": time.time() - start,
+        "best_cost": master.best_cost,
+        "best_path": master.best_path,
+        "history": [cost for _, cost, _ in master.history],
+        "iterations": master.current_iteration,
+        "stop_reason": master.stop_reason,
+        "elite": master.solution_pool.elite.tours(),
+        "bytes": 0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='ACO em um único processo (sem gRPC): formigas em pool de threads/processos')
+    parser.add_argument('--graph', type=str, default='graphs/5_nodes.json', help='Caminho do arquivo JSON do grafo')
+    parser.add_argument('--iterations', type=int, default=10, help='Número de iterações (padrão: 10)')
+    parser.add_argument('--ants', type=int, default=5, help='Formigas por worker (padrão: 5)')
+    parser.add_argument('--workers', type=int, default=2,
+                        help='Workers virtuais, cada um com suas formigas, executados em paralelo (padrão: 2)')
+    parser.add_argument('--pool', type=str, default='thread', choices=POOLS,
+                        help='Pool que executa os workers: thread ou process (padrão: thread)')
+    parser.add_argument('--engine', type=str, default='python', choices=sorted(ENGINES),
+                        help='Motor de construção das rotas; sparse guarda só as distâncias em CSR, '
+                             'os feromônios continuam n x n (padrão: python)')
+    parser.add_argument('--top-k', type=int, default=1,
+                        help='Melhores rotas distintas de cada worker usadas na atualização (padrão: 1)')
+    parser.add_argument('--alpha', type=float, default=1.0, help='Peso do feromônio na escolha (padrão: 1.0)')
+    parser.add_argument('--beta', type=float, default=3.0, help='Peso da heurística 1/distância (padrão: 3.0)')
+    parser.add_argument('--rho', type=float, default=0.5, help='Taxa de evaporação (padrão: 0.5)')
+    parser.add_argument('--q', type=float, default=10, help='Constante de depósito de feromônio (padrão: 10)')
+    parser.add_argument('--adaptive', action='store_true',
+                        help='Ajusta alpha, beta e rho a cada iteração conforme diversidade e melhora')
+    parser.add_argument('--seed', type=int, default=None,
+                        help='Semente da execução: mesmas rotas do modo distribuído com os mesmos workers '
+                             '(padrão: não determinístico)')
+    add_strategy_arguments(parser)
+    add_stopping_arguments(parser)
+    add_logging_arguments(parser)
+
+    args = parser.parse_args()
+    setup_logging(args.log_level, args.log_rate)
+
+    log.info("Carregando grafo de: %s", args.graph)
+    graph = load_graph_or_exit(args.graph)
+
+    run_local(graph, args.iterations, args.ants, args.workers, engine=args.engine, pool=args.pool,
+              top_k=args.top_k, alpha=args.alpha, beta=args.beta, rho=args.rho, q=args.q,
+              strategy=args.strategy, strategy_opts=strategy_options(args),
+              stopping=stopping_criteria(args), adaptive=args.adaptive, seed=args.seed)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,12 +1,30 @@
+import os
 import time
 import math
+import random
+import hashlib
+import logging
 import argparse
 import threading
-from concurrent import futures
 import grpc
 import aco_distributed_pb2
 import aco_distributed_pb2_grpc
-from utils_gen_graphs import load_graph_from_json
+from utils_gen_graphs import load_graph_or_exit
+from aco_checkpoint import CheckpointWriter, load_snapshot, resize_pheromone
+from aco_event_log import EventLog
+from aco_metrics import MetricsRegistry, TimedLock, SIZE_BUCKETS, start_metrics_server
+from utils_profiling import IterationProfiler, add_profiling_arguments
+from aco_strategies import make_strategy, add_strategy_arguments, strategy_options
+from aco_island import plan_migration, TOPOLOGIES
+from aco_convergence import StoppingCriteria, add_stopping_arguments, stopping_criteria
+from aco_adaptive import AdaptiveController
+from aco_membership import Membership
+from aco_solution_pool import SolutionPool, DUPLICATE_MODES, split_tours
+from utils_grpc import ChannelPool, make_server, matrix_chunks, add_grpc_arguments, grpc_config
+from utils_logging import setup_logging, add_logging_arguments
+
+
+log = logging.getLogger("aco.master")
 
 
 class LamportClock:
@@ -42,57 +60,318 @@ class LamportClock:
             return self.time
 
 
+def worker_address(peer, worker_port):
+    """
+    Endereço do servidor 2PC de um worker a partir do peer da conexão.
+    Formato IPv4: "ipv4:127.0.0.1:porta"; formato IPv6: "ipv6:[::1]:porta".
+    """
+    if 'ipv6' in peer:
+        # Para IPv6, usa localhost
+        return f"localhost:{worker_port}"
+    if 'ipv4' in peer:
+        # Para IPv4, extrai IP
+        addr_parts = peer.split(':')
+        if len(addr_parts) >= 3:
+            return f"{addr_parts[1]}:{worker_port}"
+    # Fallback
+    return f"localhost:{worker_port}"
+
+
+def graph_fingerprint(graph_matrix):
+    """Identificador curto da matriz de distâncias, usado pelos workers como chave de cache"""
+    digest = hashlib.sha1()
+    digest.update(str(len(graph_matrix)).encode())
+    for row in graph_matrix:
+        digest.update(",".join(repr(float(value)) for value in row).encode())
+    return digest.hexdigest()[:16]
+
+
 class ACOMaster(aco_distributed_pb2_grpc.ACOMasterServiceServicer):
     
-    def __init__(self, graph_matrix, total_iterations=20, num_ants=10, alpha=1.0, beta=3.0, rho=0.5, q=10):
+    def __init__(self, graph_matrix, total_iterations=20, num_ants=10, alpha=1.0, beta=3.0, rho=0.5, q=10,
+                 checkpoint_path=None, checkpoint_every=1, event_log_path=None, event_log_capacity=1000,
+                 metrics=None, profile_dir=None, strategy="as", strategy_opts=None,
+                 islands=False, migration_interval=10, topology="ring", stopping=None, adaptive=None,
+                 session_id="", heartbeat_timeout=5.0, seed=None, channel_config=None, channel_pool=None,
+                 duplicates="merge", elite_size=10):
         self.distance_matrix = graph_matrix
+        self.graph_id = graph_fingerprint(graph_matrix)
+        # Identifica esta configuração quando várias sessões dividem os workers (ver aco_sessions)
+        self.session_id = session_id
         self.n = len(graph_matrix)
         self.total_iterations = total_iterations
+        
+        # Modo ilhas: cada worker mantém seus feromônios e uma iteração do mestre
+        # (uma transação 2PC) vale `migration_interval` iterações locais
+        self.islands = islands
+        self.migration_interval = migration_interval if islands else 1
+        self.topology = topology
+        self.local_iterations_total = total_iterations
+        if islands:
+            self.total_iterations = math.ceil(total_iterations / self.migration_interval)
+        self.migrants = {}
+        
+        # Semente da execução: vai para os workers em cada atribuição e torna as
+        # rotas reproduzíveis (ver aco_engine.seeded_rng); None = não determinístico
+        self.seed = seed
+        self.rng = random.Random(seed) if seed is not None else random
         self.num_ants_per_worker = num_ants
         self.alpha = alpha
         self.beta = beta
         self.rho = rho
         self.q = q
         
-        self.pheromone = [[1.0 for _ in range(self.n)] for _ in range(self.n)]
+        # Estratégia de atualização dos feromônios (AS, Elitist, Rank-based, MMAS ou ACS)
+        self.strategy = make_strategy(strategy, **(strategy_opts or {}))
+        tau0 = self.strategy.initial_pheromone(self)
+        self.pheromone = [[tau0 for _ in range(self.n)] for _ in range(self.n)]
+        # Muda a cada atualização dos feromônios: um stream de FetchMatrix não mistura versões
+        self.pheromone_version = 0
         
         self.current_iteration = 0
         self.finished = False
         self.best_cost = math.inf
         self.best_path = None
         self.best_timestamp = 0  # Timestamp de Lamport da melhor solução
+        self.best_origin = (math.inf, 0)  # (iteração, worker) da melhor solução, desempate com semente
         
         self.solutions_current_iteration = []
         self.workers_completed = set()
         
+        # Rotas já recebidas (hash canônico em cache LRU), melhores rotas distintas e
+        # agrupamento das repetidas no depósito de feromônio
+        self.solution_pool = SolutionPool(elite_size=elite_size, duplicates=duplicates)
+        
+        # Histórico (iteração, melhor custo, segundos desde o início) para benchmarks
+        self.history = []
+        self.total_duration = None
+        
+        # Parada antecipada (estagnação, custo alvo, tempo, convergência dos feromônios)
+        self.stopping = stopping if stopping is not None else StoppingCriteria()
+        self.stop_reason = None
+        
+        # Chamado com o mestre ao fim de cada iteração (ver aco_solver); devolver False interrompe
+        self.on_iteration = None
+        
+        # Ajuste online de alpha/beta/rho (True, um AdaptiveController ou None). No modo
+        # ilhas a matriz do mestre não evolui, então não há como medir a diversidade.
+        if adaptive is True:
+            adaptive = AdaptiveController()
+        if adaptive and islands:
+            log.warning("[Mestre] Ajuste adaptativo de parâmetros não é suportado no modo ilhas; desabilitado")
+            adaptive = None
+        self.adaptive = adaptive or None
+        
         # Atributos para 2PC
         self.transaction_id = 0
         self.worker_addresses = {}
         self.worker_stubs = {}
+        # Canais para os workers: um por endereço, reaproveitados (compartilhados entre
+        # sessões quando o roteador passa o próprio pool)
+        self.owns_channel_pool = channel_pool is None
+        self.channel_pool = channel_pool if channel_pool is not None else ChannelPool(channel_config)
+        # Matrizes maiores que um bloco vão por FetchMatrix, não dentro das mensagens
+        self.chunk_rows = self.channel_pool.config.chunk_rows
+        self.stream_matrices = self.channel_pool.config.streams(self.n)
+        # Workers sem servidor 2PC (--direct): contam na barreira, mas não votam
+        self.direct_workers = set()
         
-        self.lock = threading.Lock()
+        # Workers vivos (heartbeats); barreiras e 2PC só incluem estes
+        self.membership = Membership(heartbeat_timeout)
+        # Protege endereços, stubs e entradas/saídas da pertinência. É separado de self.lock
+        # para o Heartbeat não esperar o 2PC; quem o pega nunca pega self.lock depois
+        self.membership_lock = threading.Lock()
+        self.quorum_reached = False
+        
+        # Instrumentação (exposta em /metrics quando --metrics-port é informado)
+        self.metrics = metrics if metrics is not None else MetricsRegistry()
+        self.stage_seconds = self.metrics.histogram(
+            "aco_iteration_stage_seconds", "Duração de cada etapa da iteração (wait, prepare, update, commit, abort)")
+        self.iteration_seconds = self.metrics.histogram(
+            "aco_iteration_seconds", "Duração total de cada iteração")
+        self.payload_bytes = self.metrics.histogram(
+            "aco_rpc_payload_bytes", "Tamanho serializado das mensagens por RPC", buckets=SIZE_BUCKETS)
+        self.ants_total = self.metrics.counter(
+            "aco_ants_completed_total", "Formigas executadas por worker (contadas nas soluções aceitas)")
+        self.aborts_total = self.metrics.counter("aco_2pc_aborts_total", "Transações 2PC abortadas")
+        self.commits_total = self.metrics.counter("aco_2pc_commits_total", "Transações 2PC commitadas")
+        self.best_cost_gauge = self.metrics.gauge("aco_best_cost", "Melhor custo global encontrado até agora")
+        self.iteration_gauge = self.metrics.gauge("aco_iteration", "Iteração atual do mestre")
+        self.entropy_gauge = self.metrics.gauge(
+            "aco_pheromone_entropy", "Entropia média normalizada das linhas da matriz de feromônios")
+        self.parameter_gauge = self.metrics.gauge("aco_parameter", "Valor atual de alpha, beta e rho")
+        self.live_workers_gauge = self.metrics.gauge("aco_live_workers", "Workers vivos (com heartbeat recente)")
+        self.evictions_total = self.metrics.counter(
+            "aco_worker_evictions_total", "Workers removidos por falta de heartbeat ou falha no 2PC")
+        self.repeated_solutions_total = self.metrics.counter(
+            "aco_repeated_solutions_total", "Soluções recebidas cuja rota já estava no cache do mestre")
+        
+        self.profiler = IterationProfiler(profile_dir, prefix="master")
+        
+        self.lock = TimedLock(self.metrics.histogram(
+            "aco_master_lock_hold_seconds", "Tempo em que ACOMaster.lock fica segurado"))
         
         # Relógio de Lamport para ordenação de eventos
         self.lamport_clock = LamportClock()
         
         # Log de eventos ordenados (timestamp, tipo_evento, worker_id, dados_extras)
-        self.event_log = []
-        
-        print(f"\n{'='*70}")
-        print(f"  MESTRE ACO INICIADO COM 2PC")
-        print(f"  Tamanho do grafo: {self.n} nós")
-        print(f"  Iterações totais: {self.total_iterations}")
-        print(f"  Formigas por worker: {self.num_ants_per_worker}")
-        print(f"  Alpha: {self.alpha} | Beta: {self.beta} | Rho: {self.rho} | Q: {self.q}")
-        print(f"{'='*70}\n")
-    
-    def register_worker(self, worker_id, address):
-        """Registra um worker e cria stub para comunicacao 2PC"""
-        if worker_id not in self.worker_addresses:
+        # Em memória ficam só os últimos eventos; o histórico completo vai para o arquivo
+        self.event_log = EventLog(capacity=event_log_capacity, file_path=event_log_path)
+        
+        # Checkpoints periódicos (gravados em thread de fundo)
+        self.checkpoint_every = checkpoint_every
+        self.checkpoint_writer = CheckpointWriter(checkpoint_path) if checkpoint_path else None
+        
+        log.info("MESTRE ACO INICIADO COM 2PC | Grafo: %d nós | Iterações: %d | Formigas por worker: %d | "
+                 "Alpha: %s | Beta: %s | Rho: %s | Q: %s | Estratégia: %s",
+                 self.n, self.total_iterations, self.num_ants_per_worker,
+                 self.alpha, self.beta, self.rho, self.q, self.strategy.describe())
+        if self.adaptive is not None:
+            log.info("[Mestre] Ajuste adaptativo de alpha/beta/rho habilitado")
+        if self.stopping.enabled:
+            log.info("[Mestre] Critérios de parada: %s", self.stopping.describe())
+        if self.seed is not None:
+            log.info("[Mestre] Semente da execução: %d", self.seed)
+        if islands:
+            log.info("[Mestre] Modo ilhas | %d iterações locais por migração | Topologia: %s",
+                     self.migration_interval, topology)
+        if self.stream_matrices:
+            log.info("[Mestre] Matrizes enviadas por streaming em blocos de %d linhas", self.chunk_rows)
+    
+    def register_worker(self, worker_id, address, replace=True):
+        """
+        Registra um worker (ou seu novo endereço) e cria stub para comunicacao 2PC.
+        Com `replace=False` só registra se o worker ainda não tem endereço (ex.:
+        a porta presumida do RequestWork não sobrescreve a informada no heartbeat).
+        """
+        with self.membership_lock:
+            previous = self.worker_addresses.get(worker_id)
+            if previous == address or (previous is not None and not replace):
+                return
             self.worker_addresses[worker_id] = address
-            channel = grpc.insecure_channel(address)
-            self.worker_stubs[worker_id] = aco_distributed_pb2_grpc.TwoPhaseCommitServiceStub(channel)
-            print(f"[Mestre] Worker {worker_id} registrado em {address}")
+            self.worker_stubs[worker_id] = self.channel_pool.stub(address, aco_distributed_pb2_grpc.TwoPhaseCommitServiceStub)
+            if previous is not None and self.owns_channel_pool and previous not in self.worker_addresses.values():
+                self.channel_pool.release(previous)
+        log.info("[Mestre] Worker %d registrado em %s", worker_id, address)
+    
+    def close_channels(self):
+        """Fecha os canais para os workers (se o pool não for compartilhado)"""
+        if self.owns_channel_pool:
+            self.channel_pool.close()
+    
+    def _mark_alive(self, worker_id):
+        """Qualquer mensagem do worker conta como heartbeat"""
+        with self.membership_lock:
+            if not self.membership.beat(worker_id):
+                return
+            self.event_log.append(self.lamport_clock.increment(), "JOIN", worker_id)
+            self.live_workers_gauge.set(len(self.membership))
+        log.info("[Mestre] Worker %d entrou | Workers vivos: %d", worker_id, len(self.membership))
+    
+    def _remove_worker(self, worker_id, reason):
+        with self.membership_lock:
+            if self.membership.remove(worker_id):
+                self._log_removal(worker_id, reason)
+    
+    def _log_removal(self, worker_id, reason):
+        self.event_log.append(self.lamport_clock.increment(), "LEAVE", worker_id)
+        self.live_workers_gauge.set(len(self.membership))
+        if reason != "saída":
+            self.evictions_total.inc()
+        log.warning("[Mestre] Worker %d removido (%s) | Workers vivos: %d", worker_id, reason, len(self.membership))
+    
+    def _evict_dead(self):
+        with self.membership_lock:
+            for worker_id in self.membership.evict_dead():
+                self._log_removal(worker_id, f"sem heartbeat há mais de {self.membership.timeout:.1f}s")
+    
+    def _participant_stubs(self):
+        """
+        Stubs 2PC dos workers vivos que enviaram solução nesta iteração
+        (chamar com self.lock). Quem entrou depois da barreira participa da
+        próxima iteração em vez de votar NO e abortar esta.
+        """
+        self._evict_dead()
+        participants = (self.membership.live() & self.workers_completed) - self.direct_workers
+        with self.membership_lock:
+            return {worker_id: stub for worker_id, stub in self.worker_stubs.items() if worker_id in participants}
+    
+    def Heartbeat(self, request, context):
+        # Não usa self.lock (heartbeats não podem esperar o 2PC terminar): as alterações
+        # de endereços e pertinência são protegidas por self.membership_lock
+        worker_id = request.worker_id
+        if request.leaving:
+            self._remove_worker(worker_id, "saída")
+        else:
+            if request.worker_port:
+                self.register_worker(worker_id, worker_address(context.peer(), request.worker_port))
+            self._mark_alive(worker_id)
+        return aco_distributed_pb2.HeartbeatResponse(ok=True, live_workers=len(self.membership))
+    
+    def snapshot(self):
+        """Copia o estado necessário para retomar a execução (chamar com self.lock)"""
+        return {
+            "pheromone": [row[:] for row in self.pheromone],
+            "best_path": list(self.best_path) if self.best_path else None,
+            "best_cost": self.best_cost,
+            "best_timestamp": self.best_timestamp,
+            "iteration": self.current_iteration,
+            "lamport_time": self.lamport_clock.get_time(),
+            "state": {
+                "alpha": self.alpha,
+                "beta": self.beta,
+                "rho": self.rho,
+                "strategy": self.strategy.state(),
+                "adaptive": self.adaptive.state() if self.adaptive is not None else None,
+            },
+        }
+    
+    def save_checkpoint(self):
+        """Agenda a gravação assíncrona de um checkpoint, se habilitado"""
+        if self.checkpoint_writer is None:
+            return
+        with self.lock:
+            snapshot = self.snapshot()
+        self.checkpoint_writer.submit(snapshot)
+    
+    def close_checkpoints(self):
+        """Grava o checkpoint final e encerra a thread de escrita"""
+        if self.checkpoint_writer is not None:
+            self.save_checkpoint()
+            self.checkpoint_writer.close()
+            self.checkpoint_writer = None
+    
+    def restore(self, snapshot):
+        """Retoma a execução a partir de um checkpoint do mesmo grafo"""
+        if len(snapshot["pheromone"]) != self.n:
+            raise ValueError(f"Checkpoint é de um grafo com {len(snapshot['pheromone'])} nós, mas o grafo atual tem {self.n}")
+        
+        with self.lock:
+            self.pheromone = [list(row) for row in snapshot["pheromone"].tolist()]
+            self.best_path = snapshot["best_path"]
+            self.best_cost = snapshot["best_cost"]
+            self.best_timestamp = snapshot["best_timestamp"]
+            self.current_iteration = snapshot["iteration"]
+            self.lamport_clock.update(snapshot["lamport_time"])
+            
+            # Parâmetros ajustados e estado da estratégia/ajuste adaptativo no momento do checkpoint
+            state = snapshot.get("state", {})
+            self.alpha = state.get("alpha", self.alpha)
+            self.beta = state.get("beta", self.beta)
+            self.rho = state.get("rho", self.rho)
+            self.strategy.load_state(state.get("strategy", {}))
+            if self.adaptive is not None and state.get("adaptive"):
+                self.adaptive.load_state(state["adaptive"])
+        
+        log.info("[Mestre] Retomando do checkpoint | Iteração %d/%d | Melhor custo: %.2f | Lamport: %d",
+                 self.current_iteration, self.total_iterations, self.best_cost, self.lamport_clock.get_time())
+    
+    def warm_start(self, snapshot):
+        """Inicializa os feromônios com os de uma execução anterior (grafo relacionado)"""
+        with self.lock:
+            self.pheromone = resize_pheromone(snapshot["pheromone"], self.n)
+        
+        log.info("[Mestre] Warm start: feromônios carregados de um grafo com %d nós", len(snapshot["pheromone"]))
     
     def RequestWork(self, request, context):
         with self.lock:
@@ -103,34 +382,18 @@ class ACOMaster(aco_distributed_pb2_grpc.ACOMasterServiceServicer):
             worker_id = request.worker_id
             
             # Registra evento no log
-            self.event_log.append((current_time, "REQUEST_WORK", worker_id, received_time))
-            
-            # Registra worker se ainda nao foi registrado
-            peer = context.peer()
-            if worker_id not in self.worker_addresses:
-                # Extrai endereco do peer
-                # Formato IPv4: "ipv4:127.0.0.1:porta"
-                # Formato IPv6: "ipv6:[::1]:porta"
-                worker_port = 50051 + worker_id
-                
-                if 'ipv6' in peer:
-                    # Para IPv6, usa localhost
-                    worker_addr = f"localhost:{worker_port}"
-                elif 'ipv4' in peer:
-                    # Para IPv4, extrai IP
-                    addr_parts = peer.split(':')
-                    if len(addr_parts) >= 3:
-                        ip = addr_parts[1]
-                        worker_addr = f"{ip}:{worker_port}"
-                    else:
-                        worker_addr = f"localhost:{worker_port}"
-                else:
-                    # Fallback
-                    worker_addr = f"localhost:{worker_port}"
-                
-                self.register_worker(worker_id, worker_addr)
+            self.event_log.append(current_time, "REQUEST_WORK", worker_id, received_time)
+            
+            # Registra worker se ainda nao foi registrado (sem heartbeat, assume a porta 50051 + ID)
+            if request.direct_commit:
+                self.direct_workers.add(worker_id)
+            else:
+                self.direct_workers.discard(worker_id)
+                self.register_worker(worker_id, worker_address(context.peer(), 50051 + worker_id), replace=False)
+            self._mark_alive(worker_id)
             
-            print(f"[Mestre] Worker {worker_id} solicitou trabalho | Lamport: {current_time} (recebido: {received_time}) | Iteração {self.current_iteration + 1}/{self.total_iterations}")
+            log.debug("[Mestre] Worker %d solicitou trabalho | Lamport: %d (recebido: %d) | Iteração %d/%d",
+                      worker_id, current_time, received_time, self.current_iteration + 1, self.total_iterations)
             
             if self.finished:
                 finish_time = self.lamport_clock.increment()
@@ -138,16 +401,44 @@ class ACOMaster(aco_distributed_pb2_grpc.ACOMasterServiceServicer):
                     finished=True,
                     num_ants=0,
                     iteration=self.current_iteration,
-                    timestamp=finish_time
+                    timestamp=finish_time,
+                    session_id=self.session_id
+                )
+            
+            if worker_id in self.workers_completed:
+                # Já enviou a solução desta iteração: repetir o trabalho duplicaria o
+                # depósito e, com semente, tornaria o resultado dependente do tempo
+                return aco_distributed_pb2.WorkAssignment(
+                    idle=True,
+                    iteration=self.current_iteration,
+                    timestamp=self.lamport_clock.increment(),
+                    session_id=self.session_id
                 )
             
-            pheromone_flat = [val for row in self.pheromone for val in row]
-            distance_flat = [val for row in self.distance_matrix for val in row]
+            # Se o worker já recebeu no último COMMIT os feromônios desta iteração,
+            # não é preciso reenviar a matriz
+            pheromone_cached = (self.current_iteration > 0
+                                and request.pheromone_iteration == self.current_iteration)
+            # A matriz de distâncias não muda: só vai para workers que ainda não a têm
+            distance_cached = self.graph_id in request.cached_graphs
+            # Matrizes grandes não entram na atribuição: o worker as busca com FetchMatrix
+            pheromone_streamed = self.stream_matrices and not pheromone_cached
+            distance_streamed = self.stream_matrices and not distance_cached
+            if pheromone_cached or pheromone_streamed:
+                pheromone_flat = []
+            else:
+                pheromone_flat = [val for row in self.pheromone for val in row]
+            if distance_cached or distance_streamed:
+                distance_flat = []
+            else:
+                distance_flat = [val for row in self.distance_matrix for val in row]
             
             # Incrementa antes de enviar resposta
             response_time = self.lamport_clock.increment()
             
-            return aco_distributed_pb2.WorkAssignment(
+            migrant_path, migrant_cost = self.migrants.get(worker_id, ([], 0.0))
+            
+            assignment = aco_distributed_pb2.WorkAssignment(
                 num_ants=self.num_ants_per_worker,
                 iteration=self.current_iteration,
                 pheromone_matrix=pheromone_flat,
@@ -156,10 +447,69 @@ class ACOMaster(aco_distributed_pb2_grpc.ACOMasterServiceServicer):
                 finished=False,
                 alpha=self.alpha,
                 beta=self.beta,
-                timestamp=response_time
+                timestamp=response_time,
+                pheromone_cached=pheromone_cached,
+                island=self.islands,
+                local_iterations=self._local_iterations(),
+                rho=self.rho,
+                q=self.q,
+                migrant_path=migrant_path,
+                migrant_cost=migrant_cost,
+                session_id=self.session_id,
+                graph_id=self.graph_id,
+                distance_cached=distance_cached,
+                seed=self.seed,
+                pheromone_streamed=pheromone_streamed,
+                distance_streamed=distance_streamed,
+                **self.strategy.work_options(self)
             )
+            self.payload_bytes.observe(assignment.ByteSize(), rpc="RequestWork")
+            return assignment
+    
+    def FetchMatrix(self, request, context):
+        """
+        Envia a matriz de distâncias ou de feromônios em blocos de
+        `chunk_rows` linhas. Os feromônios são lidos bloco a bloco sob o
+        lock; se forem atualizados no meio do envio, o stream é abortado
+        e o worker pede trabalho de novo.
+        """
+        self._mark_alive(request.worker_id)
+        if request.kind == "distance":
+            if request.graph_id != self.graph_id:
+                context.abort(grpc.StatusCode.NOT_FOUND, f"Grafo desconhecido: {request.graph_id}")
+            chunks = matrix_chunks(self.distance_matrix, self.chunk_rows, aco_distributed_pb2.MatrixChunk)
+        elif request.kind == "pheromone":
+            chunks = self._pheromone_chunks(request.iteration, context)
+        else:
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, f"Matriz desconhecida: {request.kind}")
+        
+        for chunk in chunks:
+            self.payload_bytes.observe(chunk.ByteSize(), rpc="FetchMatrix")
+            yield chunk
+    
+    def _pheromone_chunks(self, iteration, context):
+        with self.lock:
+            if iteration != self.current_iteration:
+                context.abort(grpc.StatusCode.FAILED_PRECONDITION, "Iteração obsoleta (Stale Data)")
+            version = self.pheromone_version
+        
+        for start in range(0, self.n, self.chunk_rows):
+            with self.lock:
+                if self.pheromone_version != version:
+                    context.abort(grpc.StatusCode.ABORTED, "Feromônios atualizados durante o envio")
+                values = [val for row in self.pheromone[start:start + self.chunk_rows] for val in row]
+            yield aco_distributed_pb2.MatrixChunk(row_start=start, values=values)
     
     def SubmitSolution(self, request, context):
+        return self._accept_solutions(request, [(list(request.path), request.cost)], "SubmitSolution")
+    
+    def SubmitSolutions(self, request, context):
+        """Lote com as melhores rotas do worker, concatenadas, da melhor para a pior"""
+        paths = split_tours(request.tours, request.tour_length)
+        return self._accept_solutions(request, list(zip(paths, request.costs)), "SubmitSolutions")
+    
+    def _accept_solutions(self, request, tours, rpc):
+        """Registra as rotas (caminho, custo) de um worker na iteração corrente e responde"""
         with self.lock:
             # Atualiza relógio de Lamport ao receber solução
             received_time = request.timestamp
@@ -169,7 +519,8 @@ class ACOMaster(aco_distributed_pb2_grpc.ACOMasterServiceServicer):
             iteration = request.iteration
             
             if iteration != self.current_iteration:
-                print(f"[Mestre] REJEITADO: Worker {worker_id} enviou dados da iteração {iteration} mas Mestre está na {self.current_iteration}.")
+                log.warning("[Mestre] REJEITADO: Worker %d enviou dados da iteração %d mas Mestre está na %d.",
+                            worker_id, iteration, self.current_iteration)
                 return aco_distributed_pb2.SolutionResponse(
                     accepted=False,
                     current_best_cost=self.best_cost,
@@ -177,33 +528,20 @@ class ACOMaster(aco_distributed_pb2_grpc.ACOMasterServiceServicer):
                     message="Iteração obsoleta (Stale Data)"
                 )
             
-            path = list(request.path)
-            cost = request.cost
-            
-            # Registra evento no log
-            self.event_log.append((current_time, "SUBMIT_SOLUTION", worker_id, received_time, cost))
+            self.payload_bytes.observe(request.ByteSize(), rpc=rpc)
+            self.ants_total.inc(self.num_ants_per_worker * self._local_iterations(), worker=worker_id)
             
-            print(f"[Mestre] Worker {worker_id} enviou solução | Lamport: {current_time} (recebido: {received_time}) | Iteração: {iteration} | Custo: {cost:.2f}")
+            # Registra evento no log (com o custo da melhor rota enviada)
+            cost = tours[0][1] if tours else math.inf
+            self.event_log.append(current_time, "SUBMIT_SOLUTION", worker_id, received_time, cost)
             
-            # Armazena solução com timestamp para ordenação
-            self.solutions_current_iteration.append((path, cost, received_time, worker_id))
-            self.workers_completed.add(worker_id)
+            log.debug("[Mestre] Worker %d enviou %d solução(ões) | Lamport: %d (recebido: %d) | Iteração: %d | Custo: %.2f",
+                      worker_id, len(tours), current_time, received_time, iteration, cost)
             
-
-            is_better_cost = cost < self.best_cost
-            is_tie_breaker = (cost == self.best_cost and received_time < self.best_timestamp)
-            
-            if is_better_cost or is_tie_breaker:
-                old_cost = self.best_cost
-                self.best_cost = cost
-                self.best_path = path
-                self.best_timestamp = received_time
-                
-                if is_better_cost:
-                    print(f"[Mestre] *** NOVA MELHOR SOLUÇÃO *** | Lamport: {current_time} | Custo: {cost:.2f} | Caminho: {path}")
-                else:
-                    # Caso de desempate por timestamp
-                    print(f"[Mestre] *** DESEMPATE POR LAMPORT *** | Worker {worker_id} | Timestamp: {received_time} < anterior | Custo: {cost:.2f}")
+            novel = False
+            for path, tour_cost in tours:
+                novel = self._record_solution(worker_id, iteration, path, tour_cost, received_time) or novel
+            self._mark_alive(worker_id)
             
             # Incrementa antes de enviar resposta
             response_time = self.lamport_clock.increment()
@@ -213,60 +551,111 @@ class ACOMaster(aco_distributed_pb2_grpc.ACOMasterServiceServicer):
                 current_best_cost=self.best_cost,
                 current_best_path=self.best_path if self.best_path else [],
                 message=f"Solução recebida do Worker {worker_id}",
-                timestamp=response_time
+                timestamp=response_time,
+                novel=novel
             )
             
             return response
     
+    def _record_solution(self, worker_id, iteration, path, cost, received_time):
+        """
+        Guarda a solução na iteração corrente e atualiza a melhor global
+        (chamar com self.lock). Devolve True se a rota ainda não estava no cache.
+        """
+        # Armazena solução com timestamp para ordenação
+        self.solutions_current_iteration.append((path, cost, received_time, worker_id))
+        self.workers_completed.add(worker_id)
+        
+        novel = self.solution_pool.add(path, cost)
+        if not novel:
+            self.repeated_solutions_total.inc()
+            log.debug("[Mestre] Worker %d enviou uma rota repetida | Custo: %.2f", worker_id, cost)
+        
+        is_better_cost = cost < self.best_cost
+        if self.seed is None:
+            is_tie_breaker = (cost == self.best_cost and received_time < self.best_timestamp)
+        else:
+            # Com semente o desempate não pode depender da ordem de chegada
+            is_tie_breaker = (cost == self.best_cost and (iteration, worker_id) < self.best_origin)
+        
+        # Rotas inviáveis (custo infinito, ver aco_engine.run_ant) nunca viram a melhor
+        if math.isfinite(cost) and (is_better_cost or is_tie_breaker):
+            self.best_cost = cost
+            self.best_path = path
+            self.best_timestamp = received_time
+            self.best_origin = (iteration, worker_id)
+            self.best_cost_gauge.set(cost)
+            
+            if is_better_cost:
+                log.info("[Mestre] *** NOVA MELHOR SOLUÇÃO *** | Lamport: %d | Custo: %.2f",
+                         self.lamport_clock.get_time(), cost)
+                log.debug("[Mestre] Caminho: %s", path)
+            else:
+                # Caso de desempate por timestamp
+                log.debug("[Mestre] *** DESEMPATE POR LAMPORT *** | Worker %d | Timestamp: %d < anterior | Custo: %.2f",
+                          worker_id, received_time, cost)
+        
+        return novel
+    
+    def _local_iterations(self):
+        """Iterações que cada worker executa na iteração atual do mestre (1 fora do modo ilhas)"""
+        if not self.islands:
+            return 1
+        done = self.current_iteration * self.migration_interval
+        return max(1, min(self.migration_interval, self.local_iterations_total - done))
+    
     def _update_pheromones(self):
-        """Atualiza feromônios com soluções coletadas"""
-        for i in range(self.n):
-            for j in range(self.n):
-                self.pheromone[i][j] *= (1 - self.rho)
-        
-        # Itera sobre soluções (path, cost, timestamp, worker_id)
-        for solution in self.solutions_current_iteration:
-            path = solution[0]
-            cost = solution[1]
-            deposit = self.q / cost
-            for idx in range(len(path)):
-                i = path[idx]
-                j = path[(idx + 1) % len(path)]
-                self.pheromone[i][j] += deposit
-                self.pheromone[j][i] += deposit
+        """Atualiza feromônios com soluções coletadas, segundo a estratégia configurada"""
+        # Ordem fixa (por worker) em vez da ordem de chegada: a soma dos depósitos
+        # em ponto flutuante dá o mesmo resultado em toda execução
+        self.solutions_current_iteration.sort(key=lambda solution: solution[3])
+        self.pheromone_version += 1
+        if self.islands:
+            self._plan_migration()
+            return
+        self.strategy.update(self)
+    
+    def _plan_migration(self):
+        """Modo ilhas: escolhe a rota que cada ilha recebe na próxima iteração"""
+        island_bests = {}
+        for path, cost, _, worker_id in self.solutions_current_iteration:
+            if worker_id not in island_bests or cost < island_bests[worker_id][1]:
+                island_bests[worker_id] = (path, cost)
+        
+        self.migrants = plan_migration(island_bests, self.topology, self.rng)
+        log.debug("[Mestre] Migração (%s): %s", self.topology,
+                  {dest: cost for dest, (_, cost) in self.migrants.items()})
     
     def print_event_log(self):
-        """Imprime log de eventos ordenados por timestamp de Lamport"""
-        if not self.event_log:
+        """Imprime os últimos eventos do log ordenados por timestamp de Lamport"""
+        if not len(self.event_log) or not log.isEnabledFor(logging.INFO):
             return
         
-        print(f"\n{'='*80}")
-        print(f"  LOG DE EVENTOS (Ordenação de Lamport)")
-        print(f"{'='*80}")
-        print(f"{'Lamport':<10} {'Evento':<20} {'Worker':<8} {'Recebido':<10} {'Extra':<20}")
-        print(f"{'-'*80}")
-        
-        # Ordena eventos por timestamp de Lamport
-        sorted_events = sorted(self.event_log, key=lambda x: x[0])
+        lines = [f"{'='*80}", "  LOG DE EVENTOS (Ordenação de Lamport)"]
+        if self.event_log.total_events > len(self.event_log):
+            lines.append(f"  Exibindo os últimos {len(self.event_log)} de {self.event_log.total_events} eventos")
+        if self.event_log.file_path:
+            lines.append(f"  Log completo em: {self.event_log.file_path}")
+        lines.append(f"{'='*80}")
+        lines.append(f"{'Lamport':<10} {'Evento':<20} {'Worker':<8} {'Recebido':<10} {'Extra':<20}")
+        lines.append(f"{'-'*80}")
         
-        for event in sorted_events:
-            lamport_time = event[0]
-            event_type = event[1]
-            worker_id = event[2]
+        # Ordena apenas o ring buffer (tamanho limitado)
+        for event in self.event_log.sorted_recent():
+            lamport_time, event_type, worker_id, received, cost = event
             
-            if len(event) >= 4:
-                received = event[3]
-            else:
+            if received is None:
                 received = "-"
             
-            if len(event) >= 5 and event_type == "SUBMIT_SOLUTION":
-                extra = f"custo={event[4]:.2f}"
+            if cost is not None and event_type == "SUBMIT_SOLUTION":
+                extra = f"custo={cost:.2f}"
             else:
                 extra = ""
             
-            print(f"{lamport_time:<10} {event_type:<20} {worker_id:<8} {received!s:<10} {extra:<20}")
+            lines.append(f"{lamport_time:<10} {event_type:<20} {worker_id:<8} {received!s:<10} {extra:<20}")
         
-        print(f"{'='*80}\n")
+        lines.append(f"{'='*80}")
+        log.info("\n".join(lines))
     
     def _execute_two_phase_commit(self):
         """
@@ -276,13 +665,17 @@ class ACOMaster(aco_distributed_pb2_grpc.ACOMasterServiceServicer):
         self.transaction_id += 1
         current_tx = self.transaction_id
         
-        print(f"\n[2PC] ========== TRANSACAO {current_tx} ==========")
+        log.debug("[2PC] ========== TRANSACAO %d ==========", current_tx)
+        
+        # Participam apenas os workers vivos que enviaram solução
+        stubs = self._participant_stubs()
         
         # FASE 1: PREPARE (Voting Phase)
-        print(f"[2PC] FASE 1: Enviando PREPARE para {len(self.worker_stubs)} worker(s)...")
+        log.debug("[2PC] FASE 1: Enviando PREPARE para %d worker(s)...", len(stubs))
         
+        prepare_start = time.perf_counter()
         votes = {}
-        for worker_id, stub in self.worker_stubs.items():
+        for worker_id, stub in stubs.items():
             try:
                 # Incrementa relógio antes de enviar PREPARE
                 prepare_time = self.lamport_clock.increment()
@@ -290,7 +683,8 @@ class ACOMaster(aco_distributed_pb2_grpc.ACOMasterServiceServicer):
                 request = aco_distributed_pb2.PrepareRequest(
                     transaction_id=current_tx,
                     iteration=self.current_iteration,
-                    timestamp=prepare_time
+                    timestamp=prepare_time,
+                    session_id=self.session_id
                 )
                 
                 response = stub.Prepare(request, timeout=5.0)
@@ -300,31 +694,40 @@ class ACOMaster(aco_distributed_pb2_grpc.ACOMasterServiceServicer):
                 if hasattr(response, 'timestamp') and response.timestamp > 0:
                     self.lamport_clock.update(response.timestamp)
                 
-                vote_str = "VOTE_YES" if response.vote_yes else "VOTE_NO"
-                print(f"[2PC] Worker {worker_id}: {vote_str} ({response.message})")
+                log.debug("[2PC] Worker %d: %s (%s)", worker_id,
+                          "VOTE_YES" if response.vote_yes else "VOTE_NO", response.message)
                 
             except grpc.RpcError as e:
-                print(f"[2PC] Worker {worker_id}: FALHA/TIMEOUT ({e.code()})")
+                log.warning("[2PC] Worker %d: FALHA/TIMEOUT (%s)", worker_id, e.code())
                 votes[worker_id] = False
+                # Sai da próxima tentativa; volta a participar se mandar novo heartbeat
+                self._remove_worker(worker_id, "falha no PREPARE")
+        
+        self.stage_seconds.observe(time.perf_counter() - prepare_start, stage="prepare")
         
         # Decisao: COMMIT apenas se TODOS votaram YES
-        all_yes = all(votes.values()) and len(votes) == len(self.worker_stubs)
+        all_yes = all(votes.values()) and len(votes) == len(stubs)
         
         # FASE 2: COMMIT ou ABORT
         if all_yes:
-            print(f"[2PC] DECISAO: COMMIT (todos votaram YES)")
-            print(f"[2PC] FASE 2: Atualizando feromônios...")
+            log.debug("[2PC] DECISAO: COMMIT (todos votaram YES)")
             
             # Atualiza feromônios localmente
-            self._update_pheromones()
-            print(f"[2PC] Feromônios atualizados com {len(self.solutions_current_iteration)} solucoes")
+            with self.stage_seconds.time(stage="update"):
+                self._update_pheromones()
+            log.debug("[2PC] Feromônios atualizados com %d solucoes", len(self.solutions_current_iteration))
             
             # Envia COMMIT com feromônios atualizados para todos workers
-            print(f"[2PC] FASE 2: Enviando COMMIT para worker(s)...")
-            pheromone_flat = [val for row in self.pheromone for val in row]
+            commit_start = time.perf_counter()
+            # No modo ilhas os feromônios ficam nos workers; com streaming o COMMIT vai
+            # sem matriz e o worker a busca com FetchMatrix no próximo pedido de trabalho
+            if self.islands or self.stream_matrices:
+                pheromone_flat = []
+            else:
+                pheromone_flat = [val for row in self.pheromone for val in row]
             
             commit_acks = 0
-            for worker_id, stub in self.worker_stubs.items():
+            for worker_id, stub in stubs.items():
                 try:
                     # Incrementa relógio antes de enviar COMMIT
                     commit_time = self.lamport_clock.increment()
@@ -334,29 +737,33 @@ class ACOMaster(aco_distributed_pb2_grpc.ACOMasterServiceServicer):
                         iteration=self.current_iteration,
                         updated_pheromone_matrix=pheromone_flat,
                         matrix_size=self.n,
-                        timestamp=commit_time
+                        timestamp=commit_time,
+                        session_id=self.session_id
                     )
                     
+                    self.payload_bytes.observe(request.ByteSize(), rpc="Commit")
                     response = stub.Commit(request, timeout=5.0)
                     if response.acknowledged:
                         commit_acks += 1
                         # Atualiza relógio com resposta do worker
                         if hasattr(response, 'timestamp') and response.timestamp > 0:
                             self.lamport_clock.update(response.timestamp)
-                        print(f"[2PC] Worker {worker_id}: ACK recebido")
+                        log.debug("[2PC] Worker %d: ACK recebido", worker_id)
                     
                 except grpc.RpcError as e:
-                    print(f"[2PC] Worker {worker_id}: Falha no ACK ({e.code()})")
+                    log.warning("[2PC] Worker %d: Falha no ACK (%s)", worker_id, e.code())
             
-            print(f"[2PC] COMMIT concluído ({commit_acks}/{len(self.worker_stubs)} ACKs)")
+            self.stage_seconds.observe(time.perf_counter() - commit_start, stage="commit")
+            self.commits_total.inc()
+            log.info("[2PC] Transação %d: COMMIT concluído (%d/%d ACKs)", current_tx, commit_acks, len(stubs))
             return True
             
         else:
-            print(f"[2PC] DECISAO: ABORT (nem todos votaram YES)")
-            print(f"[2PC] FASE 2: Enviando ABORT para worker(s)...")
+            log.warning("[2PC] Transação %d: DECISAO ABORT (nem todos votaram YES)", current_tx)
             
             # Envia ABORT para todos workers
-            for worker_id, stub in self.worker_stubs.items():
+            abort_start = time.perf_counter()
+            for worker_id, stub in stubs.items():
                 try:
                     # Incrementa relógio antes de enviar ABORT
                     abort_time = self.lamport_clock.increment()
@@ -365,7 +772,8 @@ class ACOMaster(aco_distributed_pb2_grpc.ACOMasterServiceServicer):
                         transaction_id=current_tx,
                         iteration=self.current_iteration,
                         reason="Um ou mais workers nao estavam prontos",
-                        timestamp=abort_time
+                        timestamp=abort_time,
+                        session_id=self.session_id
                     )
                     
                     response = stub.Abort(request, timeout=5.0)
@@ -373,114 +781,207 @@ class ACOMaster(aco_distributed_pb2_grpc.ACOMasterServiceServicer):
                         # Atualiza relógio com resposta do worker
                         if hasattr(response, 'timestamp') and response.timestamp > 0:
                             self.lamport_clock.update(response.timestamp)
-                        print(f"[2PC] Worker {worker_id}: ABORT reconhecido")
+                        log.debug("[2PC] Worker %d: ABORT reconhecido", worker_id)
                     
                 except grpc.RpcError as e:
-                    print(f"[2PC] Worker {worker_id}: Falha no ABORT ({e.code()})")
+                    log.warning("[2PC] Worker %d: Falha no ABORT (%s)", worker_id, e.code())
             
-            print(f"[2PC] ABORT concluído (feromônios NAO atualizados)")
+            self.stage_seconds.observe(time.perf_counter() - abort_start, stage="abort")
+            self.aborts_total.inc()
+            log.debug("[2PC] ABORT concluído (feromônios NAO atualizados)")
             return False
     
     def run_coordination(self, expected_workers=2):
-        print(f"[Mestre] Aguardando {expected_workers} worker(s) para começar...\n")
+        # expected_workers é só o quórum inicial: depois valem os workers vivos (heartbeats)
+        log.info("[Mestre] Aguardando %d worker(s) para começar...", expected_workers)
         
         total_start_time = time.time()
         
         while self.current_iteration < self.total_iterations:
             iteration_start = time.time()
             
-            print(f"\n{'='*70}")
-            print(f"  ITERACAO {self.current_iteration + 1}/{self.total_iterations}")
-            print(f"  Melhor custo global: {self.best_cost if self.best_cost != math.inf else 'N/A'}")
-            print(f"{'='*70}\n")
+            with self.profiler.iteration(self.current_iteration + 1):
+                commit_success, num_solutions = self._run_iteration(expected_workers)
             
-            # Aguarda workers enviarem soluções
-            self._wait_for_workers(expected_workers)
+            if self.checkpoint_every > 0 and self.current_iteration % self.checkpoint_every == 0:
+                self.save_checkpoint()
             
-            # Executa protocolo 2PC para commit da iteração
-            commit_success = False
-            max_retries = 3
-            retry_count = 0
+            iteration_time = time.time() - iteration_start
+            self.history.append((self.current_iteration, self.best_cost, time.time() - total_start_time))
+            self.iteration_seconds.observe(iteration_time)
+            self.iteration_gauge.set(self.current_iteration)
+            log.info("[Mestre] Iteracao %d/%d %s | Soluções: %d | Melhor custo global: %.2f | Tempo: %.2fs",
+                     self.current_iteration, self.total_iterations,
+                     "COMMITADA" if commit_success else "ABORTADA",
+                     num_solutions, self.best_cost, iteration_time)
             
-            while not commit_success and retry_count < max_retries:
-                if retry_count > 0:
-                    print(f"\n[Mestre] Tentativa {retry_count + 1}/{max_retries} de commit...")
-                
-                with self.lock:
-                    commit_success = self._execute_two_phase_commit()
-                
-                if not commit_success:
-                    retry_count += 1
-                    if retry_count < max_retries:
-                        print(f"[Mestre] Aguardando 2s antes de tentar novamente...")
-                        time.sleep(2)
-            
-            if commit_success:
-                print(f"\n[Mestre] Iteracao {self.current_iteration + 1} COMMITADA com sucesso")
-                
-                with self.lock:
-                    self.solutions_current_iteration.clear()
-                    self.workers_completed.clear()
-                    self.current_iteration += 1
-            else:
-                print(f"\n[Mestre] ERRO: Iteracao {self.current_iteration + 1} ABORTADA apos {max_retries} tentativas")
-                print(f"[Mestre] Pulando para proxima iteracao...")
-                
-                with self.lock:
-                    self.solutions_current_iteration.clear()
-                    self.workers_completed.clear()
-                    self.current_iteration += 1
+            if self.on_iteration is not None and self.on_iteration(self) is False:
+                self.stop_reason = "interrompido pelo callback"
+                log.info("[Mestre] Execução interrompida pelo callback na iteração %d/%d",
+                         self.current_iteration, self.total_iterations)
+                break
             
-            iteration_time = time.time() - iteration_start
-            print(f"\n[Mestre] Tempo total da iteracao: {iteration_time:.2f}s\n")
+            if self.adaptive is not None:
+                self._adapt_parameters()
+            
+            if self.stopping.enabled and self.current_iteration < self.total_iterations:
+                # No modo ilhas a matriz do mestre não evolui: só os outros critérios valem
+                pheromone = None if self.islands else self.pheromone
+                with self.lock:
+                    reason = self.stopping.check(self.best_cost, time.time() - total_start_time, pheromone)
+                if self.stopping.last_entropy is not None:
+                    self.entropy_gauge.set(self.stopping.last_entropy)
+                if reason:
+                    self.stop_reason = reason
+                    log.info("[Mestre] Parada antecipada na iteração %d/%d: %s",
+                             self.current_iteration, self.total_iterations, reason)
+                    break
         
         total_duration = time.time() - total_start_time
+        self.total_duration = total_duration
         
+        # A partir daqui os workers recebem finished=True no próximo RequestWork
         with self.lock:
             self.finished = True
         
         # Imprime log de eventos ordenados
         self.print_event_log()
         
-        print(f"\n{'='*70}")
-        print(f"  ALGORITMO FINALIZADO!")
-        print(f"  Tempo Total de Execução: {total_duration:.4f} segundos")
-        print(f"  Melhor custo: {self.best_cost:.2f}")
-        print(f"  Melhor caminho: {self.best_path}")
-        print(f"  Timestamp Lamport: {self.best_timestamp}")
-        print(f"{'='*70}\n")
+        log.info("\n%s\n  ALGORITMO FINALIZADO!\n  Tempo Total de Execução: %.4f segundos\n"
+                 "  Melhor custo: %.2f\n  Melhor caminho: %s\n  Timestamp Lamport: %d\n  Soluções: %s\n%s",
+                 "=" * 70, total_duration, self.best_cost, self.best_path, self.best_timestamp,
+                 self.solution_pool.describe(), "=" * 70)
+    
+    def _adapt_parameters(self):
+        """Ajusta alpha/beta/rho para a próxima iteração; os workers recebem os novos valores no WorkAssignment"""
+        with self.lock:
+            action = self.adaptive.update(self)
+            alpha, beta, rho = self.alpha, self.beta, self.rho
+        
+        for name, value in (("alpha", alpha), ("beta", beta), ("rho", rho)):
+            self.parameter_gauge.set(value, name=name)
+        if action:
+            log.debug("[Mestre] Parâmetros (%s) | Alpha: %.3f | Beta: %.3f | Rho: %.3f | Diversidade: %.3f",
+                      action, alpha, beta, rho, self.adaptive.last_diversity)
+    
+    def _run_iteration(self, expected_workers):
+        """
+        Executa uma iteração: espera as soluções, roda o 2PC e avança a iteração.
+        Retorna (commit_success, número de soluções recebidas).
+        """
+        log.debug("[Mestre] ITERACAO %d/%d iniciada", self.current_iteration + 1, self.total_iterations)
+        
+        # Aguarda workers enviarem soluções
+        with self.stage_seconds.time(stage="wait"):
+            self._wait_for_workers(expected_workers)
+        
+        # Executa protocolo 2PC para commit da iteração
+        commit_success = False
+        max_retries = 3
+        retry_count = 0
+        
+        while not commit_success and retry_count < max_retries:
+            if retry_count > 0:
+                log.info("[Mestre] Tentativa %d/%d de commit...", retry_count + 1, max_retries)
+            
+            with self.lock:
+                commit_success = self._execute_two_phase_commit()
+            
+            if not commit_success:
+                retry_count += 1
+                if retry_count < max_retries:
+                    log.debug("[Mestre] Aguardando 2s antes de tentar novamente...")
+                    time.sleep(2)
+        
+        num_solutions = len(self.solutions_current_iteration)
+        
+        if not commit_success:
+            log.error("[Mestre] Iteracao %d ABORTADA apos %d tentativas, pulando para a proxima",
+                      self.current_iteration + 1, max_retries)
+        
+        with self.lock:
+            self.solutions_current_iteration.clear()
+            self.workers_completed.clear()
+            self.current_iteration += 1
+        
+        return commit_success, num_solutions
     
     def _wait_for_workers(self, expected_workers, timeout=60):
+        """
+        Barreira da iteração: espera a solução de todos os workers vivos.
+        Antes da primeira iteração espera também o quórum de `expected_workers`;
+        depois disso workers podem entrar e sair livremente.
+        """
         start_time = time.time()
         
         while True:
+            self._evict_dead()
+            live = self.membership.live()
             with self.lock:
-                if len(self.workers_completed) >= expected_workers:
-                    print(f"[Mestre] Todos os {expected_workers} workers completaram suas tarefas!")
-                    break
+                completed = set(self.workers_completed)
+            
+            if completed and live <= completed and (self.quorum_reached or len(completed) >= expected_workers):
+                self.quorum_reached = True
+                log.debug("[Mestre] Todos os %d workers vivos completaram suas tarefas!", len(completed))
+                break
             
             if time.time() - start_time > timeout:
-                with self.lock:
-                    completed = len(self.workers_completed)
-                print(f"[Mestre] TIMEOUT! Apenas {completed}/{expected_workers} workers responderam")
+                log.warning("[Mestre] TIMEOUT! Apenas %d/%d workers vivos responderam",
+                            len(completed & live), len(live))
                 break
             
             time.sleep(0.5)
 
 
-def start_server(port, graph_matrix, iterations, ants, workers):
+def start_server(port, graph_matrix, iterations, ants, workers, alpha=1.0, beta=3.0, rho=0.5, q=10,
+                 checkpoint_path=None, checkpoint_every=1, resume=False, warm_start_path=None,
+                 event_log_path=None, event_log_capacity=1000, metrics_port=0, profile_dir=None,
+                 strategy="as", strategy_opts=None, islands=False, migration_interval=10, topology="ring",
+                 stopping=None, adaptive=False, heartbeat_timeout=5.0, seed=None, channel_config=None,
+                 duplicates="merge", elite_size=10):
     master = ACOMaster(
         graph_matrix=graph_matrix,
         total_iterations=iterations,
-        num_ants=ants
+        num_ants=ants,
+        alpha=alpha,
+        beta=beta,
+        rho=rho,
+        q=q,
+        checkpoint_path=checkpoint_path,
+        checkpoint_every=checkpoint_every,
+        event_log_path=event_log_path,
+        event_log_capacity=event_log_capacity,
+        profile_dir=profile_dir,
+        strategy=strategy,
+        strategy_opts=strategy_opts,
+        islands=islands,
+        migration_interval=migration_interval,
+        topology=topology,
+        stopping=stopping,
+        adaptive=adaptive,
+        heartbeat_timeout=heartbeat_timeout,
+        seed=seed,
+        channel_config=channel_config,
+        duplicates=duplicates,
+        elite_size=elite_size
     )
     
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
+    if resume and checkpoint_path and os.path.exists(checkpoint_path):
+        master.restore(load_snapshot(checkpoint_path))
+    elif resume:
+        log.warning("[Mestre] Nenhum checkpoint em '%s', iniciando do zero", checkpoint_path)
+    elif warm_start_path:
+        master.warm_start(load_snapshot(warm_start_path))
+    
+    if metrics_port:
+        start_metrics_server(metrics_port, master.metrics)
+    
+    server = make_server(10, channel_config)
     aco_distributed_pb2_grpc.add_ACOMasterServiceServicer_to_server(master, server)
     server.add_insecure_port(f'[::]:{port}')
     server.start()
     
-    print(f"[Mestre] Servidor gRPC iniciado na porta {port}\n")
+    log.info("[Mestre] Servidor gRPC iniciado na porta %d", port)
     
     coordination_thread = threading.Thread(
         target=master.run_coordination,
@@ -491,13 +992,16 @@ def start_server(port, graph_matrix, iterations, ants, workers):
     
     try:
         coordination_thread.join()
-        print("\n[Mestre] Algoritmo concluído! Aguardando 5s antes de finalizar servidor...")
+        log.info("[Mestre] Algoritmo concluído! Aguardando 5s antes de finalizar servidor...")
         time.sleep(5)
     except KeyboardInterrupt:
-        print("\n\n[Mestre] Interrompido pelo usuário...")
+        log.warning("[Mestre] Interrompido pelo usuário...")
     finally:
+        master.close_checkpoints()
         server.stop(grace=5)
-        print("[Mestre] Servidor finalizado com sucesso.")
+        master.close_channels()
+        master.event_log.close()
+        log.info("[Mestre] Servidor finalizado com sucesso.")
 
 
 def main():
@@ -505,15 +1009,84 @@ def main():
     parser.add_argument('--port', type=int, default=50051, help='Porta do servidor (padrão: 50051)')
     parser.add_argument('--iterations', type=int, default=10, help='Número de iterações (padrão: 10)')
     parser.add_argument('--ants', type=int, default=5, help='Formigas por worker (padrão: 5)')
-    parser.add_argument('--workers', type=int, default=2, help='Número esperado de workers (padrão: 2)')
+    parser.add_argument('--workers', type=int, default=2,
+                        help='Workers necessários para começar; depois entram e saem livremente (padrão: 2)')
+    parser.add_argument('--heartbeat-timeout', type=float, default=5.0,
+                        help='Remove workers sem heartbeat há mais de N segundos (padrão: 5.0)')
     parser.add_argument('--graph', type=str, default='graphs/5_nodes.json', help='Caminho do arquivo JSON do grafo')
+    parser.add_argument('--alpha', type=float, default=1.0, help='Peso do feromônio na escolha (padrão: 1.0)')
+    parser.add_argument('--beta', type=float, default=3.0, help='Peso da heurística 1/distância (padrão: 3.0)')
+    parser.add_argument('--rho', type=float, default=0.5, help='Taxa de evaporação (padrão: 0.5)')
+    parser.add_argument('--q', type=float, default=10, help='Constante de depósito de feromônio (padrão: 10)')
+    parser.add_argument('--adaptive', action='store_true',
+                        help='Ajusta alpha, beta e rho a cada iteração conforme diversidade e melhora')
+    parser.add_argument('--seed', type=int, default=None,
+                        help='Semente da execução: mesmas rotas com os mesmos workers (padrão: não determinístico)')
+    parser.add_argument('--duplicates', type=str, default='merge', choices=DUPLICATE_MODES,
+                        help='Rotas repetidas na iteração: merge deposita uma vez com o peso de todas as cópias, '
+                             'skip deposita uma vez só (padrão: merge)')
+    parser.add_argument('--elite-size', type=int, default=10,
+                        help='Melhores rotas distintas mantidas para o relatório final (padrão: 10)')
+    parser.add_argument('--checkpoint', type=str, default=None,
+                        help='Arquivo de checkpoint (.npz); habilita checkpoints periódicos')
+    parser.add_argument('--checkpoint-every', type=int, default=1,
+                        help='Grava checkpoint a cada N iterações (padrão: 1)')
+    parser.add_argument('--resume', action='store_true',
+                        help='Retoma a execução a partir do arquivo de --checkpoint')
+    parser.add_argument('--warm-start', type=str, default=None,
+                        help='Checkpoint de uma execução anterior usado para inicializar os feromônios')
+    parser.add_argument('--event-log', type=str, default=None,
+                        help='Arquivo JSONL onde todos os eventos são gravados em streaming')
+    parser.add_argument('--event-log-capacity', type=int, default=1000,
+                        help='Quantidade de eventos mantidos em memória para o resumo final (padrão: 1000)')
+    parser.add_argument('--metrics-port', type=int, default=0,
+                        help='Porta HTTP do endpoint /metrics (padrão: 0 = desabilitado)')
+    parser.add_argument('--islands', action='store_true',
+                        help='Modo ilhas: cada worker mantém os próprios feromônios e só troca a melhor rota')
+    parser.add_argument('--migration-interval', type=int, default=10,
+                        help='No modo ilhas, iterações locais entre migrações (padrão: 10)')
+    parser.add_argument('--topology', type=str, default='ring', choices=TOPOLOGIES,
+                        help='No modo ilhas, topologia da migração: ring ou random (padrão: ring)')
+    add_profiling_arguments(parser)
+    add_strategy_arguments(parser)
+    add_stopping_arguments(parser)
+    add_grpc_arguments(parser)
+    add_logging_arguments(parser)
     
     args = parser.parse_args()
+    setup_logging(args.log_level, args.log_rate)
+    
+    if args.resume and not args.checkpoint:
+        parser.error('--resume requer --checkpoint')
     
-    print(f"Carregando grafo de: {args.graph}")
-    graph = load_graph_from_json(args.graph)
+    log.info("Carregando grafo de: %s", args.graph)
+    graph = load_graph_or_exit(args.graph)
     
-    start_server(args.port, graph, args.iterations, args.ants, args.workers)
+    start_server(args.port, graph, args.iterations, args.ants, args.workers,
+                 alpha=args.alpha,
+                 beta=args.beta,
+                 rho=args.rho,
+                 q=args.q,
+                 checkpoint_path=args.checkpoint,
+                 checkpoint_every=args.checkpoint_every,
+                 resume=args.resume,
+                 warm_start_path=args.warm_start,
+                 event_log_path=args.event_log,
+                 event_log_capacity=args.event_log_capacity,
+                 metrics_port=args.metrics_port,
+                 profile_dir=args.profile,
+                 strategy=args.strategy,
+                 strategy_opts=strategy_options(args),
+                 islands=args.islands,
+                 migration_interval=args.migration_interval,
+                 topology=args.topology,
+                 stopping=stopping_criteria(args),
+                 adaptive=args.adaptive,
+                 heartbeat_timeout=args.heartbeat_timeout,
+                 seed=args.seed,
+                 channel_config=grpc_config(args),
+                 duplicates=args.duplicates,
+                 elite_size=args.elite_size)
 
 
 if __name__ == '__main__':
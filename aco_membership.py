@@ -0,0 +1,48 @@
+import time
+import threading
+
+
+class Membership:
+    """
+    Workers vivos de um mestre, mantidos por heartbeats.
+
+    Qualquer mensagem do worker (Heartbeat, RequestWork, SubmitSolution)
+    conta como sinal de vida. Um worker sem sinal há mais de `timeout`
+    segundos é removido por `evict_dead`; um worker que avisa a saída ou
+    falha no 2PC é removido na hora. Se voltar a mandar heartbeats, entra
+    de novo.
+    """
+
+    def __init__(self, timeout=5.0):
+        self.timeout = timeout
+        self.last_seen = {}
+        self.lock = threading.Lock()
+
+    def beat(self, worker_id):
+        """Registra um sinal de vida; devolve True se o worker acabou de entrar"""
+        with self.lock:
+            joined = worker_id not in self.last_seen
+            self.last_seen[worker_id] = time.monotonic()
+            return joined
+
+    def remove(self, worker_id):
+        """Remove o worker (saída ou falha); devolve True se ele era membro"""
+        with self.lock:
+            return self.last_seen.pop(worker_id, None) is not None
+
+    def evict_dead(self):
+        """Remove e devolve os workers sem sinal de vida dentro do timeout"""
+        now = time.monotonic()
+        with self.lock:
+            dead = [worker_id for worker_id, seen in self.last_seen.items() if now - seen > self.timeout]
+            for worker_id in dead:
+                del self.last_seen[worker_id]
+        return dead
+
+    def live(self):
+        with self.lock:
+            return set(self.last_seen)
+
+    def __len__(self):
+        with self.lock:
+            return len(self.last_seen)
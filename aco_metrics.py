@@ -0,0 +1,230 @@
+import time
+import logging
+import threading
+
+
+log = logging.getLogger("aco.metrics")
+
+# Buckets padrão (segundos) para latências: de 100us até 60s
+LATENCY_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Buckets padrão (bytes) para tamanho de mensagens: de 64B até 64MB
+SIZE_BUCKETS = tuple(64 * 4 ** i for i in range(11))
+
+
+def _label_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def _format_labels(key, extra=None):
+    pairs = list(key)
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in pairs) + "}"
+
+
+class Counter:
+    """Contador monotônico (ex.: total de aborts)"""
+
+    kind = "counter"
+
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help = help_text
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = _label_key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def get(self, **labels):
+        with self.lock:
+            return self.values.get(_label_key(labels), 0)
+
+    def samples(self):
+        with self.lock:
+            if not self.values and self.kind == "counter":
+                return [(self.name, 0)]
+            return [(self.name + _format_labels(key), value) for key, value in self.values.items()]
+
+
+class Gauge(Counter):
+    """Valor instantâneo (ex.: melhor custo atual)"""
+
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        key = _label_key(labels)
+        with self.lock:
+            self.values[key] = value
+
+
+class Histogram:
+    """Histograma cumulativo no formato do Prometheus (_bucket, _sum, _count)"""
+
+    kind = "histogram"
+
+    def __init__(self, name, help_text, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(buckets)
+        self.series = {}
+        self.lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = _label_key(labels)
+        with self.lock:
+            series = self.series.get(key)
+            if series is None:
+                series = self.series[key] = [[0] * len(self.buckets), 0.0, 0]
+            counts = series[0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            series[1] += value
+            series[2] += 1
+
+    def time(self, **labels):
+        """Context manager que observa a duração do bloco"""
+        return _Timer(self, labels)
+
+    def sum(self, **labels):
+        with self.lock:
+            series = self.series.get(_label_key(labels))
+            return series[1] if series else 0.0
+
+    def count(self, **labels):
+        with self.lock:
+            series = self.series.get(_label_key(labels))
+            return series[2] if series else 0
+
+    def total(self):
+        """Soma das observações de todos os rótulos"""
+        with self.lock:
+            return sum(series[1] for series in self.series.values())
+
+    def samples(self):
+        result = []
+        with self.lock:
+            for key, (counts, total, count) in self.series.items():
+                for bound, bucket_count in zip(self.buckets, counts):
+                    result.append((self.name + "_bucket" + _format_labels(key, ("le", repr(float(bound)))), bucket_count))
+                result.append((self.name + "_bucket" + _format_labels(key, ("le", "+Inf")), count))
+                result.append((self.name + "_sum" + _format_labels(key), total))
+                result.append((self.name + "_count" + _format_labels(key), count))
+        return result
+
+
+class _Timer:
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start, **self.labels)
+        return False
+
+
+class MetricsRegistry:
+    """Conjunto de métricas de um processo (mestre ou worker)"""
+
+    def __init__(self):
+        self.metrics = {}
+        self.lock = threading.Lock()
+
+    def _get_or_create(self, cls, name, help_text, **kwargs):
+        with self.lock:
+            metric = self.metrics.get(name)
+            if metric is None:
+                metric = self.metrics[name] = cls(name, help_text, **kwargs)
+            return metric
+
+    def counter(self, name, help_text):
+        return self._get_or_create(Counter, name, help_text)
+
+    def gauge(self, name, help_text):
+        return self._get_or_create(Gauge, name, help_text)
+
+    def histogram(self, name, help_text, buckets=LATENCY_BUCKETS):
+        return self._get_or_create(Histogram, name, help_text, buckets=buckets)
+
+    def render(self):
+        """Exporta todas as métricas no formato texto do Prometheus"""
+        lines = []
+        with self.lock:
+            metrics = list(self.metrics.values())
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for sample_name, value in metric.samples():
+                lines.append(f"{sample_name} {value}")
+        return "\n".join(lines) + "\n"
+
+
+class TimedLock:
+    """
+    Lock que mede quanto tempo fica segurado.
+
+    Substitui um threading.Lock comum (mesma interface de context manager)
+    e registra cada período de posse no histograma informado.
+    """
+
+    def __init__(self, histogram):
+        self._lock = threading.Lock()
+        self.histogram = histogram
+        self.acquired_at = 0.0
+
+    def acquire(self, blocking=True, timeout=-1):
+        acquired = self._lock.acquire(blocking, timeout)
+        if acquired:
+            self.acquired_at = time.perf_counter()
+        return acquired
+
+    def release(self):
+        held = time.perf_counter() - self.acquired_at
+        self._lock.release()
+        self.histogram.observe(held)
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+        return False
+
+
+def start_metrics_server(port, registry):
+    """Sobe um servidor HTTP local que expõe /metrics em uma thread de fundo"""
+    # Importado só aqui: sem --metrics-port o worker não paga o import do http.server
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            log.debug("[Metrics] " + format, *args)
+
+    server = ThreadingHTTPServer(("", port), MetricsHandler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    log.info("[Metrics] Endpoint disponível em http://localhost:%d/metrics", port)
+    return server
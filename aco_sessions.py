@@ -0,0 +1,127 @@
+import time
+import logging
+import threading
+import grpc
+import aco_distributed_pb2
+import aco_distributed_pb2_grpc
+from utils_grpc import ChannelPool
+
+
+log = logging.getLogger("aco.sessions")
+
+
+class SessionRouter(aco_distributed_pb2_grpc.ACOMasterServiceServicer):
+    """
+    Serviço do mestre que hospeda várias sessões ACOMaster independentes
+    (uma por configuração) sobre o mesmo conjunto de workers.
+
+    Cada sessão continua com sua própria iteração, feromônios e 2PC; o
+    roteador só decide, a cada RequestWork, qual sessão ainda precisa da
+    solução daquele worker na iteração corrente (a com menos soluções
+    primeiro e, no empate, a atendida há mais tempo). Assim, enquanto uma sessão espera ou roda o 2PC, os workers
+    seguem ocupados com as outras. Sem sessão disponível o worker recebe
+    `idle=True`; quando o roteador é fechado e todas as sessões acabaram,
+    `finished=True`.
+    """
+
+    def __init__(self, channel_config=None):
+        self.sessions = {}
+        self.last_served = {}
+        self.lock = threading.Lock()
+        self.closed = False
+        # Canais 2PC para os workers, compartilhados por todas as sessões
+        self.channel_pool = ChannelPool(channel_config)
+
+    def add_session(self, master):
+        with self.lock:
+            self.sessions[master.session_id] = master
+        log.info("[Sessões] Sessão %s adicionada", master.session_id)
+
+    def remove_session(self, session_id):
+        with self.lock:
+            self.sessions.pop(session_id, None)
+            self.last_served.pop(session_id, None)
+
+    def close(self):
+        """Nenhuma sessão nova será adicionada: workers ociosos podem encerrar"""
+        with self.lock:
+            self.closed = True
+
+    def _pick_session(self, worker_id):
+        with self.lock:
+            sessions = list(self.sessions.values())
+            closed = self.closed
+
+        candidates = [
+            master for master in sessions
+            if not master.finished and worker_id not in master.workers_completed
+        ]
+        if not candidates:
+            all_done = closed and all(master.finished for master in sessions)
+            return None, all_done
+
+        with self.lock:
+            master = min(candidates, key=lambda m: (len(m.workers_completed), self.last_served.get(m.session_id, 0.0)))
+            self.last_served[master.session_id] = time.monotonic()
+        return master, False
+
+    def _ended_sessions(self, request):
+        """Sessões que o worker ainda guarda mas já terminaram ou não estão mais no roteador"""
+        with self.lock:
+            return [
+                session_id for session_id in request.session_pheromone_iterations
+                if session_id not in self.sessions or self.sessions[session_id].finished
+            ]
+
+    def RequestWork(self, request, context):
+        master, all_done = self._pick_session(request.worker_id)
+        # O worker mantém estado por sessão (feromônios, ilha): avisa quais pode descartar
+        ended = self._ended_sessions(request)
+
+        if master is None:
+            return aco_distributed_pb2.WorkAssignment(finished=all_done, idle=not all_done, ended_sessions=ended)
+
+        # Feromônios em cache no worker para a sessão escolhida
+        request.pheromone_iteration = request.session_pheromone_iterations.get(master.session_id, 0)
+        assignment = master.RequestWork(request, context)
+        if assignment.finished:
+            # A sessão terminou entre a escolha e o pedido: o worker não deve encerrar
+            return aco_distributed_pb2.WorkAssignment(idle=True, ended_sessions=ended + [master.session_id])
+        assignment.ended_sessions.extend(ended)
+        return assignment
+
+    def Heartbeat(self, request, context):
+        """Repassa o heartbeat a todas as sessões (cada uma mantém sua pertinência)"""
+        with self.lock:
+            sessions = list(self.sessions.values())
+        for master in sessions:
+            master.Heartbeat(request, context)
+        live = max((len(master.membership) for master in sessions), default=0)
+        return aco_distributed_pb2.HeartbeatResponse(ok=True, live_workers=live)
+
+    def FetchMatrix(self, request, context):
+        with self.lock:
+            master = self.sessions.get(request.session_id)
+
+        if master is None:
+            context.abort(grpc.StatusCode.NOT_FOUND, f"Sessão desconhecida: {request.session_id}")
+
+        return master.FetchMatrix(request, context)
+
+    def SubmitSolution(self, request, context):
+        return self._route_solution(request, context, "SubmitSolution")
+
+    def SubmitSolutions(self, request, context):
+        return self._route_solution(request, context, "SubmitSolutions")
+
+    def _route_solution(self, request, context, rpc):
+        with self.lock:
+            master = self.sessions.get(request.session_id)
+
+        if master is None:
+            return aco_distributed_pb2.SolutionResponse(
+                accepted=False,
+                message=f"Sessão desconhecida: {request.session_id}"
+            )
+
+        return getattr(master, rpc)(request, context)
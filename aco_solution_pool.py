@@ -0,0 +1,162 @@
+import bisect
+import hashlib
+import math
+from array import array
+from collections import OrderedDict
+
+
+# merge: cada rota distinta deposita uma vez, com peso = número de cópias
+# skip: cada rota distinta deposita uma vez, com peso 1
+DUPLICATE_MODES = ("merge", "skip")
+
+
+def canonical_tour(path):
+    """
+    Forma canônica de um ciclo: começa no menor nó e segue para o vizinho
+    de menor índice. Todas as rotações da rota, nos dois sentidos, têm a
+    mesma forma canônica.
+    """
+    path = list(path)
+    if not path:
+        return ()
+    start = path.index(min(path))
+    rotated = path[start:] + path[:start]
+    if len(rotated) > 2 and rotated[-1] < rotated[1]:
+        rotated = rotated[:1] + rotated[:0:-1]
+    return tuple(rotated)
+
+
+def tour_hash(path):
+    """Identificador curto (hex) da rota, igual para rotações e sentido inverso"""
+    canonical = array("q", canonical_tour(path))
+    return hashlib.blake2b(canonical.tobytes(), digest_size=8).hexdigest()
+
+
+def top_tours(candidates, k):
+    """
+    As `k` melhores rotas distintas entre `candidates` (custo, ordem,
+    caminho), como (caminho, custo) da melhor para a pior; no empate de
+    custo vale a ordem (ex.: número da formiga).
+    """
+    tours = []
+    seen = set()
+    for cost, _, path in sorted(candidates, key=lambda c: (c[0], c[1])):
+        canonical = canonical_tour(path)
+        if canonical in seen:
+            continue
+        seen.add(canonical)
+        tours.append((path, cost))
+        if len(tours) == k:
+            break
+    return tours
+
+
+def split_tours(nodes, n):
+    """Separa rotas de `n` nós concatenadas em uma só sequência (SolutionBatch.tours)"""
+    nodes = list(nodes)
+    return [nodes[start:start + n] for start in range(0, len(nodes), n)]
+
+
+class SolutionCache:
+    """
+    Cache LRU das últimas `capacity` rotas distintas recebidas (hash ->
+    vezes que foi vista). Uma rota que saiu do cache volta a contar como nova.
+    """
+
+    def __init__(self, capacity=10000):
+        self.capacity = capacity
+        self.seen = OrderedDict()
+
+    def add(self, key):
+        """Registra a rota; devolve True se ela não estava no cache"""
+        count = self.seen.pop(key, 0)
+        self.seen[key] = count + 1
+        if len(self.seen) > self.capacity:
+            self.seen.popitem(last=False)
+        return count == 0
+
+    def __contains__(self, key):
+        return key in self.seen
+
+    def __len__(self):
+        return len(self.seen)
+
+
+class ElitePool:
+    """As `size` melhores rotas distintas já recebidas, em ordem de custo (empate pelo hash)"""
+
+    def __init__(self, size=10):
+        self.size = size
+        self.entries = []  # (custo, hash, caminho)
+        self.keys = set()
+
+    def offer(self, key, path, cost):
+        """Tenta incluir a rota; devolve True se ela entrou no pool"""
+        if self.size <= 0 or key in self.keys:
+            return False
+        if len(self.entries) >= self.size and (cost, key) >= self.entries[-1][:2]:
+            return False
+        bisect.insort(self.entries, (cost, key, list(path)))
+        self.keys.add(key)
+        if len(self.entries) > self.size:
+            _, dropped, _ = self.entries.pop()
+            self.keys.discard(dropped)
+        return True
+
+    def tours(self):
+        """Lista de (custo, caminho), da melhor para a pior"""
+        return [(cost, path) for cost, _, path in self.entries]
+
+    def __len__(self):
+        return len(self.entries)
+
+
+class SolutionPool:
+    """
+    Rotas recebidas pelo mestre, identificadas pela forma canônica: diz se
+    uma solução é nova (cache LRU), mantém as melhores rotas distintas
+    (elite) e agrupa as repetidas da iteração antes do depósito de
+    feromônio (ver aco_strategies.iteration_deposits).
+    """
+
+    def __init__(self, cache_size=10000, elite_size=10, duplicates="merge"):
+        if duplicates not in DUPLICATE_MODES:
+            raise ValueError(f"Modo de rotas repetidas desconhecido: {duplicates}")
+        self.cache = SolutionCache(cache_size)
+        self.elite = ElitePool(elite_size)
+        self.duplicates = duplicates
+        self.received = 0
+        self.repeated = 0
+
+    def add(self, path, cost):
+        """Registra uma solução recebida; devolve True se a rota é nova"""
+        key = tour_hash(path)
+        novel = self.cache.add(key)
+        self.received += 1
+        if not novel:
+            self.repeated += 1
+        if math.isfinite(cost):
+            self.elite.offer(key, path, cost)
+        return novel
+
+    def deposits(self, solutions):
+        """
+        (caminho, custo, peso) de cada rota distinta entre as soluções
+        (caminho, custo, timestamp, worker_id) da iteração, na ordem da
+        primeira ocorrência. No modo merge o peso é o número de cópias, o
+        mesmo reforço de quando cada cópia depositava; no skip é sempre 1.
+        """
+        grouped = {}
+        for path, cost, _, _ in solutions:
+            canonical = canonical_tour(path)
+            if canonical in grouped:
+                grouped[canonical][2] += 1
+            else:
+                grouped[canonical] = [path, cost, 1]
+        if self.duplicates == "skip":
+            return [(path, cost, 1) for path, cost, _ in grouped.values()]
+        return [tuple(entry) for entry in grouped.values()]
+
+    def describe(self):
+        return (f"{self.received - self.repeated} rotas novas de {self.received} recebidas | "
+                f"elite: {[round(cost, 2) for cost, _ in self.elite.tours()]}")
@@ -0,0 +1,123 @@
+import time
+from dataclasses import dataclass, field
+import numpy as np
+from aco_local import LocalMaster
+from aco_convergence import StoppingCriteria
+from utils_gen_graphs import validate_matrix
+
+
+@dataclass
+class SolverResult:
+    """Resultado de ACOSolver.solve"""
+    best_path: list
+    best_cost: float
+    # (iteração, melhor custo até ela, segundos desde o início)
+    history: list = field(default_factory=list)
+    wall_time: float = 0.0
+    iterations: int = 0
+    stop_reason: str = None
+    # (custo, caminho) das melhores rotas distintas, da melhor para a pior
+    elite: list = field(default_factory=list)
+
+    @property
+    def costs(self):
+        """Melhor custo ao fim de cada iteração"""
+        return [cost for _, cost, _ in self.history]
+
+
+def distance_matrix_from_coordinates(coordinates):
+    """Matriz de distâncias euclidianas (lista de listas) a partir de pontos n x d"""
+    points = np.asarray(coordinates, dtype=np.float64)
+    if points.ndim != 2:
+        raise ValueError("As coordenadas devem ter formato (n, d)")
+    diff = points[:, None, :] - points[None, :, :]
+    return np.sqrt((diff ** 2).sum(axis=-1)).tolist()
+
+
+def as_distance_matrix(distances=None, coordinates=None):
+    """Aceita matriz (NumPy ou listas) ou coordenadas e devolve a matriz como listas"""
+    if (distances is None) == (coordinates is None):
+        raise ValueError("Informe exatamente um entre distances e coordinates")
+    if coordinates is not None:
+        matrix = distance_matrix_from_coordinates(coordinates)
+    else:
+        matrix = np.asarray(distances, dtype=np.float64).tolist()
+    return validate_matrix(matrix)
+
+
+class ACOSolver:
+    """
+    API Python do ACO: resolve um grafo neste processo (ver aco_local) e
+    devolve um SolverResult, sem arquivos, banners ou subprocessos.
+
+        solver = ACOSolver(iterations=50, num_ants=10, time_budget=2.0)
+        result = solver.solve(coordinates=pontos)
+        print(result.best_cost, result.best_path)
+
+    `callback(iteração, melhor custo, melhor caminho, segundos)` é chamado
+    ao fim de cada iteração; se devolver False a execução para. Os
+    critérios de parada (`time_budget`, `stagnation`, `target_cost`,
+    `entropy_threshold`) são os mesmos do mestre distribuído; `duplicates`
+    e `elite_size` controlam o SolutionPool (ver aco_solution_pool) e
+    `top_k` é o número de rotas de cada worker usadas na atualização.
+    """
+
+    def __init__(self, iterations=20, num_ants=10, workers=1, alpha=1.0, beta=3.0, rho=0.5, q=10,
+                 strategy="as", strategy_opts=None, engine="python", pool="thread", seed=None, adaptive=False,
+                 time_budget=None, stagnation=0, target_cost=None, entropy_threshold=None, callback=None,
+                 duplicates="merge", elite_size=10, top_k=1):
+        self.iterations = iterations
+        self.num_ants = num_ants
+        self.workers = workers
+        self.alpha = alpha
+        self.beta = beta
+        self.rho = rho
+        self.q = q
+        self.strategy = strategy
+        self.strategy_opts = strategy_opts
+        self.engine = engine
+        self.pool = pool
+        self.seed = seed
+        self.adaptive = adaptive
+        self.time_budget = time_budget
+        self.stagnation = stagnation
+        self.target_cost = target_cost
+        self.entropy_threshold = entropy_threshold
+        self.callback = callback
+        self.duplicates = duplicates
+        self.elite_size = elite_size
+        self.top_k = top_k
+
+    def _notify(self, master, start):
+        return self.callback(master.current_iteration, master.best_cost, master.best_path, time.time() - start)
+
+    def solve(self, distances=None, coordinates=None):
+        """Resolve o TSP da matriz `distances` (n x n) ou dos pontos `coordinates` (n x d)"""
+        graph = as_distance_matrix(distances, coordinates)
+        stopping = StoppingCriteria(stagnation=self.stagnation, target_cost=self.target_cost,
+                                    time_budget=self.time_budget, entropy_threshold=self.entropy_threshold)
+
+        master = LocalMaster(graph, workers=self.workers, engine=self.engine, pool=self.pool, top_k=self.top_k,
+                             total_iterations=self.iterations, num_ants=self.num_ants,
+                             alpha=self.alpha, beta=self.beta, rho=self.rho, q=self.q,
+                             strategy=self.strategy, strategy_opts=self.strategy_opts,
+                             stopping=stopping, adaptive=self.adaptive or None, seed=self.seed,
+                             duplicates=self.duplicates, elite_size=self.elite_size)
+
+        start = time.time()
+        if self.callback is not None:
+            master.on_iteration = lambda m: self._notify(m, start)
+        try:
+            master.run_coordination(self.workers)
+        finally:
+            master.close()
+
+        return SolverResult(
+            best_path=master.best_path,
+            best_cost=master.best_cost,
+            history=list(master.history),
+            wall_time=time.time() - start,
+            iterations=master.current_iteration,
+            stop_reason=master.stop_reason,
+            elite=master.solution_pool.elite.tours(),
+        )
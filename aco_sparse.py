@@ -0,0 +1,218 @@
+import math
+import random
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+
+
+class CSRGraph:
+    """
+    Grafo esparso em CSR (compressed sparse row).
+
+    Os vizinhos do nó i são indices[indptr[i]:indptr[i + 1]], em ordem
+    crescente, com os pesos nas mesmas posições de weights. Como nos
+    motores densos, uma aresta existe quando o peso na matriz é > 0.
+
+    Só as distâncias guardadas no worker crescem com n + arestas, não com
+    n². Os feromônios (listas n x n), a matriz do mestre e a transferência
+    (WorkAssignment e FetchMatrix) continuam densos.
+    """
+
+    def __init__(self, n):
+        self.n = n
+        self.indptr = array("q", [0])
+        self.indices = array("i")
+        self.weights = array("d")
+
+    @classmethod
+    def from_matrix(cls, matrix):
+        """CSR a partir de uma matriz densa (listas ou np.ndarray)"""
+        graph = cls(len(matrix))
+        for row in matrix:
+            graph.append_row(row)
+        return graph
+
+    @classmethod
+    def from_flat(cls, flat_values, n):
+        """CSR a partir de uma matriz achatada (protobuf), linha a linha"""
+        graph = cls(n)
+        for i in range(n):
+            graph.append_row(flat_values[i * n:(i + 1) * n])
+        return graph
+
+    @classmethod
+    def from_edges(cls, n, edges, symmetric=True):
+        """CSR a partir de arestas (i, j, peso); com `symmetric` cada aresta vale nos dois sentidos"""
+        rows = [{} for _ in range(n)]
+        for i, j, weight in edges:
+            if weight > 0 and i != j:
+                rows[i][j] = weight
+                if symmetric:
+                    rows[j][i] = weight
+        graph = cls(n)
+        for row in rows:
+            for j in sorted(row):
+                graph.indices.append(j)
+                graph.weights.append(row[j])
+            graph.indptr.append(len(graph.indices))
+        return graph
+
+    def append_row(self, row):
+        """Acrescenta a próxima linha (densa) do grafo; só os pesos > 0 são guardados"""
+        for j, weight in enumerate(row):
+            if weight > 0:
+                self.indices.append(j)
+                self.weights.append(weight)
+        self.indptr.append(len(self.indices))
+
+    def __setitem__(self, i, row):
+        """Monta o grafo a partir de um stream (utils_grpc.receive_matrix): as linhas chegam em ordem"""
+        if i != len(self.indptr) - 1:
+            raise IndexError(f"Linha {i} fora de ordem (esperada: {len(self.indptr) - 1})")
+        self.append_row(row)
+
+    def __len__(self):
+        return self.n
+
+    def weight(self, i, j):
+        """Peso da aresta i -> j, ou 0 se ela não existe"""
+        lo, hi = self.indptr[i], self.indptr[i + 1]
+        k = bisect_left(self.indices, j, lo, hi)
+        if k < hi and self.indices[k] == j:
+            return self.weights[k]
+        return 0.0
+
+    def heuristic(self, beta):
+        """(1 / peso)^beta de cada aresta, nas posições de weights (ver aco_engine.heuristic_matrix)"""
+        return array("d", ((1.0 / weight) ** beta for weight in self.weights))
+
+    @property
+    def edges(self):
+        """Número de arestas dirigidas armazenadas"""
+        return len(self.indices)
+
+    @property
+    def nbytes(self):
+        return sum(part.itemsize * len(part) for part in (self.indptr, self.indices, self.weights))
+
+    def to_matrix(self):
+        """Matriz densa (listas) equivalente, com 0 onde não há aresta"""
+        matrix = [[0.0] * self.n for _ in range(self.n)]
+        for i in range(self.n):
+            for k in range(self.indptr[i], self.indptr[i + 1]):
+                matrix[i][self.indices[k]] = self.weights[k]
+        return matrix
+
+
+def _construct_sparse(pheromone, graph, n, alpha, beta, start_node, rng, q0=None, local_rho=0.1, tau0=1.0, eta=None):
+    """
+    Construção com a regra do AS (ou do ACS, com `q0`) percorrendo só as
+    arestas existentes.
+
+    Para não entrar em becos sem saída, a formiga acompanha quantos
+    vizinhos ainda livres cada nó tem: um vizinho do nó atual que só
+    teria mais uma aresta livre (e não fecha o ciclo no início) precisa
+    ser visitado agora, e um que não tem nenhuma já torna o caminho
+    inviável. Num beco sem saída a formiga volta um passo e descarta o nó
+    de onde veio (até n retrocessos); se não houver saída, devolve o
+    caminho parcial com custo infinito. Em grafos completos nada é
+    forçado e as escolhas são as mesmas de aco_engine.run_ant.
+    """
+    indptr, indices, weights = graph.indptr, graph.indices, graph.weights
+    path = [start_node]
+    steps = []  # Peso de cada aresta do caminho
+    in_path = [False] * n
+    in_path[start_node] = True
+    # free[j]: vizinhos de j ainda fora do caminho
+    free = [indptr[j + 1] - indptr[j] for j in range(n)]
+    for k in range(indptr[start_node], indptr[start_node + 1]):
+        free[indices[k]] -= 1
+    # excluded[p]: nós já descartados como sucessores de path[p]
+    excluded = [set()]
+    backtracks = 0
+
+    while len(path) < n:
+        current = path[-1]
+        closing = len(path) == n - 1
+        tried = excluded[-1]
+
+        neighbors = []
+        probs = []
+        step_weights = []
+        forced = []
+        for k in range(indptr[current], indptr[current + 1]):
+            j = indices[k]
+            if in_path[j]:
+                continue
+            if not closing and (free[j] == 0 or (free[j] == 1 and graph.weight(j, start_node) <= 0)):
+                forced.append(j)
+            if j in tried:
+                continue
+            # O último nó precisa de uma aresta de volta ao início
+            if closing and graph.weight(j, start_node) <= 0:
+                continue
+            neighbors.append(j)
+            step_weights.append(weights[k])
+            tau = pheromone[current][j] if alpha == 1 else pheromone[current][j] ** alpha
+            probs.append(tau * (eta[k] if eta is not None else (1.0 / weights[k]) ** beta))
+
+        if forced:
+            # Só dá para seguir se houver um único nó forçado, ainda com saída
+            keep = [m for m, j in enumerate(neighbors) if j == forced[0]] if len(forced) == 1 and free[forced[0]] else []
+            neighbors = [neighbors[m] for m in keep]
+            step_weights = [step_weights[m] for m in keep]
+            probs = [probs[m] for m in keep]
+
+        if not neighbors:
+            if len(path) == 1 or backtracks >= n:
+                return path, math.inf
+            dead = path.pop()
+            steps.pop()
+            in_path[dead] = False
+            for k in range(indptr[dead], indptr[dead + 1]):
+                free[indices[k]] += 1
+            excluded.pop()
+            excluded[-1].add(dead)
+            backtracks += 1
+            continue
+
+        cumulative = list(accumulate(probs))
+        total = cumulative[-1]
+        if total == 0:
+            pick = rng.randrange(len(neighbors))
+        elif q0 is not None and rng.random() < q0:
+            pick = max(range(len(probs)), key=probs.__getitem__)
+        else:
+            pick = min(bisect_right(cumulative, rng.random() * total), len(neighbors) - 1)
+        next_node = neighbors[pick]
+
+        if q0 is not None:
+            # Atualização local do ACS (grafo simétrico)
+            decayed = (1 - local_rho) * pheromone[current][next_node] + local_rho * tau0
+            pheromone[current][next_node] = decayed
+            pheromone[next_node][current] = decayed
+
+        path.append(next_node)
+        steps.append(step_weights[pick])
+        in_path[next_node] = True
+        for k in range(indptr[next_node], indptr[next_node + 1]):
+            free[indices[k]] -= 1
+        excluded.append(set())
+
+    return path, sum(steps) + graph.weight(path[-1], start_node)
+
+
+def run_ant_sparse(pheromone, graph, n, alpha, beta, start_node, rng=random, eta=None):
+    """
+    Motor esparso: mesma regra proporcional de aco_engine.run_ant, mas cada
+    passo percorre só os vizinhos do nó no CSRGraph (custo proporcional ao
+    grau, não a n). Becos sem saída são contornados com retrocesso e rotas
+    inviáveis saem com custo infinito. `eta` vem de CSRGraph.heuristic.
+    """
+    return _construct_sparse(pheromone, graph, n, alpha, beta, start_node, rng, eta=eta)
+
+
+def run_ant_acs_sparse(pheromone, graph, n, alpha, beta, start_node, q0=0.9, local_rho=0.1, tau0=1.0,
+                       rng=random, eta=None):
+    """Regra do Ant Colony System no motor esparso (ver aco_engine.run_ant_acs)"""
+    return _construct_sparse(pheromone, graph, n, alpha, beta, start_node, rng, q0, local_rho, tau0, eta)
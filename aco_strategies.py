@@ -0,0 +1,304 @@
+import math
+import inspect
+
+
+def evaporate(pheromone, rho):
+    """Evapora todas as trilhas: tau = (1 - rho) * tau"""
+    keep = 1 - rho
+    for row in pheromone:
+        for j in range(len(row)):
+            row[j] *= keep
+
+
+def deposit(pheromone, path, amount):
+    """Deposita `amount` em todas as arestas do ciclo (grafo simétrico)"""
+    for idx in range(len(path)):
+        i = path[idx]
+        j = path[(idx + 1) % len(path)]
+        pheromone[i][j] += amount
+        pheromone[j][i] += amount
+
+
+def clamp(pheromone, tau_min, tau_max):
+    """Limita todas as trilhas ao intervalo [tau_min, tau_max]"""
+    for row in pheromone:
+        for j in range(len(row)):
+            if row[j] < tau_min:
+                row[j] = tau_min
+            elif row[j] > tau_max:
+                row[j] = tau_max
+
+
+def iteration_deposits(master):
+    """
+    (caminho, custo, peso) das soluções da iteração. Com um SolutionPool
+    (aco_solution_pool) as rotas repetidas depositam uma vez só; sem ele
+    cada solução deposita com peso 1.
+    """
+    if master.solution_pool is None:
+        return [(path, cost, 1) for path, cost, _, _ in master.solutions_current_iteration]
+    return master.solution_pool.deposits(master.solutions_current_iteration)
+
+
+def nearest_neighbor_cost(distance_matrix):
+    """Custo da rota do vizinho mais próximo a partir do nó 0 (estimativa inicial)"""
+    n = len(distance_matrix)
+    visited = [False] * n
+    visited[0] = True
+    current = 0
+    cost = 0
+    for _ in range(n - 1):
+        candidates = [j for j in range(n) if not visited[j] and distance_matrix[current][j] > 0]
+        if not candidates:
+            return math.inf
+        nxt = min(candidates, key=lambda j: distance_matrix[current][j])
+        cost += distance_matrix[current][nxt]
+        visited[nxt] = True
+        current = nxt
+    if distance_matrix[current][0] <= 0:
+        return math.inf
+    return cost + distance_matrix[current][0]
+
+
+class AntSystem:
+    """Ant System original: toda solução recebida deposita q / custo"""
+
+    name = "as"
+
+    def initial_pheromone(self, master):
+        return 1.0
+
+    def work_options(self, master):
+        """Campos extras do WorkAssignment que os workers precisam para esta estratégia"""
+        return {"strategy": self.name}
+
+    # Atributos calculados durante a execução, salvos no checkpoint (ver ACOMaster.snapshot)
+    state_fields = ()
+
+    def state(self):
+        return {field: getattr(self, field) for field in self.state_fields}
+
+    def load_state(self, state):
+        for field in self.state_fields:
+            if field in state:
+                setattr(self, field, state[field])
+
+    def update(self, master):
+        evaporate(master.pheromone, master.rho)
+
+        # Uma vez por rota distinta da iteração (ver iteration_deposits)
+        for path, cost, weight in iteration_deposits(master):
+            deposit(master.pheromone, path, weight * master.q / cost)
+
+    def describe(self):
+        return "Ant System"
+
+
+class ElitistAntSystem(AntSystem):
+    """AS + reforço extra de peso `e` na melhor rota global (best-so-far)"""
+
+    name = "elitist"
+
+    def __init__(self, elitist_weight=None):
+        self.elitist_weight = elitist_weight
+
+    def work_options(self, master):
+        if self.elitist_weight is None:
+            return super().work_options(master)
+        return {"strategy": self.name, "elitist_weight": self.elitist_weight}
+
+    def update(self, master):
+        super().update(master)
+
+        if master.best_path:
+            weight = self.elitist_weight if self.elitist_weight is not None else master.n
+            deposit(master.pheromone, master.best_path, weight * master.q / master.best_cost)
+
+    def describe(self):
+        return f"Elitist AS (e={self.elitist_weight if self.elitist_weight is not None else 'n'})"
+
+
+class RankBasedAntSystem(AntSystem):
+    """
+    AS rank-based: só as w-1 melhores soluções da iteração depositam,
+    com peso (w - r), e a melhor global deposita com peso w. Rotas
+    repetidas ocupam um único posto (multiplicado pelas cópias no modo
+    merge do SolutionPool).
+    """
+
+    name = "rank"
+
+    def __init__(self, rank_size=6):
+        self.rank_size = rank_size
+
+    def work_options(self, master):
+        return {"strategy": self.name, "rank_size": self.rank_size}
+
+    def update(self, master):
+        evaporate(master.pheromone, master.rho)
+
+        w = self.rank_size
+        # Ordenação estável: no empate vale a ordem por worker das soluções
+        ranked = sorted(iteration_deposits(master), key=lambda d: d[1])
+        for r, (path, cost, weight) in enumerate(ranked[:w - 1], start=1):
+            deposit(master.pheromone, path, weight * (w - r) * master.q / cost)
+
+        if master.best_path:
+            deposit(master.pheromone, master.best_path, w * master.q / master.best_cost)
+
+    def describe(self):
+        return f"Rank-based AS (w={self.rank_size})"
+
+
+class MaxMinAntSystem(AntSystem):
+    """
+    MAX-MIN Ant System (Stützle & Hoos).
+
+    Só uma rota deposita por iteração: a melhor da iteração e, a cada
+    `best_so_far_every` iterações, a melhor global. As trilhas ficam
+    limitadas a [tau_min, tau_max], com tau_max = q / (rho * C_best) e
+    tau_min derivado de p_best; a inicialização usa tau_max estimado pela
+    rota do vizinho mais próximo.
+    """
+
+    name = "mmas"
+    # Limites recalculados a partir do melhor custo
+    state_fields = ("tau_min", "tau_max")
+
+    def __init__(self, p_best=0.05, best_so_far_every=5):
+        self.p_best = p_best
+        self.best_so_far_every = best_so_far_every
+        self.tau_min = 0.0
+        self.tau_max = math.inf
+
+    def _bounds(self, master, best_cost):
+        tau_max = master.q / (master.rho * best_cost)
+        n = master.n
+        p_root = self.p_best ** (1.0 / n)
+        avg = max(n / 2.0 - 1, 1.0)
+        tau_min = tau_max * (1 - p_root) / (avg * p_root)
+        return min(tau_min, tau_max), tau_max
+
+    def initial_pheromone(self, master):
+        nn_cost = nearest_neighbor_cost(master.distance_matrix)
+        if not math.isfinite(nn_cost) or nn_cost <= 0:
+            return 1.0
+        self.tau_min, self.tau_max = self._bounds(master, nn_cost)
+        return self.tau_max
+
+    def work_options(self, master):
+        return {"strategy": self.name, "p_best": self.p_best, "best_so_far_every": self.best_so_far_every}
+
+    def update(self, master):
+        evaporate(master.pheromone, master.rho)
+
+        use_best_so_far = (self.best_so_far_every > 0
+                           and (master.current_iteration + 1) % self.best_so_far_every == 0)
+
+        if use_best_so_far and master.best_path:
+            path, cost = master.best_path, master.best_cost
+        elif master.solutions_current_iteration:
+            path, cost, _, _ = min(master.solutions_current_iteration, key=lambda s: (s[1], s[3]))
+        else:
+            path, cost = None, None
+
+        if path:
+            deposit(master.pheromone, path, master.q / cost)
+
+        if master.best_path and math.isfinite(master.best_cost):
+            self.tau_min, self.tau_max = self._bounds(master, master.best_cost)
+        clamp(master.pheromone, self.tau_min, self.tau_max)
+
+    def describe(self):
+        return f"MAX-MIN AS (p_best={self.p_best}, best-so-far a cada {self.best_so_far_every})"
+
+
+class AntColonySystem(AntSystem):
+    """
+    Ant Colony System (Dorigo & Gambardella).
+
+    Os workers usam a regra pseudo-aleatória proporcional (q0) e aplicam a
+    atualização local em uma cópia privada dos feromônios enquanto as
+    formigas andam. O mestre faz só a atualização global, e apenas nas
+    arestas da melhor rota global: tau = (1 - rho) * tau + rho * q / C_best.
+    """
+
+    name = "acs"
+    # tau0 vem da rota do vizinho mais próximo, calculada no início
+    state_fields = ("tau0",)
+
+    def __init__(self, q0=0.9, local_rho=0.1):
+        self.q0 = q0
+        self.local_rho = local_rho
+        self.tau0 = 1.0
+
+    def initial_pheromone(self, master):
+        nn_cost = nearest_neighbor_cost(master.distance_matrix)
+        if math.isfinite(nn_cost) and nn_cost > 0:
+            self.tau0 = master.q / (master.n * nn_cost)
+        return self.tau0
+
+    def work_options(self, master):
+        return {"strategy": self.name, "q0": self.q0, "local_rho": self.local_rho, "tau0": self.tau0}
+
+    def update(self, master):
+        if not master.best_path:
+            return
+
+        path = master.best_path
+        amount = master.rho * master.q / master.best_cost
+        keep = 1 - master.rho
+        for idx in range(len(path)):
+            i = path[idx]
+            j = path[(idx + 1) % len(path)]
+            master.pheromone[i][j] = keep * master.pheromone[i][j] + amount
+            master.pheromone[j][i] = master.pheromone[i][j]
+
+    def describe(self):
+        return f"Ant Colony System (q0={self.q0}, rho local={self.local_rho})"
+
+
+STRATEGIES = {
+    AntSystem.name: AntSystem,
+    ElitistAntSystem.name: ElitistAntSystem,
+    RankBasedAntSystem.name: RankBasedAntSystem,
+    MaxMinAntSystem.name: MaxMinAntSystem,
+    AntColonySystem.name: AntColonySystem,
+}
+
+
+def make_strategy(name, **options):
+    """Cria a estratégia pelo nome, ignorando opções que ela não usa (None)"""
+    cls = STRATEGIES[name]
+    accepted = inspect.signature(cls).parameters
+    return cls(**{k: v for k, v in options.items() if k in accepted and v is not None})
+
+
+def add_strategy_arguments(parser):
+    """Opções de linha de comando das estratégias de atualização"""
+    parser.add_argument('--strategy', type=str, default='as', choices=sorted(STRATEGIES),
+                        help='Atualização de feromônios: as, elitist, rank, mmas ou acs (padrão: as)')
+    parser.add_argument('--elitist-weight', type=float, default=None,
+                        help='Peso e da melhor rota no Elitist AS (padrão: número de nós)')
+    parser.add_argument('--rank-size', type=int, default=None,
+                        help='Número w de rotas ranqueadas no Rank-based AS (padrão: 6)')
+    parser.add_argument('--p-best', type=float, default=None,
+                        help='Probabilidade p_best usada para tau_min no MMAS (padrão: 0.05)')
+    parser.add_argument('--best-so-far-every', type=int, default=None,
+                        help='No MMAS, deposita com a melhor global a cada N iterações (padrão: 5)')
+    parser.add_argument('--q0', type=float, default=None,
+                        help='No ACS, probabilidade de escolher a melhor aresta (padrão: 0.9)')
+    parser.add_argument('--local-rho', type=float, default=None,
+                        help='No ACS, taxa da atualização local feita pelos workers (padrão: 0.1)')
+
+
+def strategy_options(args):
+    """Extrai as opções de estratégia de um argparse.Namespace"""
+    return {
+        "elitist_weight": args.elitist_weight,
+        "rank_size": args.rank_size,
+        "p_best": args.p_best,
+        "best_so_far_every": args.best_so_far_every,
+        "q0": args.q0,
+        "local_rho": args.local_rho,
+    }
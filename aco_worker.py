@@ -1,11 +1,21 @@
+import math
 import time
 import random
+import logging
+from collections import OrderedDict
 import argparse
 import threading
-from concurrent import futures
-import grpc
-import aco_distributed_pb2
-import aco_distributed_pb2_grpc
+from utils_logging import setup_logging, add_logging_arguments
+from aco_metrics import MetricsRegistry, SIZE_BUCKETS, start_metrics_server
+from aco_engine import (ENGINES, ACS_ENGINES, prepare_matrix, prepare_distance, empty_matrix, empty_distance,
+                        heuristic_matrix, seeded_rng)
+from utils_profiling import IterationProfiler, add_profiling_arguments
+from aco_strategies import make_strategy
+from aco_island import Island
+from aco_solution_pool import top_tours
+
+
+log = logging.getLogger("aco.worker")
 
 
 class LamportClock:
@@ -41,37 +51,44 @@ class LamportClock:
             return self.time
 
 
-class TwoPhaseCommitServicer(aco_distributed_pb2_grpc.TwoPhaseCommitServiceServicer):
-    """Implementacao do servico 2PC no worker (participante)"""
+class TwoPhaseCommitServicer:
+    """
+    Implementacao do servico 2PC no worker (participante). Nao herda do
+    servicer gerado: o gRPC e os modulos gerados so sao importados quando
+    o worker fala com o mestre (ver ACOWorker.__init__)
+    """
     
     def __init__(self, worker):
         self.worker = worker
     
     def Prepare(self, request, context):
         """Fase 1: Worker vota se esta pronto para commitar"""
+        import aco_distributed_pb2
+        
         # Atualiza relógio de Lamport ao receber PREPARE
         received_time = request.timestamp
         current_time = self.worker.lamport_clock.update(received_time)
         
-        print(f"\n[2PC] Recebi PREPARE para transacao {request.transaction_id} | Lamport: {current_time}")
+        log.debug("[2PC] Recebi PREPARE para transacao %d | Lamport: %d", request.transaction_id, current_time)
         
-        # Verifica se worker esta pronto (terminou de executar formigas)
-        is_ready = self.worker.is_ready_for_commit()
+        # Verifica se worker esta pronto (terminou de executar formigas) nesta sessao
+        session = self.worker.session(request.session_id)
+        is_ready = self.worker.is_ready_for_commit(request.session_id)
         
         # Incrementa antes de enviar resposta
         response_time = self.worker.lamport_clock.increment()
         
         if is_ready:
-            print(f"[2PC] Votando: YES (pronto para commitar)")
+            log.debug("[2PC] Votando: YES (pronto para commitar)")
             return aco_distributed_pb2.PrepareResponse(
                 vote_yes=True,
                 worker_id=self.worker.worker_id,
                 message="Pronto para commitar",
-                solutions_count=self.worker.solutions_sent,
+                solutions_count=session.solutions_sent,
                 timestamp=response_time
             )
         else:
-            print(f"[2PC] Votando: NO (ainda processando)")
+            log.info("[2PC] Votando: NO (ainda processando)")
             return aco_distributed_pb2.PrepareResponse(
                 vote_yes=False,
                 worker_id=self.worker.worker_id,
@@ -82,6 +99,8 @@ class TwoPhaseCommitServicer(aco_distributed_pb2_grpc.TwoPhaseCommitServiceServi
     
     def Commit(self, request, context):
         """Fase 2: Mestre ordenou COMMIT"""
+        import aco_distributed_pb2
+        
         # Atualiza relógio de Lamport ao receber COMMIT
         received_time = request.timestamp if hasattr(request, 'timestamp') and request.timestamp > 0 else 0
         if received_time > 0:
@@ -89,21 +108,22 @@ class TwoPhaseCommitServicer(aco_distributed_pb2_grpc.TwoPhaseCommitServiceServi
         else:
             current_time = self.worker.lamport_clock.increment()
         
-        print(f"\n[2PC] Recebi COMMIT para transacao {request.transaction_id} | Lamport: {current_time}")
+        log.debug("[2PC] Recebi COMMIT para transacao %d | Lamport: %d", request.transaction_id, current_time)
+        
+        self.worker.payload_bytes.observe(request.ByteSize(), rpc="Commit")
         
-        # Salva novos feromonios recebidos do mestre
-        n = request.matrix_size
-        self.worker.pheromone_cache = [
-            [request.updated_pheromone_matrix[i*n + j] for j in range(n)]
-            for i in range(n)
-        ]
+        # Salva novos feromonios recebidos do mestre (achatados, como no protobuf);
+        # eles valem para a proxima iteracao. No modo ilhas o COMMIT vem sem matriz.
+        session = self.worker.session(request.session_id)
+        if request.updated_pheromone_matrix:
+            session.pheromone_cache = list(request.updated_pheromone_matrix)
+            session.pheromone_iteration = request.iteration + 1
         
-        print(f"[2PC] Feromonios atualizados localmente")
-        print(f"[2PC] Transacao {request.transaction_id} COMMITADA")
+        log.debug("[2PC] Transacao %d COMMITADA, feromonios atualizados localmente", request.transaction_id)
         
         # Reseta estado para proxima iteracao
-        self.worker.solutions_sent = 0
-        self.worker.ready_for_commit = False
+        session.solutions_sent = 0
+        session.ready_for_commit = False
         
         # Incrementa antes de enviar resposta
         response_time = self.worker.lamport_clock.increment()
@@ -117,6 +137,8 @@ class TwoPhaseCommitServicer(aco_distributed_pb2_grpc.TwoPhaseCommitServiceServi
     
     def Abort(self, request, context):
         """Fase 2: Mestre ordenou ABORT"""
+        import aco_distributed_pb2
+        
         # Atualiza relógio de Lamport ao receber ABORT
         received_time = request.timestamp if hasattr(request, 'timestamp') and request.timestamp > 0 else 0
         if received_time > 0:
@@ -124,15 +146,15 @@ class TwoPhaseCommitServicer(aco_distributed_pb2_grpc.TwoPhaseCommitServiceServi
         else:
             current_time = self.worker.lamport_clock.increment()
         
-        print(f"\n[2PC] Recebi ABORT para transacao {request.transaction_id} | Lamport: {current_time}")
-        print(f"[2PC] Motivo: {request.reason}")
+        log.warning("[2PC] Recebi ABORT para transacao %d | Lamport: %d | Motivo: %s",
+                    request.transaction_id, current_time, request.reason)
         
         # Descarta solucoes da iteracao atual (se houver)
-        self.worker.solutions_sent = 0
-        self.worker.ready_for_commit = False
+        session = self.worker.session(request.session_id)
+        session.solutions_sent = 0
+        session.ready_for_commit = False
         
-        print(f"[2PC] Transacao {request.transaction_id} ABORTADA")
-        print(f"[2PC] Estado resetado para proxima iteracao")
+        log.debug("[2PC] Transacao %d ABORTADA, estado resetado para proxima iteracao", request.transaction_id)
         
         # Incrementa antes de enviar resposta
         response_time = self.worker.lamport_clock.increment()
@@ -145,109 +167,412 @@ class TwoPhaseCommitServicer(aco_distributed_pb2_grpc.TwoPhaseCommitServiceServi
         )
 
 
+# Campos opcionais do WorkAssignment repassados a make_strategy (ver work_options das estratégias)
+STRATEGY_FIELDS = ("elitist_weight", "rank_size", "p_best", "best_so_far_every")
+
+
+def island_strategy(work):
+    """Estratégia da ilha com as mesmas opções da estratégia do mestre"""
+    options = {field: getattr(work, field) for field in STRATEGY_FIELDS if work.HasField(field)}
+    strategy = make_strategy(work.strategy, q0=work.q0, local_rho=work.local_rho, **options)
+    # ACS: o tau0 calculado pelo mestre (as outras estratégias não têm esse estado)
+    strategy.load_state({"tau0": work.tau0})
+    return strategy
+
+
+class WorkerSession:
+    """
+    Estado do worker em uma sessão do mestre: 2PC, feromônios do último
+    COMMIT e a ilha local. Um mestre comum usa só a sessão "".
+    """
+    
+    def __init__(self):
+        self.solutions_sent = 0
+        self.ready_for_commit = False
+        self.pheromone_cache = None
+        self.pheromone_iteration = 0  # Iteracao para a qual pheromone_cache vale (0 = nenhuma)
+        self.streamed_pheromone = None  # Feromônios da atribuição recebidos por FetchMatrix, já no formato do motor
+        self.island = None  # Colônia local no modo ilhas
+        self.island_graph = None  # graph_id para o qual a ilha foi criada
+
+
 class ACOWorker:
     
-    def __init__(self, worker_id, master_address, worker_port):
+    def __init__(self, worker_id, master_address, worker_port, metrics=None, engine="python", profile_dir=None,
+                 heartbeat_interval=1.0, direct=False, warm=False, channel_config=None, top_k=1):
+        self.started_at = time.perf_counter()
         self.worker_id = worker_id
         self.master_address = master_address
         self.worker_port = worker_port
         
+        # direct: sem servidor 2PC, os feromônios chegam no próximo RequestWork.
+        # warm: o processo não encerra no fim da execução e atende o próximo job
+        self.direct = direct
+        self.warm = warm
+        self.first_ant_logged = False
+        
+        # Rotas distintas enviadas por iteração: com mais de uma vão em lote (SubmitSolutions)
+        self.top_k = max(1, top_k)
+        
+        # Heartbeats periódicos mantêm o worker como membro vivo no mestre
+        self.heartbeat_interval = heartbeat_interval
+        self.heartbeat_stop = threading.Event()
+        self.heartbeat_thread = None
+        
+        # Motor de construção das rotas (python ou numpy)
+        self.engine = engine
+        self.construct = ENGINES[engine][0]
+        self.profiler = IterationProfiler(profile_dir, prefix=f"worker{worker_id}")
+        
+        # Instrumentação (exposta em /metrics quando --metrics-port é informado)
+        self.metrics = metrics if metrics is not None else MetricsRegistry()
+        self.ants_total = self.metrics.counter("aco_worker_ants_total", "Formigas executadas pelo worker")
+        self.ants_per_second = self.metrics.gauge(
+            "aco_worker_ants_per_second", "Formigas por segundo na última iteração")
+        self.construction_seconds = self.metrics.histogram(
+            "aco_worker_construction_seconds", "Tempo para executar todas as formigas de uma iteração")
+        self.rpc_seconds = self.metrics.histogram(
+            "aco_worker_rpc_seconds", "Latência das chamadas ao mestre")
+        self.payload_bytes = self.metrics.histogram(
+            "aco_worker_rpc_payload_bytes", "Tamanho serializado das mensagens recebidas/enviadas",
+            buckets=SIZE_BUCKETS)
+        
         # Relógio de Lamport
         self.lamport_clock = LamportClock()
         
-        # Estado para 2PC
-        self.solutions_sent = 0
-        self.ready_for_commit = False
-        self.pheromone_cache = None
+        # Estado para 2PC, por sessão (ver aco_sessions)
+        self.sessions = {}
+        self.sessions_lock = threading.Lock()
+        
+        # Matrizes de distância já preparadas, por graph_id (as mais antigas saem primeiro)
+        self.graph_cache = OrderedDict()
+        self.graph_cache_size = 8
+        # eta^beta de cada (graph_id, beta), descartado junto com o grafo
+        self.heuristic_cache = OrderedDict()
         
-        # Conecta ao mestre
-        self.master_channel = grpc.insecure_channel(master_address)
+        # Conecta ao mestre. O gRPC e os módulos gerados só são importados aqui
+        # (e nos métodos de rede): importar aco_worker não os carrega
+        import aco_distributed_pb2_grpc
+        from utils_grpc import create_channel
+        
+        self.channel_config = channel_config
+        self.master_channel = create_channel(master_address, channel_config)
         self.master_stub = aco_distributed_pb2_grpc.ACOMasterServiceStub(self.master_channel)
         
-        # Inicia servidor gRPC para receber chamadas 2PC do mestre
-        self._start_grpc_server()
+        # O servidor 2PC só sobe antes do primeiro envio de solução (ver _start_grpc_server),
+        # fora do caminho até a primeira formiga
+        self.grpc_server = None
         
-        print(f"\n{'='*60}")
-        print(f"  WORKER {self.worker_id} INICIADO COM 2PC")
-        print(f"  Conectado ao mestre: {master_address}")
-        print(f"  Servidor 2PC na porta: {worker_port}")
-        print(f"{'='*60}\n")
+        if direct:
+            log.info("WORKER %d INICIADO SEM 2PC (direct) | Mestre: %s", self.worker_id, master_address)
+        else:
+            log.info("WORKER %d INICIADO COM 2PC | Mestre: %s | Servidor 2PC na porta: %d",
+                     self.worker_id, master_address, worker_port)
     
     def _start_grpc_server(self):
-        """Inicia servidor gRPC para receber mensagens 2PC do mestre"""
-        self.grpc_server = grpc.server(futures.ThreadPoolExecutor(max_workers=5))
+        """Inicia servidor gRPC para receber mensagens 2PC do mestre (uma vez; nada no modo direct)"""
+        import aco_distributed_pb2_grpc
+        from utils_grpc import make_server
+        
+        if self.direct or self.grpc_server is not None:
+            return
+        self.grpc_server = make_server(5, self.channel_config)
         aco_distributed_pb2_grpc.add_TwoPhaseCommitServiceServicer_to_server(
             TwoPhaseCommitServicer(self), 
             self.grpc_server
         )
         self.grpc_server.add_insecure_port(f'[::]:{self.worker_port}')
         self.grpc_server.start()
-        print(f"[Worker {self.worker_id}] Servidor 2PC iniciado na porta {self.worker_port}")
+        log.debug("[Worker %d] Servidor 2PC iniciado na porta %d", self.worker_id, self.worker_port)
+    
+    def session(self, session_id=""):
+        """Estado do worker na sessão indicada (criado na primeira vez)"""
+        with self.sessions_lock:
+            session = self.sessions.get(session_id)
+            if session is None:
+                session = self.sessions[session_id] = WorkerSession()
+            return session
+    
+    def send_heartbeat(self, leaving=False):
+        """Avisa o mestre que o worker está vivo (ou saindo) e informa a porta 2PC"""
+        import grpc
+        import aco_distributed_pb2
+        
+        try:
+            self.master_stub.Heartbeat(aco_distributed_pb2.HeartbeatRequest(
+                worker_id=self.worker_id,
+                worker_port=0 if self.direct else self.worker_port,
+                leaving=leaving
+            ), timeout=2.0)
+            return True
+        except grpc.RpcError as e:
+            log.debug("[Worker %d] Falha no heartbeat: %s", self.worker_id, e.code())
+            return False
     
-    def is_ready_for_commit(self):
+    def _heartbeat_loop(self):
+        while not self.heartbeat_stop.wait(self.heartbeat_interval):
+            self.send_heartbeat()
+    
+    def start_heartbeats(self):
+        if self.heartbeat_interval <= 0 or self.heartbeat_thread is not None:
+            return
+        self.send_heartbeat()
+        self.heartbeat_thread = threading.Thread(target=self._heartbeat_loop, daemon=True)
+        self.heartbeat_thread.start()
+    
+    def stop_heartbeats(self, leaving=True):
+        if self.heartbeat_thread is None:
+            return
+        self.heartbeat_stop.set()
+        self.heartbeat_thread.join(timeout=self.heartbeat_interval + 2.0)
+        self.heartbeat_thread = None
+        if leaving:
+            self.send_heartbeat(leaving=True)
+    
+    def is_ready_for_commit(self, session_id=""):
         """Verifica se worker esta pronto para commitar"""
-        return self.ready_for_commit
+        return self.session(session_id).ready_for_commit
+    
+    def run_ant(self, pheromone, distance_matrix, n, alpha, beta, start_node, rng=random, eta=None):
+        """Constrói uma rota com o motor configurado (ver aco_engine.ENGINES)"""
+        return self.construct(pheromone, distance_matrix, n, alpha, beta, start_node, rng=rng, eta=eta)
     
-    def run_ant(self, pheromone, distance_matrix, n, alpha, beta, start_node):
-        visited = [start_node]
-        total_cost = 0
-        current = start_node
+    def _constructor(self, work, distance):
+        """
+        Função de construção para a estratégia da atribuição (ACS usa a regra
+        q0), já com o termo heurístico eta^beta do grafo (ver heuristic)
+        """
+        eta = self.heuristic(work, distance)
+        if work.strategy == "acs":
+            acs = ACS_ENGINES[self.engine]
+            return lambda *args, **kwargs: acs(*args, q0=work.q0, local_rho=work.local_rho, tau0=work.tau0, eta=eta,
+                                               **kwargs)
+        return lambda *args, **kwargs: self.run_ant(*args, eta=eta, **kwargs)
+    
+    def _ant_rng(self, work, *stream):
+        """
+        Gerador de uma formiga. Com semente na atribuição cada (worker,
+        iteração, formiga) tem seu próprio fluxo, então a mesma execução
+        com os mesmos workers reproduz exatamente as mesmas rotas.
+        """
+        if not work.HasField("seed"):
+            return random
+        return seeded_rng(work.seed, self.worker_id, work.iteration, *stream)
+    
+    def distance_matrix(self, work):
+        """Matriz de distâncias da atribuição, preparada uma vez por grafo e mantida em cache"""
+        if (work.distance_cached or work.distance_streamed) and work.graph_id in self.graph_cache:
+            self.graph_cache.move_to_end(work.graph_id)
+            return self.graph_cache[work.graph_id]
         
-        while len(visited) < n:
-            neighbors = []
-            for j in range(n):
-                if j != current and j not in visited and distance_matrix[current][j] > 0:
-                    neighbors.append(j)
-            
-            if not neighbors:
-                break
-            
-            probs = []
-            for next_node in neighbors:
-                tau = pheromone[current][next_node] ** alpha
-                eta = (1.0 / distance_matrix[current][next_node]) ** beta
-                probs.append(tau * eta)
+        distance = prepare_distance(self.engine, work.distance_matrix, work.matrix_size)
+        self._cache_graph(work.graph_id, distance)
+        return distance
+    
+    def _cache_graph(self, graph_id, distance):
+        if graph_id:
+            self.graph_cache[graph_id] = distance
+            while len(self.graph_cache) > self.graph_cache_size:
+                evicted, _ = self.graph_cache.popitem(last=False)
+                for key in [key for key in self.heuristic_cache if key[0] == evicted]:
+                    del self.heuristic_cache[key]
+    
+    def heuristic(self, work, distance):
+        """
+        Termo heurístico eta^beta do grafo da atribuição, calculado uma vez
+        por (graph_id, beta): com beta adaptativo cada valor novo gera uma
+        entrada, e só as graph_cache_size mais recentes ficam em cache.
+        """
+        if not work.graph_id:
+            return heuristic_matrix(self.engine, distance, work.beta)
+        key = (work.graph_id, work.beta)
+        eta = self.heuristic_cache.get(key)
+        if eta is None:
+            eta = self.heuristic_cache[key] = heuristic_matrix(self.engine, distance, work.beta)
+            while len(self.heuristic_cache) > self.graph_cache_size:
+                self.heuristic_cache.popitem(last=False)
+        else:
+            self.heuristic_cache.move_to_end(key)
+        return eta
+    
+    def fetch_matrix(self, work, kind):
+        """
+        Recebe uma matriz da atribuição por FetchMatrix, bloco a bloco, direto
+        na matriz já alocada no formato do motor: nunca existem ao mesmo tempo
+        a mensagem inteira, a lista achatada e a matriz.
+        """
+        import aco_distributed_pb2
+        from utils_grpc import receive_matrix
+        
+        request = aco_distributed_pb2.MatrixRequest(
+            worker_id=self.worker_id,
+            kind=kind,
+            session_id=work.session_id,
+            graph_id=work.graph_id,
+            iteration=work.iteration
+        )
+        empty = empty_distance if kind == "distance" else empty_matrix
+        matrix = empty(self.engine, work.matrix_size)
+        with self.rpc_seconds.time(rpc="FetchMatrix"):
+            chunks = self.master_stub.FetchMatrix(request)
+            return receive_matrix(chunks, work.matrix_size, matrix)
+    
+    def _fetch_streamed(self, work):
+        """Busca as matrizes que vieram fora da atribuição (ver WorkAssignment.*_streamed)"""
+        if work.distance_streamed and work.graph_id not in self.graph_cache:
+            self._cache_graph(work.graph_id, self.fetch_matrix(work, "distance"))
+        if work.pheromone_streamed:
+            self.session(work.session_id).streamed_pheromone = self.fetch_matrix(work, "pheromone")
+    
+    def _pheromone(self, work):
+        """Matriz de feromônios da atribuição no formato do motor (sempre uma cópia nova)"""
+        session = self.session(work.session_id)
+        if work.pheromone_streamed:
+            pheromone, session.streamed_pheromone = session.streamed_pheromone, None
+            return pheromone
+        pheromone_flat = session.pheromone_cache if work.pheromone_cached else work.pheromone_matrix
+        return prepare_matrix(self.engine, pheromone_flat, work.matrix_size)
+    
+    def run_island(self, work):
+        """
+        Modo ilhas: executa `local_iterations` iterações na colônia local e
+        devolve a melhor rota da ilha. Os feromônios do mestre só são usados
+        para criar a ilha; depois ela evolui sozinha, recebendo apenas as
+        rotas migrantes de outras ilhas.
+        """
+        iteration_start = time.time()
+        session = self.session(work.session_id)
+        
+        # A ilha só é recriada para um grafo novo na sessão: feromônios reenviados pelo
+        # mestre (worker --direct, COMMIT perdido) não substituem os feromônios locais
+        if session.island is None or session.island_graph != work.graph_id:
+            strategy = island_strategy(work)
+            session.island = Island(self._pheromone(work), strategy, work.rho, work.q)
+            session.island_graph = work.graph_id
+        else:
+            session.streamed_pheromone = None
+        island = session.island
+        
+        if work.migrant_path:
+            island.receive_migrant(list(work.migrant_path), work.migrant_cost)
+            log.debug("[Worker %d] Rota migrante recebida | Custo: %.2f", self.worker_id, work.migrant_cost)
+        
+        distance = self.distance_matrix(work)
+        construct = self._constructor(work, distance)
+        
+        mean_cost = 0.0
+        for local in range(work.local_iterations):
+            mean_cost = island.run_iteration(construct, distance, work.num_ants, work.alpha, work.beta,
+                                             self.worker_id, lambda ant_num: self._ant_rng(work, local, ant_num))
+        
+        # A ilha vale para a próxima iteração do mestre: não é preciso reenviar a matriz
+        session.pheromone_iteration = work.iteration + 1
+        
+        ants = work.num_ants * work.local_iterations
+        construction_time = time.time() - iteration_start
+        self.construction_seconds.observe(construction_time)
+        self.ants_total.inc(ants)
+        if construction_time > 0:
+            self.ants_per_second.set(ants / construction_time)
+        
+        log.info("[Worker %d] Iteracao %d | Ilha: %d iterações locais, %d formigas | Melhor da ilha: %.2f | "
+                 "Media (última): %.2f | Tempo: %.3fs",
+                 self.worker_id, work.iteration + 1, work.local_iterations, ants, island.best_cost,
+                 mean_cost, construction_time)
+        
+        # Só a melhor rota da ilha migra
+        return [(island.best_path, island.best_cost)]
+    
+    def run_ants(self, work):
+        """
+        Executa as formigas de uma atribuição e devolve as `top_k` melhores
+        rotas distintas como (caminho, custo), da melhor para a pior.
+        """
+        iteration_start = time.time()
+        
+        n = work.matrix_size
+        # A matriz é sempre nova: no ACS ela é a cópia privada que recebe as
+        # atualizações locais das formigas
+        pheromone = self._pheromone(work)
+        distance = self.distance_matrix(work)
+        construct = self._constructor(work, distance)
+        
+        best_local_cost = float('inf')
+        best_local_path = None
+        total_cost = 0.0
+        complete = []  # (custo, formiga, caminho) das rotas viáveis
+        
+        for ant_num in range(work.num_ants):
+            start_node = ant_num % n
+            path, cost = construct(pheromone, distance, n, work.alpha, work.beta, start_node,
+                                   rng=self._ant_rng(work, ant_num))
             
-            total = sum(probs)
-            if total == 0:
-                next_node = random.choice(neighbors)
-            else:
-                prob_norm = [p / total for p in probs]
-                next_node = random.choices(neighbors, weights=prob_norm, k=1)[0]
+            log.debug("[Worker %d] Formiga %d/%d | Inicio: No %d | Custo: %.2f | Caminho: %s",
+                      self.worker_id, ant_num + 1, work.num_ants, start_node, cost, path)
+            total_cost += cost
+            if self.top_k > 1 and math.isfinite(cost):
+                complete.append((cost, ant_num, path))
             
-            visited.append(next_node)
-            total_cost += distance_matrix[current][next_node]
-            current = next_node
+            if best_local_path is None or cost < best_local_cost:
+                best_local_cost = cost
+                best_local_path = path
+        
+        construction_time = time.time() - iteration_start
+        self.construction_seconds.observe(construction_time)
+        self.ants_total.inc(work.num_ants)
+        if construction_time > 0:
+            self.ants_per_second.set(work.num_ants / construction_time)
         
-        if len(visited) == n:
-            total_cost += distance_matrix[current][start_node]
+        log.info("[Worker %d] Iteracao %d | %d formigas | Melhor local: %.2f | Media: %.2f | Tempo: %.3fs",
+                 self.worker_id, work.iteration + 1, work.num_ants, best_local_cost,
+                 total_cost / max(work.num_ants, 1), construction_time)
         
-        return visited, total_cost
+        if self.top_k > 1 and complete:
+            return top_tours(complete, self.top_k)
+        return [(best_local_path, best_local_cost)]
     
     def request_work(self): # solicita trabalho ao master os dados necessários para executar
+        import grpc
+        import aco_distributed_pb2
+        
         try:
             # Incrementa relógio antes de enviar requisição
             current_time = self.lamport_clock.increment()
             
+            with self.sessions_lock:
+                cached = {sid: session.pheromone_iteration for sid, session in self.sessions.items()}
+            
             request = aco_distributed_pb2.WorkRequest(
                 worker_id=self.worker_id,
-                timestamp=current_time
+                timestamp=current_time,
+                pheromone_iteration=cached.get("", 0),
+                session_pheromone_iterations=cached,
+                cached_graphs=list(self.graph_cache),
+                direct_commit=self.direct
             )
             
-            response = self.master_stub.RequestWork(request)
+            with self.rpc_seconds.time(rpc="RequestWork"):
+                response = self.master_stub.RequestWork(request)
+            self.payload_bytes.observe(response.ByteSize(), rpc="RequestWork")
             
             # Atualiza relógio ao receber resposta
             if hasattr(response, 'timestamp') and response.timestamp > 0:
                 updated_time = self.lamport_clock.update(response.timestamp)
-                print(f"[Worker {self.worker_id}] Relógio atualizado: {updated_time} (recebido: {response.timestamp})")
+                log.debug("[Worker %d] Relógio atualizado: %d (recebido: %d)", self.worker_id, updated_time, response.timestamp)
+            
+            # Falha no meio de um stream: a atribuição é descartada e pedida de novo
+            self._fetch_streamed(response)
             
             return response
             
         except grpc.RpcError as e:
-            print(f"[Worker {self.worker_id}] ERRO ao solicitar trabalho: {e.code()}")
+            log.warning("[Worker %d] ERRO ao solicitar trabalho: %s", self.worker_id, e.code())
             return None
     
-    def submit_solution(self, path, cost, iteration): # cada worker devolve sua melhor solução local
+    def submit_solution(self, path, cost, iteration, session_id=""): # cada worker devolve sua melhor solução local
+        import grpc
+        import aco_distributed_pb2
+        
         try:
             # Incrementa relógio antes de enviar solução
             current_time = self.lamport_clock.increment()
@@ -257,116 +582,214 @@ class ACOWorker:
                 path=path,
                 cost=cost,
                 iteration=iteration,
-                timestamp=current_time
+                timestamp=current_time,
+                session_id=session_id
             )
             
-            print(f"[Worker {self.worker_id}] Enviando solução | Lamport: {current_time} | Custo: {cost:.2f}")
+            log.debug("[Worker %d] Enviando solução | Lamport: %d | Custo: %.2f", self.worker_id, current_time, cost)
             
-            response = self.master_stub.SubmitSolution(solution)
+            self.payload_bytes.observe(solution.ByteSize(), rpc="SubmitSolution")
+            with self.rpc_seconds.time(rpc="SubmitSolution"):
+                response = self.master_stub.SubmitSolution(solution)
             
     
             if hasattr(response, 'timestamp') and response.timestamp > 0:
                 self.lamport_clock.update(response.timestamp)
             
-            print(f"[Worker {self.worker_id}] Solução aceita! Melhor custo global: {response.current_best_cost:.2f}")
+            log.debug("[Worker %d] Solução aceita%s! Melhor custo global: %.2f", self.worker_id,
+                      "" if response.novel else " (rota repetida)", response.current_best_cost)
+            return response
+            
+        except grpc.RpcError as e:
+            log.warning("[Worker %d] ERRO ao enviar solução: %s", self.worker_id, e.code())
+            return None
+    
+    def submit_solutions(self, tours, iteration, session_id=""):
+        """Envia várias rotas (caminho, custo) em uma chamada, concatenadas em um campo packed"""
+        import grpc
+        import aco_distributed_pb2
+        
+        try:
+            current_time = self.lamport_clock.increment()
+            
+            batch = aco_distributed_pb2.SolutionBatch(
+                worker_id=self.worker_id,
+                iteration=iteration,
+                timestamp=current_time,
+                session_id=session_id,
+                tour_length=len(tours[0][0]),
+                tours=[node for path, _ in tours for node in path],
+                costs=[cost for _, cost in tours]
+            )
+            
+            log.debug("[Worker %d] Enviando %d soluções | Lamport: %d | Melhor custo: %.2f",
+                      self.worker_id, len(tours), current_time, tours[0][1])
+            
+            self.payload_bytes.observe(batch.ByteSize(), rpc="SubmitSolutions")
+            with self.rpc_seconds.time(rpc="SubmitSolutions"):
+                response = self.master_stub.SubmitSolutions(batch)
+            
+            if response.timestamp > 0:
+                self.lamport_clock.update(response.timestamp)
+            
+            log.debug("[Worker %d] Soluções aceitas! Melhor custo global: %.2f", self.worker_id, response.current_best_cost)
             return response
             
         except grpc.RpcError as e:
-            print(f"[Worker {self.worker_id}] ERRO ao enviar solução: {e.code()}")
+            log.warning("[Worker %d] ERRO ao enviar soluções: %s", self.worker_id, e.code())
             return None
     
+    def reset_sessions(self):
+        """Descarta o estado das sessões (feromônios em cache, ilhas); as matrizes de distância continuam em cache"""
+        with self.sessions_lock:
+            self.sessions.clear()
+    
+    def drop_sessions(self, session_ids):
+        """Descarta o estado das sessões que o mestre informou como encerradas (ver SessionRouter)"""
+        with self.sessions_lock:
+            for session_id in session_ids:
+                if self.sessions.pop(session_id, None) is not None:
+                    log.debug("[Worker %d] Sessão %s encerrada: estado descartado", self.worker_id, session_id)
+    
     def run(self):
-        print(f"[Worker {self.worker_id}] Iniciando execucao...\n")
+        log.info("[Worker %d] Iniciando execucao...", self.worker_id)
         
         iteration_count = 0
+        waiting_next_job = False
+        self.start_heartbeats()
         
         while True:
-            # Reseta estado para nova iteracao
-            self.ready_for_commit = False
-            self.solutions_sent = 0
-            
             work = self.request_work()
             
             if work is None:
-                print(f"[Worker {self.worker_id}] Falha ao solicitar trabalho. Tentando novamente em 2s...")
+                if self.warm:
+                    # Entre jobs o mestre pode estar fora do ar; um mestre novo recomeça as
+                    # iterações, então os feromônios em cache não valem mais
+                    log.debug("[Worker %d] Mestre indisponível, aguardando o próximo job...", self.worker_id)
+                    self.reset_sessions()
+                    time.sleep(0.5)
+                    continue
+                log.warning("[Worker %d] Falha ao solicitar trabalho. Tentando novamente em 2s...", self.worker_id)
                 time.sleep(2)
                 continue
             
+            if work.ended_sessions:
+                self.drop_sessions(work.ended_sessions)
+            
             if work.finished:
-                print(f"\n[Worker {self.worker_id}] Algoritmo finalizado pelo mestre!")
+                if self.warm:
+                    if not waiting_next_job:
+                        log.info("[Worker %d] Job finalizado pelo mestre; aguardando o próximo (warm)", self.worker_id)
+                        waiting_next_job = True
+                    self.reset_sessions()
+                    time.sleep(0.5)
+                    continue
+                log.info("[Worker %d] Algoritmo finalizado pelo mestre!", self.worker_id)
                 break
             
-            iteration_count += 1
-            print(f"\n{'='*60}")
-            print(f"  WORKER {self.worker_id} | ITERACAO {work.iteration + 1}")
-            print(f"  Executando {work.num_ants} formiga(s)...")
-            print(f"{'='*60}\n")
+            if work.idle:
+                # Todas as sessões já têm a solução deste worker e aguardam o 2PC
+                time.sleep(0.2)
+                continue
             
-            n = work.matrix_size
-            pheromone = [[work.pheromone_matrix[i * n + j] for j in range(n)] for i in range(n)]
-            distance = [[work.distance_matrix[i * n + j] for j in range(n)] for i in range(n)]
+            waiting_next_job = False
             
-            best_local_cost = float('inf')
-            best_local_path = None
+            # Reseta estado para nova iteracao
+            session = self.session(work.session_id)
+            session.ready_for_commit = False
+            session.solutions_sent = 0
             
-            for ant_num in range(work.num_ants):
-                start_node = ant_num % n
-                path, cost = self.run_ant(pheromone, distance, n, work.alpha, work.beta, start_node)
-                
-                print(f"[Worker {self.worker_id}] Formiga {ant_num + 1}/{work.num_ants} | Inicio: No {start_node} | Custo: {cost:.2f} | Caminho: {path}")
-                
-                if cost < best_local_cost:
-                    best_local_cost = cost
-                    best_local_path = path
+            iteration_count += 1
+            log.debug("[Worker %d] ITERACAO %d | Executando %d formiga(s)...", self.worker_id, work.iteration + 1, work.num_ants)
             
-            print(f"\n[Worker {self.worker_id}] Melhor solucao local: {best_local_cost:.2f}")
-            print(f"[Worker {self.worker_id}] Enviando ao mestre...")
+            if not self.first_ant_logged:
+                self.first_ant_logged = True
+                log.info("[Worker %d] Primeira atribuição %.3fs após iniciar", self.worker_id,
+                         time.perf_counter() - self.started_at)
             
-            response = self.submit_solution(best_local_path, best_local_cost, work.iteration)
+            with self.profiler.iteration(work.iteration + 1):
+                if work.island:
+                    tours = self.run_island(work)
+                else:
+                    tours = self.run_ants(work)
+                # O mestre só manda PREPARE depois de receber a solução
+                self._start_grpc_server()
+                if len(tours) > 1:
+                    response = self.submit_solutions(tours, work.iteration, work.session_id)
+                else:
+                    best_local_path, best_local_cost = tours[0]
+                    response = self.submit_solution(best_local_path, best_local_cost, work.iteration, work.session_id)
             
             if response:
-                self.solutions_sent += 1
-                self.ready_for_commit = True
-                print(f"[Worker {self.worker_id}] Pronto para 2PC (solucao enviada)")
+                session.solutions_sent += 1
+                session.ready_for_commit = True
+                log.debug("[Worker %d] Pronto para 2PC (solucao enviada)", self.worker_id)
             
-            # Aguarda mestre executar 2PC
-            # Worker fica esperando mensagens PREPARE/COMMIT/ABORT
-            print(f"[Worker {self.worker_id}] Aguardando protocolo 2PC do mestre...")
-            time.sleep(1.0)
+            # Com várias sessões o roteador já entrega trabalho de outra sessão
+            # enquanto esta roda o 2PC; com um mestre único, aguarda o protocolo
+            if not work.session_id and not self.direct:
+                # Worker fica esperando mensagens PREPARE/COMMIT/ABORT
+                log.debug("[Worker %d] Aguardando protocolo 2PC do mestre...", self.worker_id)
+                time.sleep(1.0)
         
-        print(f"\n{'='*60}")
-        print(f"  WORKER {self.worker_id} FINALIZADO")
-        print(f"  Total de iteracoes participadas: {iteration_count}")
-        print(f"{'='*60}\n")
+        log.info("WORKER %d FINALIZADO | Total de iteracoes participadas: %d", self.worker_id, iteration_count)
+        
+        self.stop_heartbeats(leaving=True)
         
         # Para servidor gRPC
-        self.grpc_server.stop(grace=2)
+        if self.grpc_server is not None:
+            self.grpc_server.stop(grace=2)
     
     def close(self):
+        self.stop_heartbeats(leaving=True)
         if self.master_channel:
             self.master_channel.close()
-            print(f"[Worker {self.worker_id}] Conexão com mestre encerrada.")
+            log.debug("[Worker %d] Conexão com mestre encerrada.", self.worker_id)
 
 
 def main():
+    from utils_grpc import add_grpc_arguments, grpc_config
+    
     parser = argparse.ArgumentParser(description='Worker ACO Distribuido com 2PC')
     parser.add_argument('--id', type=int, required=True, help='ID do worker')
     parser.add_argument('--master', type=str, default='localhost:50051', 
                        help='Endereco do mestre (padrao: localhost:50051)')
     parser.add_argument('--port', type=int, default=None,
                        help='Porta do servidor 2PC do worker (padrao: 50051 + ID)')
+    parser.add_argument('--metrics-port', type=int, default=0,
+                       help='Porta HTTP do endpoint /metrics (padrao: 0 = desabilitado)')
+    parser.add_argument('--engine', type=str, default='python', choices=sorted(ENGINES),
+                       help='Motor de construcao das rotas; sparse guarda so as distancias em CSR, '
+                            'os feromonios continuam n x n (padrao: python)')
+    parser.add_argument('--direct', action='store_true',
+                       help='Sem servidor 2PC: os feromonios atualizados chegam no proximo pedido de trabalho')
+    parser.add_argument('--warm', action='store_true',
+                       help='Nao encerra ao fim da execucao: o mesmo processo atende os proximos jobs')
+    parser.add_argument('--top-k', type=int, default=1,
+                       help='Melhores rotas distintas enviadas ao mestre por iteracao, em uma so chamada (padrao: 1)')
+    parser.add_argument('--heartbeat-interval', type=float, default=1.0,
+                       help='Intervalo entre heartbeats ao mestre em segundos (padrao: 1.0; 0 = desabilitado)')
+    add_profiling_arguments(parser)
+    add_grpc_arguments(parser)
+    add_logging_arguments(parser)
     
     args = parser.parse_args()
+    setup_logging(args.log_level, args.log_rate)
     
     # Se porta nao especificada, usa 50051 + worker_id
     worker_port = args.port if args.port else (50051 + args.id)
     
-    worker = ACOWorker(args.id, args.master, worker_port)
+    worker = ACOWorker(args.id, args.master, worker_port, engine=args.engine, profile_dir=args.profile,
+                       heartbeat_interval=args.heartbeat_interval, direct=args.direct, warm=args.warm,
+                       channel_config=grpc_config(args), top_k=args.top_k)
+    
+    if args.metrics_port:
+        start_metrics_server(args.metrics_port, worker.metrics)
     
     try:
         worker.run()
     except KeyboardInterrupt:
-        print(f"\n[Worker {args.id}] Interrompido pelo usuario...")
+        log.warning("[Worker %d] Interrompido pelo usuario...", args.id)
     finally:
         worker.close()
 
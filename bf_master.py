@@ -1,18 +1,27 @@
-import grpc
-from concurrent import futures
 import time
 import math
+import logging
 import argparse
 import threading
 import bruteforce_pb2
 import bruteforce_pb2_grpc
-from utils_gen_graphs import load_graph_from_json
+from utils_gen_graphs import load_graph_or_exit
+from utils_logging import setup_logging, add_logging_arguments
+from utils_grpc import DEFAULT_CONFIG, make_server, matrix_chunks, add_grpc_arguments, grpc_config
+
+
+log = logging.getLogger("bf.master")
 
 class BFMaster(bruteforce_pb2_grpc.BFServiceServicer):
-    def __init__(self, graph_matrix):
+    def __init__(self, graph_matrix, channel_config=None):
         self.matrix = graph_matrix
         self.n = len(graph_matrix)
         
+        # Matrizes maiores que um bloco não vão nas tarefas: o worker busca uma vez com FetchMatrix
+        config = channel_config or DEFAULT_CONFIG
+        self.chunk_rows = config.chunk_rows
+        self.stream_matrix = config.streams(self.n)
+        
         # Cria as tarefas: Fixa a cidade 0 e varia a segunda cidade
         # Ex: Tarefa 1 = Prefixo [0, 1], Tarefa 2 = Prefixo [0, 2]...
         # O Worker vai permutar o resto.
@@ -27,12 +36,11 @@ class BFMaster(bruteforce_pb2_grpc.BFServiceServicer):
         self.best_global_cost = math.inf
         
         self.start_time = time.time()
+        self.duration = None
         self.completed_tasks = 0
 
-        print(f"--- MASTER BRUTE FORCE INICIADO ---")
-        print(f"Cidades: {self.n}")
-        print(f"Tarefas geradas: {self.total_tasks} (Prefixos fixos)")
-        print(f"-----------------------------------")
+        log.info("MASTER BRUTE FORCE INICIADO | Cidades: %d | Tarefas geradas: %d (Prefixos fixos)",
+                 self.n, self.total_tasks)
 
     def GetTask(self, request, context):
         with self.lock:
@@ -41,27 +49,33 @@ class BFMaster(bruteforce_pb2_grpc.BFServiceServicer):
             
             # Pega a próxima tarefa da fila
             prefix = self.tasks.pop(0)
-            print(f"[Master] Enviando tarefa Prefixo {prefix} para Worker {request.worker_id}")
+            log.debug("[Master] Enviando tarefa Prefixo %s para Worker %d", prefix, request.worker_id)
             
             # Achata a matriz para envio
-            flat_matrix = [val for row in self.matrix for val in row]
+            flat_matrix = [] if self.stream_matrix else [val for row in self.matrix for val in row]
             
             return bruteforce_pb2.BFTask(
                 finished=False,
                 prefix=prefix,
                 distance_matrix=flat_matrix,
-                matrix_size=self.n
+                matrix_size=self.n,
+                distance_streamed=self.stream_matrix
             )
+    
+    def FetchMatrix(self, request, context):
+        log.debug("[Master] Enviando matriz em blocos de %d linhas para Worker %d", self.chunk_rows, request.worker_id)
+        return matrix_chunks(self.matrix, self.chunk_rows, bruteforce_pb2.MatrixChunk)
 
     def SubmitResult(self, request, context):
         with self.lock:
             self.completed_tasks += 1
-            print(f"[Master] Recebido de Worker {request.worker_id}: Custo {request.cost:.2f}")
+            log.debug("[Master] Recebido de Worker %d: Custo %.2f", request.worker_id, request.cost)
             
             if request.cost < self.best_global_cost:
                 self.best_global_cost = request.cost
                 self.best_global_path = list(request.path)
-                print(f"[Master] *** NOVO MELHOR GLOBAL: {self.best_global_cost:.2f} ***")
+                log.info("[Master] *** NOVO MELHOR GLOBAL: %.2f *** (%d/%d tarefas)",
+                         self.best_global_cost, self.completed_tasks, self.total_tasks)
 
             if self.completed_tasks == self.total_tasks:
                 self.finalize()
@@ -70,27 +84,30 @@ class BFMaster(bruteforce_pb2_grpc.BFServiceServicer):
 
     def finalize(self):
         duration = time.time() - self.start_time
-        print(f"\n{'='*60}")
-        print(f"FIM DO BRUTE FORCE DISTRIBUÍDO")
-        print(f"Tempo Total: {duration:.4f} segundos")
-        print(f"Melhor Custo: {self.best_global_cost:.2f}")
-        print(f"Melhor Caminho: {self.best_global_path}")
-        print(f"{'='*60}\n")
+        self.duration = duration
+        log.info("\n%s\nFIM DO BRUTE FORCE DISTRIBUÍDO\nTempo Total: %.4f segundos\n"
+                 "Melhor Custo: %.2f\nMelhor Caminho: %s\n%s",
+                 "=" * 60, duration, self.best_global_cost, self.best_global_path, "=" * 60)
 
 def serve():
     parser = argparse.ArgumentParser(description='Mestre Brute Force')
     parser.add_argument('--graph', type=str, default='graphs/5_nodes.json', help='Caminho do arquivo JSON do grafo')
+    parser.add_argument('--port', type=int, default=50052, help='Porta do servidor (padrão: 50052)')
+    add_grpc_arguments(parser)
+    add_logging_arguments(parser)
     args = parser.parse_args()
+    setup_logging(args.log_level, args.log_rate)
 
-    print(f"Carregando grafo de: {args.graph}")
-    graph = load_graph_from_json(args.graph)
+    log.info("Carregando grafo de: %s", args.graph)
+    graph = load_graph_or_exit(args.graph)
 
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
-    master = BFMaster(graph)
+    channel_config = grpc_config(args)
+    server = make_server(10, channel_config)
+    master = BFMaster(graph, channel_config)
     bruteforce_pb2_grpc.add_BFServiceServicer_to_server(master, server)
-    server.add_insecure_port('[::]:50052') 
+    server.add_insecure_port(f'[::]:{args.port}')
     server.start()
-    print("Servidor rodando na porta 50052...")
+    log.info("Servidor rodando na porta %d...", args.port)
     
     try:
         while master.completed_tasks < master.total_tasks:
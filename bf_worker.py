@@ -1,9 +1,15 @@
 import grpc
 import time
-import sys
+import logging
+import argparse
 import itertools
 import bruteforce_pb2
 import bruteforce_pb2_grpc
+from utils_logging import setup_logging, add_logging_arguments
+from utils_grpc import create_channel, receive_matrix, add_grpc_arguments, grpc_config
+
+
+log = logging.getLogger("bf.worker")
 
 def calculate_path_cost(path, matrix):
     cost = 0
@@ -15,30 +21,43 @@ def calculate_path_cost(path, matrix):
     cost += matrix[path[-1]][path[0]]
     return cost
 
-def run_worker(worker_id):
-    channel = grpc.insecure_channel('localhost:50052')
+def run_worker(worker_id, master_address='localhost:50052', step_delay=1.0, channel_config=None):
+    channel = create_channel(master_address, channel_config)
     stub = bruteforce_pb2_grpc.BFServiceStub(channel)
     
-    print(f"Worker {worker_id} conectado e pronto para força bruta...")
+    log.info("Worker %d conectado e pronto para força bruta...", worker_id)
+    
+    # Matriz recebida por streaming: a mesma para todas as tarefas deste mestre
+    streamed_matrix = None
 
     while True:
         # 1. Pede tarefa
         try:
             task = stub.GetTask(bruteforce_pb2.BFRequest(worker_id=worker_id))
         except grpc.RpcError:
-            print("Mestre indisponível. Encerrando.")
+            log.warning("Mestre indisponível. Encerrando.")
             break
 
         if task.finished:
-            print("Sem mais tarefas. Encerrando.")
+            log.info("Sem mais tarefas. Encerrando.")
             break
 
         # 2. Prepara dados
         n = task.matrix_size
-        matrix = []
-        for i in range(n):
-            row = task.distance_matrix[i*n : (i+1)*n]
-            matrix.append(row)
+        if task.distance_streamed:
+            if streamed_matrix is None:
+                try:
+                    streamed_matrix = receive_matrix(stub.FetchMatrix(bruteforce_pb2.BFRequest(worker_id=worker_id)),
+                                                     n, [None] * n)
+                except grpc.RpcError:
+                    log.warning("Falha ao receber a matriz do mestre. Encerrando.")
+                    break
+            matrix = streamed_matrix
+        else:
+            matrix = []
+            for i in range(n):
+                row = task.distance_matrix[i*n : (i+1)*n]
+                matrix.append(row)
         
         prefix = list(task.prefix) # Ex: [0, 2]
         
@@ -47,7 +66,8 @@ def run_worker(worker_id):
         visited_cities = set(prefix)
         missing_cities = list(all_cities - visited_cities)
         
-        print(f"[Worker {worker_id}] Processando prefixo {prefix}. Faltam: {missing_cities}")
+        log.debug("[Worker %d] Processando prefixo %s. Faltam: %s", worker_id, prefix, missing_cities)
+        task_start = time.time()
         
         # 3. Força Bruta Local (Permutação das cidades que faltam)
         best_local_cost = float('inf')
@@ -66,17 +86,28 @@ def run_worker(worker_id):
                 best_local_path = current_path
 
         # 4. Envia resultado
-        print(f"[Worker {worker_id}] Melhor local: {best_local_path} com custo {best_local_cost}")
+        log.info("[Worker %d] Prefixo %s concluído | Melhor local: %.2f | Tempo: %.3fs",
+                 worker_id, prefix, best_local_cost, time.time() - task_start)
+        log.debug("[Worker %d] Melhor caminho local: %s", worker_id, best_local_path)
         stub.SubmitResult(bruteforce_pb2.BFResult(
             worker_id=worker_id,
             path=best_local_path,
             cost=best_local_cost
         ))
         
-        time.sleep(1.0) # Simula delay de rede/processamento visual
+        time.sleep(step_delay) # Simula delay de rede/processamento visual
+
+def main():
+    parser = argparse.ArgumentParser(description='Worker Brute Force')
+    parser.add_argument('worker_id', type=int, help='ID do worker')
+    parser.add_argument('--master', type=str, default='localhost:50052',
+                        help='Endereço do mestre (padrão: localhost:50052)')
+    add_grpc_arguments(parser)
+    add_logging_arguments(parser)
+    args = parser.parse_args()
+    setup_logging(args.log_level, args.log_rate)
+
+    run_worker(args.worker_id, args.master, channel_config=grpc_config(args))
 
 if __name__ == '__main__':
-    if len(sys.argv) < 2:
-        print("Uso: python bf_worker.py <worker_id>")
-        sys.exit(1)
-    run_worker(int(sys.argv[1]))
\ No newline at end of file
+    main()
\ No newline at end of file
@@ -0,0 +1,32 @@
+import os
+import sys
+import json
+import pytest
+from grpc_tools import protoc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Os módulos gRPC não são versionados (ver generate_proto.sh): gera a partir do
+# .proto antes de importar os testes, para nunca usar uma cópia desatualizada
+if protoc.main(["grpc_tools.protoc", f"-I{ROOT}", f"--python_out={ROOT}", f"--grpc_python_out={ROOT}",
+                os.path.join(ROOT, "aco_distributed.proto")]) != 0:
+    raise RuntimeError("Falha ao gerar o código gRPC de aco_distributed.proto")
+
+sys.path.insert(0, ROOT)
+
+
+def load_graph(name):
+    with open(os.path.join(ROOT, "graphs", name)) as f:
+        return json.load(f)
+
+
+@pytest.fixture
+def graph():
+    """Grafo completo de 5 nós (graphs/5_nodes.json)"""
+    return load_graph("5_nodes.json")
+
+
+@pytest.fixture
+def graph10():
+    """Grafo completo de 10 nós (graphs/10_nodes.json)"""
+    return load_graph("10_nodes.json")
@@ -0,0 +1,55 @@
+import random
+import pytest
+from aco_engine import run_ant_acs
+from aco_master import ACOMaster
+from aco_strategies import nearest_neighbor_cost
+
+
+def edges(path):
+    return {frozenset((path[k], path[(k + 1) % len(path)])) for k in range(len(path))}
+
+
+def test_q0_one_is_the_greedy_rule(graph10):
+    n = len(graph10)
+    pheromone = [[1.0] * n for _ in range(n)]
+    path, _ = run_ant_acs(pheromone, graph10, n, 1.0, 3.0, 0, q0=1.0, local_rho=0.0, rng=random.Random(0))
+
+    # Com feromônio uniforme, sempre o vizinho livre mais próximo
+    for current, chosen in zip(path, path[1:]):
+        free = [j for j in range(n) if j not in path[:path.index(chosen)]]
+        assert graph10[current][chosen] == min(graph10[current][j] for j in free)
+
+
+def test_local_update_moves_visited_edges_toward_tau0(graph10):
+    n = len(graph10)
+    pheromone = [[2.0] * n for _ in range(n)]
+    path, _ = run_ant_acs(pheromone, graph10, n, 1.0, 3.0, 0, q0=0.5, local_rho=0.25, tau0=1.0,
+                          rng=random.Random(3))
+
+    # A aresta de volta ao início não é percorrida na construção
+    visited = edges(path) - {frozenset((path[-1], path[0]))}
+    for i in range(n):
+        for j in range(i + 1, n):
+            expected = 0.75 * 2.0 + 0.25 * 1.0 if frozenset((i, j)) in visited else 2.0
+            assert pheromone[i][j] == pheromone[j][i] == pytest.approx(expected)
+
+
+def test_global_update_only_reinforces_the_best_tour(graph10):
+    master = ACOMaster(graph10, strategy="acs", strategy_opts={"q0": 0.9, "local_rho": 0.1})
+    try:
+        tau0 = master.strategy.tau0
+        assert tau0 == pytest.approx(master.q / (master.n * nearest_neighbor_cost(graph10)))
+        assert master.strategy.work_options(master)["tau0"] == tau0
+
+        master.best_path, master.best_cost = list(range(master.n)), 100.0
+        master.strategy.update(master)
+
+        best = edges(master.best_path)
+        reinforced = (1 - master.rho) * tau0 + master.rho * master.q / 100.0
+        for i in range(master.n):
+            for j in range(i + 1, master.n):
+                expected = reinforced if frozenset((i, j)) in best else tau0
+                assert master.pheromone[i][j] == pytest.approx(expected)
+    finally:
+        master.event_log.close()
+
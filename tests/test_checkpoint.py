@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+from aco_checkpoint import CheckpointWriter, save_snapshot, load_snapshot, resize_pheromone
+from aco_master import ACOMaster
+
+
+@pytest.fixture
+def make_master(graph):
+    masters = []
+
+    def make(**options):
+        master = ACOMaster(graph, **options)
+        masters.append(master)
+        return master
+
+    yield make
+    for master in masters:
+        master.event_log.close()
+
+
+@pytest.mark.parametrize("strategy", ["mmas", "acs"])
+def test_checkpoint_round_trip(tmp_path, make_master, strategy):
+    master = make_master(strategy=strategy, adaptive=True)
+    master.pheromone[0][1] = master.pheromone[1][0] = 7.5
+    master.best_path, master.best_cost, master.best_timestamp = [0, 2, 3, 4, 1], 12.0, 9
+    master.current_iteration = 4
+    master.alpha, master.beta, master.rho = 1.5, 2.5, 0.3
+    for field in master.strategy.state_fields:
+        setattr(master.strategy, field, getattr(master.strategy, field) * 0.5)
+    master.adaptive.load_state({"initial": [1.0, 3.0, 0.5], "best_costs": [15.0, 12.0], "last_diversity": 0.4})
+
+    path = str(tmp_path / "state.npz")
+    with master.lock:
+        snapshot = master.snapshot()
+    save_snapshot(path, snapshot)
+
+    restored = make_master(strategy=strategy, adaptive=True)
+    restored.restore(load_snapshot(path))
+
+    assert restored.pheromone == master.pheromone
+    assert (restored.best_path, restored.best_cost, restored.best_timestamp) == ([0, 2, 3, 4, 1], 12.0, 9)
+    assert restored.current_iteration == 4
+    assert restored.lamport_clock.get_time() > snapshot["lamport_time"]
+    assert (restored.alpha, restored.beta, restored.rho) == (1.5, 2.5, 0.3)
+    assert restored.strategy.state_fields
+    assert restored.strategy.state() == master.strategy.state()
+    assert restored.adaptive.state() == master.adaptive.state()
+
+
+def test_restore_rejects_other_graph_sizes(tmp_path, make_master, graph10):
+    master = make_master()
+    path = str(tmp_path / "state.npz")
+    with master.lock:
+        save_snapshot(path, master.snapshot())
+
+    other = ACOMaster(graph10)
+    try:
+        with pytest.raises(ValueError):
+            other.restore(load_snapshot(path))
+    finally:
+        other.event_log.close()
+
+
+def test_checkpoint_writer_keeps_the_latest_snapshot(tmp_path, make_master):
+    master = make_master()
+    path = str(tmp_path / "sub" / "state.npz")
+    writer = CheckpointWriter(path)
+    for iteration in range(5):
+        master.current_iteration = iteration
+        with master.lock:
+            writer.submit(master.snapshot())
+    writer.close()
+    assert load_snapshot(path)["iteration"] == 4
+
+
+def test_resize_pheromone_keeps_the_common_block():
+    resized = np.asarray(resize_pheromone([[1.0, 2.0], [2.0, 3.0]], 3))
+    assert resized[:2, :2].tolist() == [[1.0, 2.0], [2.0, 3.0]]
+    assert resized[2, 2] == pytest.approx(2.0)
@@ -0,0 +1,48 @@
+import math
+import pytest
+from aco_convergence import StoppingCriteria, pheromone_entropy
+from aco_local import run_local
+
+
+def test_entropy_of_uniform_and_collapsed_pheromones():
+    n = 6
+    assert pheromone_entropy([[1.0] * n for _ in range(n)]) == pytest.approx(1.0)
+
+    # Todo o feromônio nas arestas de um ciclo: cada linha fica com duas arestas
+    ring = [[0.0] * n for _ in range(n)]
+    for i in range(n):
+        ring[i][(i + 1) % n] = ring[(i + 1) % n][i] = 1.0
+    assert pheromone_entropy(ring) == pytest.approx(math.log(2) / math.log(n - 1))
+
+
+def test_disabled_criteria_never_stop():
+    criteria = StoppingCriteria()
+    assert not criteria.enabled
+    assert criteria.check(10.0, 1e9) is None
+
+
+def test_stagnation_counts_iterations_without_improvement():
+    criteria = StoppingCriteria(stagnation=2)
+    assert criteria.check(10.0, 0) is None
+    assert criteria.check(10.0, 0) is None
+    assert criteria.check(9.0, 0) is None  # Melhorou: recomeça a contagem
+    assert criteria.check(9.0, 0) is None
+    assert criteria.check(9.0, 0) == "2 iterações sem melhora"
+
+
+def test_target_time_and_entropy():
+    assert StoppingCriteria(target_cost=10).check(10.0, 0) is not None
+    assert StoppingCriteria(target_cost=10).check(10.5, 0) is None
+    assert StoppingCriteria(time_budget=1.0).check(10.0, 1.5) is not None
+
+    criteria = StoppingCriteria(entropy_threshold=0.5)
+    assert criteria.check(10.0, 0, [[1.0] * 5 for _ in range(5)]) is None
+    assert criteria.last_entropy == pytest.approx(1.0)
+
+
+def test_run_stops_early_on_the_target_cost(graph10):
+    result = run_local(graph10, iterations=50, num_ants=5, workers=2, seed=1,
+                       stopping=StoppingCriteria(target_cost=math.inf))
+    assert result["iterations"] == 1
+    assert result["stop_reason"].startswith("custo alvo")
+    assert len(result["history"]) == 1
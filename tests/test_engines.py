@@ -0,0 +1,45 @@
+import pytest
+from aco_engine import ENGINES, ACS_ENGINES, prepare_matrix, prepare_distance, heuristic_matrix, seeded_rng
+
+
+def flat(matrix):
+    return [value for row in matrix for value in row]
+
+
+def pheromone_for(engine, n):
+    """Feromônios não uniformes, para as escolhas dependerem deles"""
+    return prepare_matrix(engine, [1.0 + ((i * 7 + j * 3) % 5) / 10 for i in range(n) for j in range(n)], n)
+
+
+def tours(engine, graph, seed, acs=False, use_eta=False):
+    n = len(graph)
+    distance = prepare_distance(engine, flat(graph), n)
+    eta = heuristic_matrix(engine, distance, 3.0) if use_eta else None
+    result = []
+    for ant in range(2 * n):
+        rng = seeded_rng(seed, 1, 0, ant)
+        if acs:
+            # O ACS altera os feromônios: cada formiga parte de uma cópia nova
+            result.append(ACS_ENGINES[engine](pheromone_for(engine, n), distance, n, 1.0, 3.0, ant % n,
+                                              q0=0.5, local_rho=0.1, tau0=0.5, rng=rng, eta=eta))
+        else:
+            result.append(ENGINES[engine][0](pheromone_for(engine, n), distance, n, 1.0, 3.0, ant % n,
+                                             rng=rng, eta=eta))
+    return [(path, pytest.approx(cost)) for path, cost in result]
+
+
+@pytest.mark.parametrize("acs", [False, True])
+def test_same_seed_gives_same_tours_on_every_engine(graph10, acs):
+    graph = graph10
+    expected = tours("python", graph, 42, acs)
+    for engine in ENGINES:
+        assert tours(engine, graph, 42, acs) == expected
+        assert tours(engine, graph, 42, acs, use_eta=True) == expected
+
+
+def test_seeded_rng_streams_are_independent_of_creation_order():
+    first = [seeded_rng(7, 1, 0, ant).random() for ant in range(5)]
+    second = [seeded_rng(7, 1, 0, ant).random() for ant in reversed(range(5))][::-1]
+    assert first == second
+    assert seeded_rng(7, 1, 0, 0).random() != seeded_rng(7, 2, 0, 0).random()
+    assert seeded_rng(7, 1, 0, 0).random() != seeded_rng(8, 1, 0, 0).random()
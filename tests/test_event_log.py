@@ -0,0 +1,47 @@
+import threading
+from aco_event_log import EventLog, read_events, merge_event_files
+
+
+def test_concurrent_appends_are_all_counted(tmp_path):
+    path = tmp_path / "events.jsonl"
+    log = EventLog(capacity=10, file_path=str(path))
+
+    def record(worker_id):
+        for t in range(500):
+            log.append(t, "REQUEST_WORK", worker_id)
+
+    threads = [threading.Thread(target=record, args=(w,)) for w in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    log.close()
+
+    assert log.total_events == 2000
+    assert len(log) == 10
+    assert len(read_events(str(path))) == 2000
+
+
+def test_read_events_sorts_out_of_order_files(tmp_path):
+    path = tmp_path / "events.jsonl"
+    log = EventLog(file_path=str(path))
+    for lamport, worker_id in [(3, 1), (1, 2), (2, 1), (1, 1)]:
+        log.append(lamport, "SUBMIT_SOLUTION", worker_id)
+    log.close()
+
+    events = read_events(str(path))
+    assert [(e["lamport"], e["worker"]) for e in events] == [(1, 1), (1, 2), (2, 1), (3, 1)]
+
+
+def test_merge_orders_by_lamport_then_source(tmp_path):
+    paths = []
+    for source, times in (("b", [2, 1]), ("a", [2, 3])):
+        path = tmp_path / f"{source}.jsonl"
+        log = EventLog(file_path=str(path), source=source)
+        for lamport in times:
+            log.append(lamport, "JOIN", 1)
+        log.close()
+        paths.append(str(path))
+
+    merged = [(e["lamport"], e["source"]) for e in merge_event_files(paths)]
+    assert merged == [(1, "b"), (2, "a"), (2, "b"), (3, "a")]
@@ -0,0 +1,34 @@
+import argparse
+import numpy as np
+import pytest
+from utils_gen_graphs import load_graph
+from utils_gen_instances import generate_instance, write_instance, instance_spec, KINDS
+
+
+@pytest.mark.parametrize("kind", KINDS)
+def test_instances_are_symmetric_and_seeded(kind):
+    matrix = np.array(generate_instance(kind, 30, seed=2, block_rows=7))
+    assert (matrix == matrix.T).all()
+    assert (np.diag(matrix) == 0).all()
+    assert (matrix[~np.eye(30, dtype=bool)] > 0).all()
+    assert (matrix == np.array(generate_instance(kind, 30, seed=2))).all()
+    assert not (matrix == np.array(generate_instance(kind, 30, seed=3))).all()
+
+
+@pytest.mark.parametrize("fmt, name, written", [
+    ("npy", "inst.npy", "inst.npy"),
+    ("npy", "inst.bin", "inst.bin.npy"),
+    ("coords", "inst", "inst.npz"),
+])
+def test_written_instances_load_back(tmp_path, fmt, name, written):
+    path = write_instance(str(tmp_path / name), "euclidean", 25, seed=1, fmt=fmt, block_rows=4)
+
+    assert path == str(tmp_path / written)
+    assert np.allclose(load_graph(path), generate_instance("euclidean", 25, seed=1))
+
+
+def test_instance_spec():
+    assert instance_spec("clustered:500") == ("clustered", 500)
+    for value in ("euclidean", "grid:10", "uniform:1", "uniform:x"):
+        with pytest.raises(argparse.ArgumentTypeError):
+            instance_spec(value)
@@ -0,0 +1,67 @@
+import pytest
+import aco_distributed_pb2
+from aco_master import ACOMaster
+from aco_worker import ACOWorker, island_strategy
+
+
+def island_for(graph, strategy, **strategy_opts):
+    """Estratégia que o worker monta para a ilha a partir do WorkAssignment do mestre"""
+    master = ACOMaster(graph, strategy=strategy, strategy_opts=strategy_opts, islands=True)
+    try:
+        work = aco_distributed_pb2.WorkAssignment(island=True, **master.strategy.work_options(master))
+        return master.strategy, island_strategy(aco_distributed_pb2.WorkAssignment.FromString(work.SerializeToString()))
+    finally:
+        master.event_log.close()
+
+
+@pytest.mark.parametrize("strategy, options", [
+    ("elitist", {"elitist_weight": 2.5}),
+    ("rank", {"rank_size": 3}),
+    ("mmas", {"p_best": 0.2, "best_so_far_every": 0}),
+    ("acs", {"q0": 0.5, "local_rho": 0.3}),
+])
+def test_island_strategy_uses_master_options(graph, strategy, options):
+    _, strategy_on_island = island_for(graph, strategy, **options)
+
+    assert strategy_on_island.name == strategy
+    for name, value in options.items():
+        assert getattr(strategy_on_island, name) == pytest.approx(value)
+
+
+def test_island_acs_uses_master_tau0(graph):
+    master_acs, island_acs = island_for(graph, "acs")
+    assert master_acs.tau0 != 1.0
+    assert island_acs.tau0 == pytest.approx(master_acs.tau0)
+
+
+def test_island_strategy_keeps_defaults(graph):
+    _, elitist = island_for(graph, "elitist")
+    assert elitist.elitist_weight is None
+
+    _, mmas = island_for(graph, "mmas")
+    assert (mmas.p_best, mmas.best_so_far_every) == (0.05, 5)
+
+
+def test_direct_worker_keeps_island_between_assignments(graph):
+    worker = ACOWorker(1, "localhost:1", 0, direct=True)
+    try:
+        def assignment(iteration, graph_id="g5"):
+            # Worker --direct: o mestre sempre reenvia os feromônios (pheromone_cached=False)
+            return aco_distributed_pb2.WorkAssignment(
+                num_ants=3, iteration=iteration, matrix_size=5, alpha=1.0, beta=3.0, rho=0.5, q=10,
+                pheromone_matrix=[1.0] * 25, distance_matrix=[d for row in graph for d in row],
+                island=True, local_iterations=2, strategy="as", graph_id=graph_id, seed=7)
+
+        worker.run_island(assignment(0))
+        island = worker.session().island
+        pheromone = [row[:] for row in island.pheromone]
+
+        worker.run_island(assignment(1))
+        assert worker.session().island is island
+        assert island.current_iteration == 4
+        assert island.pheromone != pheromone
+
+        worker.run_island(assignment(2, graph_id="outro"))
+        assert worker.session().island is not island
+    finally:
+        worker.close()
@@ -0,0 +1,37 @@
+import math
+import pytest
+from aco_local import run_local
+
+
+def run(graph, **options):
+    return run_local(graph, iterations=4, num_ants=5, workers=2, seed=3, **options)
+
+
+def test_seeded_runs_are_reproducible(graph10):
+    first, second = run(graph10), run(graph10)
+    assert first["best_path"] == second["best_path"]
+    assert first["history"] == second["history"]
+    assert first["iterations"] == 4 and math.isfinite(first["best_cost"])
+
+
+def test_process_pool_matches_thread_pool(graph10):
+    threads = run(graph10, pool="thread")
+    processes = run(graph10, pool="process")
+    assert processes["best_path"] == threads["best_path"]
+    assert processes["history"] == threads["history"]
+
+
+@pytest.mark.parametrize("engine", ["numpy", "sparse"])
+def test_engines_give_the_same_run(graph10, engine):
+    assert run(graph10, engine=engine)["history"] == pytest.approx(run(graph10)["history"])
+
+
+def test_acs_and_top_k(graph10):
+    result = run(graph10, strategy="acs", strategy_opts={"q0": 0.9, "local_rho": 0.1}, top_k=3)
+    assert math.isfinite(result["best_cost"])
+    assert result["elite"][0][0] == result["best_cost"]
+
+
+def test_islands_are_rejected(graph10):
+    with pytest.raises(ValueError):
+        run(graph10, islands=True)
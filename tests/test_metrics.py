@@ -0,0 +1,62 @@
+import socket
+import urllib.request
+import pytest
+from aco_metrics import MetricsRegistry, TimedLock, start_metrics_server
+
+
+def test_render_uses_the_prometheus_text_format():
+    registry = MetricsRegistry()
+    registry.counter("aco_aborts_total", "Aborts").inc(2, worker=1)
+    registry.gauge("aco_best_cost", "Melhor custo").set(12.5)
+    latency = registry.histogram("aco_rpc_seconds", "Latência", buckets=(0.1, 1.0))
+    latency.observe(0.05, rpc="RequestWork")
+    latency.observe(0.5, rpc="RequestWork")
+
+    lines = registry.render().splitlines()
+    assert "# TYPE aco_aborts_total counter" in lines
+    assert 'aco_aborts_total{worker="1"} 2' in lines
+    assert "aco_best_cost 12.5" in lines
+    assert "# TYPE aco_rpc_seconds histogram" in lines
+    assert 'aco_rpc_seconds_bucket{rpc="RequestWork",le="0.1"} 1' in lines
+    assert 'aco_rpc_seconds_bucket{rpc="RequestWork",le="1.0"} 2' in lines
+    assert 'aco_rpc_seconds_bucket{rpc="RequestWork",le="+Inf"} 2' in lines
+    assert 'aco_rpc_seconds_count{rpc="RequestWork"} 2' in lines
+
+
+def test_registry_returns_the_same_metric_by_name():
+    registry = MetricsRegistry()
+    assert registry.counter("x_total", "x") is registry.counter("x_total", "x")
+    assert registry.counter("x_total", "x").get() == 0
+
+
+def test_histogram_sum_count_and_total():
+    histogram = MetricsRegistry().histogram("bytes", "b")
+    histogram.observe(10, rpc="A")
+    histogram.observe(30, rpc="B")
+    assert (histogram.sum(rpc="A"), histogram.count(rpc="B"), histogram.total()) == (10, 1, 40)
+
+
+def test_timed_lock_observes_hold_time():
+    histogram = MetricsRegistry().histogram("lock_seconds", "l")
+    lock = TimedLock(histogram)
+    with lock:
+        pass
+    assert histogram.count() == 1
+
+
+def test_metrics_endpoint_serves_the_registry():
+    registry = MetricsRegistry()
+    registry.counter("aco_ants_total", "Formigas").inc(5)
+    with socket.socket() as s:
+        s.bind(("localhost", 0))
+        port = s.getsockname()[1]
+
+    server = start_metrics_server(port, registry)
+    try:
+        with urllib.request.urlopen(f"http://localhost:{port}/metrics") as response:
+            assert "aco_ants_total 5" in response.read().decode("utf-8").splitlines()
+        with pytest.raises(urllib.error.HTTPError):
+            urllib.request.urlopen(f"http://localhost:{port}/outro")
+    finally:
+        server.shutdown()
+        server.server_close()
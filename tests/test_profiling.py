@@ -0,0 +1,38 @@
+import os
+import pstats
+import pytest
+from aco_engine import ENGINES
+from utils_bench_engine import bench_engine
+from utils_profiling import IterationProfiler
+
+
+def test_engines_agree_in_the_microbenchmark(graph10):
+    n = len(graph10)
+    pheromone_flat = [1.0] * (n * n)
+    results = [bench_engine(engine, graph10, 20, 1.0, 3.0, 1, pheromone_flat, seed=5) for engine in sorted(ENGINES)]
+
+    # Mesmo fluxo de sorteios em todos os motores: mesmas rotas, mesmo custo médio
+    assert len({round(result["mean_cost"], 9) for result in results}) == 1
+    for result in results:
+        assert result["tours_per_sec"] > 0
+        assert result["us_per_step"] == pytest.approx(result["us_per_tour"] / (n - 1))
+
+
+def test_profiler_writes_one_file_per_iteration(tmp_path):
+    output_dir = str(tmp_path / "perfis")
+    profiler = IterationProfiler(output_dir, prefix="worker1")
+    for number in (1, 2):
+        with profiler.iteration(number):
+            sum(range(1000))
+
+    files = sorted(os.listdir(output_dir))
+    assert files == ["worker1_iter0001.prof", "worker1_iter0002.prof"]
+    assert pstats.Stats(os.path.join(output_dir, files[0])).total_calls > 0
+
+
+def test_disabled_profiler_writes_nothing(tmp_path):
+    profiler = IterationProfiler()
+    assert not profiler.enabled
+    with profiler.iteration(1):
+        pass
+    assert not list(tmp_path.iterdir())
@@ -0,0 +1,54 @@
+import math
+import pytest
+from aco_solution_pool import canonical_tour, tour_hash, top_tours, split_tours, SolutionCache, SolutionPool
+
+
+def rotations_and_reversals(path):
+    n = len(path)
+    for tour in (path, path[::-1]):
+        for k in range(n):
+            yield tour[k:] + tour[:k]
+
+
+def test_rotations_and_reversals_have_the_same_hash():
+    path = [3, 0, 4, 1, 5, 2]
+    hashes = {tour_hash(tour) for tour in rotations_and_reversals(path)}
+    canonicals = {canonical_tour(tour) for tour in rotations_and_reversals(path)}
+    assert len(hashes) == 1 and len(canonicals) == 1
+    assert canonical_tour(path) == (0, 3, 2, 5, 1, 4)
+
+
+def test_different_tours_have_different_hashes():
+    assert tour_hash([0, 1, 2, 3, 4]) != tour_hash([0, 2, 1, 3, 4])
+
+
+def test_solution_cache_is_lru():
+    cache = SolutionCache(capacity=2)
+    assert cache.add("a") and cache.add("b")
+    assert not cache.add("a")
+    assert cache.add("c")  # "b" era a menos recente
+    assert "b" not in cache and "a" in cache
+
+
+@pytest.mark.parametrize("duplicates, weight", [("merge", 2), ("skip", 1)])
+def test_repeated_tours_deposit_once(duplicates, weight):
+    pool = SolutionPool(duplicates=duplicates)
+    solutions = [([0, 1, 2, 3], 10.0, 1, 1), ([2, 1, 0, 3], 10.0, 2, 2), ([0, 2, 1, 3], 12.0, 3, 1)]
+    assert pool.deposits(solutions) == [([0, 1, 2, 3], 10.0, weight), ([0, 2, 1, 3], 12.0, 1)]
+
+
+def test_pool_counts_novel_tours_and_keeps_the_elite():
+    pool = SolutionPool(elite_size=2)
+    assert pool.add([0, 1, 2, 3], 10.0)
+    assert not pool.add([1, 2, 3, 0], 10.0)
+    assert pool.add([0, 2, 1, 3], 12.0)
+    assert pool.add([0, 1, 3, 2], 8.0)
+    assert pool.add([0, 1, 2, 3, 4], math.inf)  # Rota inviável: nova, mas fora da elite
+    assert (pool.received, pool.repeated) == (5, 1)
+    assert [cost for cost, _ in pool.elite.tours()] == [8.0, 10.0]
+
+
+def test_top_tours_skips_repeated_tours():
+    candidates = [(10.0, 0, [0, 1, 2, 3]), (10.0, 1, [3, 2, 1, 0]), (11.0, 2, [0, 2, 1, 3]), (9.0, 3, [0, 1, 3, 2])]
+    assert top_tours(candidates, 2) == [([0, 1, 3, 2], 9.0), ([0, 1, 2, 3], 10.0)]
+    assert split_tours([0, 1, 2, 2, 1, 0], 3) == [[0, 1, 2], [2, 1, 0]]
@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+from aco_solver import ACOSolver, SolverResult, as_distance_matrix
+
+
+def test_solves_from_coordinates():
+    # Quadrado unitário: a melhor rota é o perímetro
+    square = [(0, 0), (1, 0), (1, 1), (0, 1)]
+    result = ACOSolver(iterations=5, num_ants=4, seed=1).solve(coordinates=square)
+
+    assert isinstance(result, SolverResult)
+    assert result.best_cost == pytest.approx(4.0)
+    assert sorted(result.best_path) == [0, 1, 2, 3]
+    assert result.iterations == 5 and len(result.costs) == 5
+
+
+def test_accepts_numpy_matrices_and_is_reproducible(graph10):
+    solver = ACOSolver(iterations=6, num_ants=5, workers=2, seed=4)
+    first = solver.solve(distances=np.array(graph10))
+    second = solver.solve(distances=graph10)
+
+    assert first.best_path == second.best_path
+    assert first.costs == second.costs
+    assert all(a >= b for a, b in zip(first.costs, first.costs[1:]))
+    assert first.elite[0][0] == first.best_cost
+
+
+def test_callback_can_stop_the_run(graph10):
+    seen = []
+
+    def callback(iteration, best_cost, best_path, elapsed):
+        seen.append(iteration)
+        return iteration < 2
+
+    result = ACOSolver(iterations=10, num_ants=3, seed=1, callback=callback).solve(distances=graph10)
+    assert seen == [1, 2]
+    assert result.iterations == 2
+    assert result.stop_reason == "interrompido pelo callback"
+
+
+def test_stopping_options_reach_the_master(graph10):
+    result = ACOSolver(iterations=30, num_ants=3, seed=1, stagnation=2).solve(distances=graph10)
+    assert result.iterations < 30
+    assert result.stop_reason == "2 iterações sem melhora"
+
+
+def test_input_validation():
+    with pytest.raises(ValueError):
+        as_distance_matrix()
+    with pytest.raises(ValueError):
+        as_distance_matrix(distances=[[0, 1], [1, 0]], coordinates=[(0, 0), (1, 1)])
+    with pytest.raises(ValueError):
+        as_distance_matrix(coordinates=[0, 1, 2])
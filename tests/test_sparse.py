@@ -0,0 +1,71 @@
+import math
+import random
+import pytest
+from aco_engine import seeded_rng
+from aco_sparse import CSRGraph, run_ant_sparse, run_ant_acs_sparse
+from utils_gen_graphs import edges_to_matrix
+
+
+def ring_with_chords(n, seed=3):
+    """Ciclo 0-1-...-(n-1) (garante uma rota) com algumas cordas aleatórias"""
+    rng = random.Random(seed)
+    edges = [(i, (i + 1) % n, rng.randint(1, 50)) for i in range(n)]
+    edges += [(i, (i + rng.randint(2, n - 2)) % n, rng.randint(1, 50)) for i in range(0, n, 3)]
+    return edges
+
+
+def tour_cost(graph, path):
+    return sum(graph.weight(path[k], path[(k + 1) % len(path)]) for k in range(len(path)))
+
+
+def test_csr_round_trip(graph):
+    csr = CSRGraph.from_matrix(graph)
+    assert csr.to_matrix() == [[float(d) for d in row] for row in graph]
+    assert CSRGraph.from_flat([d for row in graph for d in row], len(graph)).to_matrix() == csr.to_matrix()
+    assert csr.edges == len(graph) * (len(graph) - 1)
+    assert csr.weight(0, 0) == 0.0
+
+
+def test_csr_from_edges_matches_dense_matrix():
+    n = 12
+    edges = ring_with_chords(n)
+    csr = CSRGraph.from_edges(n, edges)
+    assert csr.to_matrix() == edges_to_matrix(n, [list(e) for e in edges])
+    assert csr.edges < n * (n - 1)
+
+
+def test_csr_streamed_rows_must_come_in_order(graph):
+    csr = CSRGraph(len(graph))
+    csr[0] = graph[0]
+    with pytest.raises(IndexError):
+        csr[2] = graph[2]
+
+
+@pytest.mark.parametrize("acs", [False, True])
+def test_sparse_engine_finds_a_feasible_tour(acs):
+    n = 24
+    graph = CSRGraph.from_edges(n, ring_with_chords(n))
+    feasible = []
+    for ant in range(30):
+        pheromone = [[1.0] * n for _ in range(n)]
+        rng = seeded_rng(1, 1, 0, ant)
+        if acs:
+            path, cost = run_ant_acs_sparse(pheromone, graph, n, 1.0, 2.0, ant % n, q0=0.5, tau0=1.0, rng=rng)
+        else:
+            path, cost = run_ant_sparse(pheromone, graph, n, 1.0, 2.0, ant % n, rng=rng)
+        if math.isfinite(cost):
+            feasible.append((path, cost))
+
+    assert feasible
+    for path, cost in feasible:
+        assert sorted(path) == list(range(n))
+        assert all(graph.weight(path[k], path[(k + 1) % n]) > 0 for k in range(n))
+        assert cost == pytest.approx(tour_cost(graph, path))
+
+
+def test_sparse_engine_reports_infeasible_graphs():
+    # Estrela: não existe ciclo hamiltoniano
+    n = 6
+    graph = CSRGraph.from_edges(n, [(0, j, 1.0) for j in range(1, n)])
+    pheromone = [[1.0] * n for _ in range(n)]
+    assert run_ant_sparse(pheromone, graph, n, 1.0, 2.0, 0, rng=random.Random(0))[1] == math.inf
@@ -0,0 +1,68 @@
+import pytest
+import aco_distributed_pb2
+from aco_master import ACOMaster
+from aco_solution_pool import canonical_tour
+from aco_worker import ACOWorker
+
+
+class LocalStub:
+    """Stub que entrega as chamadas do worker direto ao ACOMaster, sem rede"""
+
+    def __init__(self, master):
+        self.master = master
+
+    def SubmitSolutions(self, request):
+        return self.master.SubmitSolutions(aco_distributed_pb2.SolutionBatch.FromString(request.SerializeToString()),
+                                           None)
+
+
+@pytest.fixture
+def master(graph10):
+    master = ACOMaster(graph10, num_ants=20)
+    yield master
+    master.event_log.close()
+
+
+@pytest.fixture
+def worker():
+    worker = ACOWorker(1, "localhost:1", 0, direct=True, top_k=3)
+    yield worker
+    worker.close()
+
+
+def assignment(master):
+    return aco_distributed_pb2.WorkAssignment(
+        num_ants=20, iteration=master.current_iteration, matrix_size=master.n, alpha=1.0, beta=3.0,
+        pheromone_matrix=[value for row in master.pheromone for value in row],
+        distance_matrix=[value for row in master.distance_matrix for value in row], seed=11)
+
+
+def test_worker_returns_distinct_best_tours(master, worker):
+    tours = worker.run_ants(assignment(master))
+
+    assert len(tours) == 3
+    costs = [cost for _, cost in tours]
+    assert costs == sorted(costs)
+    assert len({canonical_tour(path) for path, _ in tours}) == 3
+
+
+def test_batch_submission_records_every_tour(master, worker):
+    tours = worker.run_ants(assignment(master))
+    worker.master_stub = LocalStub(master)
+
+    response = worker.submit_solutions(tours, master.current_iteration)
+
+    assert response.accepted
+    assert [(path, cost) for path, cost, _, _ in master.solutions_current_iteration] == tours
+    assert master.workers_completed == {1}
+    assert master.best_cost == tours[0][1] == response.current_best_cost
+
+
+def test_stale_batch_is_rejected(master, worker):
+    tours = worker.run_ants(assignment(master))
+    worker.master_stub = LocalStub(master)
+
+    response = worker.submit_solutions(tours, master.current_iteration + 1)
+
+    assert not response.accepted
+    assert not master.solutions_current_iteration
@@ -0,0 +1,85 @@
+import socket
+import threading
+import time
+from contextlib import contextmanager
+import pytest
+import aco_distributed_pb2_grpc
+from aco_jobs import JobQueueMaster
+from aco_worker import ACOWorker
+from utils_grpc import make_server
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("localhost", 0))
+        return s.getsockname()[1]
+
+
+def wait_until(condition, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            pytest.fail("tempo esgotado")
+        time.sleep(0.05)
+
+
+@contextmanager
+def warm_worker(queue_master, address):
+    """Worker --warm --direct rodando em uma thread; ao sair, o roteador é fechado e o worker encerra"""
+    worker = ACOWorker(1, address, free_port(), heartbeat_interval=0.2, direct=True, warm=True)
+    thread = threading.Thread(target=worker.run, daemon=True)
+    thread.start()
+    try:
+        yield worker
+    finally:
+        # Sem warm, o `finished` do roteador fechado encerra o laço do worker
+        worker.warm = False
+        queue_master.close()
+        thread.join(timeout=10)
+        worker.close()
+
+
+@pytest.fixture
+def job_queue():
+    queue_master = JobQueueMaster(workers=1, max_active_jobs=1, iterations=2, num_ants=2)
+    server = make_server(4)
+    aco_distributed_pb2_grpc.add_ACOMasterServiceServicer_to_server(queue_master, server)
+    port = free_port()
+    server.add_insecure_port(f"localhost:{port}")
+    server.start()
+    yield queue_master, f"localhost:{port}"
+    server.stop(grace=0)
+    queue_master.channel_pool.close()
+
+
+def test_worker_drops_session_of_finished_job(job_queue, graph):
+    queue_master, address = job_queue
+
+    with warm_worker(queue_master, address) as worker:
+        first = queue_master.submit(graph)
+        wait_until(lambda: queue_master.jobs[first].state == "done")
+        assert queue_master.jobs[first].best_path
+
+        second = queue_master.submit(graph)
+        wait_until(lambda: queue_master.jobs[second].state == "done")
+        # O próximo RequestWork (já ocioso) traz as duas sessões como encerradas
+        wait_until(lambda: not worker.sessions)
+        assert first not in worker.sessions and second not in worker.sessions
+
+
+def test_finished_jobs_keep_only_the_result(job_queue, graph):
+    queue_master, address = job_queue
+    queue_master.max_finished_jobs = 1
+
+    with warm_worker(queue_master, address):
+        first = queue_master.submit(graph)
+        wait_until(lambda: queue_master.jobs[first].state == "done")
+        job = queue_master.jobs[first]
+        assert job.master is None and job.graph is None
+        assert queue_master.status(first).best_path == job.best_path
+
+        second = queue_master.submit(graph)
+        wait_until(lambda: queue_master.jobs[second].state == "done")
+        assert first not in queue_master.jobs
+        assert queue_master.status(first).state == "unknown"
+        assert queue_master.status(second).best_cost > 0
@@ -0,0 +1,96 @@
+import time
+import random
+import argparse
+import cProfile
+import pstats
+from aco_engine import ENGINES, prepare_matrix, prepare_distance, heuristic_matrix, seeded_rng
+from utils_gen_graphs import load_graph_or_exit
+
+
+def bench_engine(engine, graph, ants, alpha, beta, repeats, pheromone_flat, seed=0):
+    """
+    Executa `ants` formigas com o motor informado, sem gRPC.
+
+    Cada formiga usa o fluxo seeded_rng(seed, formiga), igual em todos os
+    motores e repetições. Devolve o melhor tempo entre as repetições (menos
+    sensível a ruído) junto com o custo médio das rotas, para conferir que
+    os motores percorrem as mesmas rotas.
+    """
+    n = len(graph)
+    construct = ENGINES[engine][0]
+    distance_flat = [val for row in graph for val in row]
+
+    prepare_start = time.perf_counter()
+    pheromone = prepare_matrix(engine, pheromone_flat, n)
+    distance = prepare_distance(engine, distance_flat, n)
+    # Como no worker: eta^beta calculado uma vez por grafo e beta
+    eta = heuristic_matrix(engine, distance, beta)
+    prepare_time = time.perf_counter() - prepare_start
+
+    best_time = float('inf')
+    total_cost = 0.0
+    for _ in range(repeats):
+        total_cost = 0.0
+        rngs = [seeded_rng(seed, ant_num) for ant_num in range(ants)]
+        start = time.perf_counter()
+        for ant_num in range(ants):
+            _, cost = construct(pheromone, distance, n, alpha, beta, ant_num % n, rng=rngs[ant_num], eta=eta)
+            total_cost += cost
+        best_time = min(best_time, time.perf_counter() - start)
+
+    steps = ants * (n - 1)
+    return {
+        "engine": engine,
+        "prepare_ms": prepare_time * 1000,
+        "tours_per_sec": ants / best_time,
+        "us_per_tour": best_time / ants * 1e6,
+        "us_per_step": best_time / steps * 1e6 if steps else 0.0,
+        "mean_cost": total_cost / ants,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Microbenchmark dos motores de construção de rotas (sem gRPC)')
+    parser.add_argument('--graph', type=str, default='graphs/14_nodes.json', help='Caminho do arquivo JSON do grafo')
+    parser.add_argument('--engines', nargs='+', default=sorted(ENGINES), choices=sorted(ENGINES),
+                        help='Motores a comparar (padrão: todos)')
+    parser.add_argument('--ants', type=int, default=200, help='Formigas por repetição (padrão: 200)')
+    parser.add_argument('--repeats', type=int, default=3, help='Repetições; vale a melhor (padrão: 3)')
+    parser.add_argument('--alpha', type=float, default=1.0, help='Alpha (padrão: 1.0)')
+    parser.add_argument('--beta', type=float, default=3.0, help='Beta (padrão: 3.0)')
+    parser.add_argument('--seed', type=int, default=0, help='Semente do RNG e dos feromônios (padrão: 0)')
+    parser.add_argument('--profile', type=str, default=None, metavar='ARQUIVO',
+                        help='Grava um perfil cProfile de cada motor em ARQUIVO.<motor>.prof')
+    args = parser.parse_args()
+
+    graph = load_graph_or_exit(args.graph)
+    n = len(graph)
+
+    # Feromônios não uniformes, para o benchmark não depender só da heurística
+    rng = random.Random(args.seed)
+    pheromone_flat = [rng.uniform(0.1, 2.0) for _ in range(n * n)]
+
+    print(f"Grafo: {args.graph} ({n} nós) | Formigas: {args.ants} | Repetições: {args.repeats}")
+    print(f"{'Motor':<10} {'Preparo (ms)':>13} {'Rotas/s':>12} {'us/rota':>12} {'us/passo':>10} {'Custo médio':>12}")
+
+    for engine in args.engines:
+        profiler = cProfile.Profile() if args.profile else None
+        if profiler:
+            profiler.enable()
+
+        result = bench_engine(engine, graph, args.ants, args.alpha, args.beta, args.repeats, pheromone_flat,
+                              args.seed)
+
+        if profiler:
+            profiler.disable()
+            profile_path = f"{args.profile}.{engine}.prof"
+            profiler.dump_stats(profile_path)
+            pstats.Stats(profiler).sort_stats("cumulative").print_stats(8)
+            print(f"Perfil gravado em: {profile_path}")
+
+        print(f"{result['engine']:<10} {result['prepare_ms']:>13.3f} {result['tours_per_sec']:>12.1f} "
+              f"{result['us_per_tour']:>12.1f} {result['us_per_step']:>10.2f} {result['mean_cost']:>12.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,312 @@
+import os
+import sys
+import json
+import time
+import random
+import socket
+import logging
+import argparse
+import itertools
+import threading
+import subprocess
+import aco_distributed_pb2_grpc
+import bruteforce_pb2_grpc
+from aco_master import ACOMaster
+from aco_worker import ACOWorker
+from aco_local import run_local
+from aco_engine import ENGINES
+from bf_master import BFMaster
+from bf_worker import run_worker as run_bf_worker, calculate_path_cost
+from utils_gen_graphs import load_graph_or_exit, generate_symmetric_matrix
+from utils_gen_instances import generate_instance, instance_spec
+from utils_logging import setup_logging, add_logging_arguments
+from utils_grpc import make_server
+
+
+log = logging.getLogger("benchmark")
+
+RESULTS_FILE = os.path.join("results", "benchmark.json")
+
+# Modos de execução do ACO: nome -> parâmetros extras do ACOMaster.
+# "bf" é tratado à parte (força bruta distribuída).
+ACO_MODES = {
+    "aco": {},
+    "elitist": {"strategy": "elitist"},
+    "rank": {"strategy": "rank"},
+    "mmas": {"strategy": "mmas"},
+    "acs": {"strategy": "acs"},
+    "islands": {"islands": True, "migration_interval": 5},
+    "adaptive": {"adaptive": True},
+}
+
+# O mestre deriva a porta 2PC do worker como 50051 + worker_id
+WORKER_PORT_BASE = 50051
+
+
+def _port_is_free(port):
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        try:
+            s.bind(("", port))
+            return True
+        except OSError:
+            return False
+
+
+def _free_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("", 0))
+        return s.getsockname()[1]
+
+
+def _free_worker_ids(count, first_port=51000):
+    """Escolhe IDs de worker cujas portas 2PC (50051 + id) estejam livres"""
+    ids = []
+    port = first_port
+    while len(ids) < count:
+        if _port_is_free(port):
+            ids.append(port - WORKER_PORT_BASE)
+        port += 1
+    return ids
+
+
+def exact_optimum(matrix):
+    """Custo ótimo por força bruta local (apenas para grafos pequenos)"""
+    n = len(matrix)
+    best = float('inf')
+    for p in itertools.permutations(range(1, n)):
+        best = min(best, calculate_path_cost([0] + list(p), matrix))
+    return best
+
+
+def run_aco(matrix, workers, ants, iterations, worker_mode, master_kwargs=None, engine="python"):
+    """Executa mestre + workers no localhost e devolve as medidas da execução"""
+    port = _free_port()
+    master = ACOMaster(matrix, total_iterations=iterations, num_ants=ants, **(master_kwargs or {}))
+
+    server = make_server(max(10, 2 * workers))
+    aco_distributed_pb2_grpc.add_ACOMasterServiceServicer_to_server(master, server)
+    server.add_insecure_port(f'localhost:{port}')
+    server.start()
+
+    address = f'localhost:{port}'
+    worker_ids = _free_worker_ids(workers)
+    processes = []
+    threads = []
+
+    start = time.time()
+    try:
+        for worker_id in worker_ids:
+            if worker_mode == "process":
+                processes.append(subprocess.Popen([
+                    sys.executable, "aco_worker.py",
+                    "--id", str(worker_id), "--master", address,
+                    "--port", str(WORKER_PORT_BASE + worker_id), "--log-level", "WARNING",
+                    "--engine", engine,
+                ]))
+            else:
+                worker = ACOWorker(worker_id, address, WORKER_PORT_BASE + worker_id, engine=engine)
+                thread = threading.Thread(target=worker.run, daemon=True)
+                thread.start()
+                threads.append((worker, thread))
+
+        master.run_coordination(workers)
+        wall_time = time.time() - start
+
+        for worker, thread in threads:
+            thread.join(timeout=30)
+            worker.close()
+        for process in processes:
+            process.wait(timeout=30)
+    finally:
+        for process in processes:
+            if process.poll() is None:
+                process.kill()
+        server.stop(grace=1)
+        master.close_channels()
+        master.event_log.close()
+
+    # Todas as RPCs registradas (inclusive SubmitSolutions com --top-k > 1)
+    wire_bytes = master.payload_bytes.total()
+
+    return {
+        "wall_time": wall_time,
+        "best_cost": master.best_cost,
+        # No modo ilhas cada iteração do mestre vale migration_interval iterações locais
+        "history": [cost for _, cost, _ in master.history
+                    for _ in range(master.migration_interval)][:master.local_iterations_total],
+        "bytes": int(wire_bytes),
+    }
+
+
+def run_bf(matrix, workers):
+    """Executa a força bruta distribuída no localhost"""
+    port = _free_port()
+    master = BFMaster(matrix)
+
+    server = make_server(max(10, 2 * workers))
+    bruteforce_pb2_grpc.add_BFServiceServicer_to_server(master, server)
+    server.add_insecure_port(f'localhost:{port}')
+    server.start()
+
+    master.start_time = time.time()
+    threads = [
+        threading.Thread(target=run_bf_worker, args=(worker_id, f'localhost:{port}', 0.0), daemon=True)
+        for worker_id in range(1, workers + 1)
+    ]
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        server.stop(grace=1)
+
+    return {
+        "wall_time": master.duration,
+        "best_cost": master.best_global_cost,
+        "history": [],
+        "bytes": None,
+    }
+
+
+def iterations_to_target(history, target):
+    """Primeira iteração (1-based) em que o melhor custo atingiu o alvo"""
+    if target is None:
+        return None
+    for i, cost in enumerate(history):
+        if cost <= target + 1e-9:
+            return i + 1
+    return None
+
+
+def load_graphs(args):
+    """Monta a lista (nome, matriz) a partir de --graphs, --sizes e --instances"""
+    graphs = []
+    for path in args.graphs:
+        graphs.append((os.path.basename(path), load_graph_or_exit(path)))
+
+    rng_state = random.getstate()
+    random.seed(args.seed)
+    for n in args.sizes:
+        graphs.append((f"random_{n}_seed{args.seed}", generate_symmetric_matrix(n)))
+    random.setstate(rng_state)
+
+    for kind, n in args.instances:
+        graphs.append((f"{kind}_{n}_seed{args.seed}", generate_instance(kind, n, args.seed)))
+
+    return graphs
+
+
+def run_sweep(args):
+    records = []
+    graphs = load_graphs(args)
+
+    for name, matrix in graphs:
+        n = len(matrix)
+        optimum = exact_optimum(matrix) if n <= args.optimum_max_n else None
+        target = args.target_cost if args.target_cost is not None else optimum
+
+        configs = itertools.product(args.modes, args.engines, args.workers, args.ants, range(args.repeats))
+        for mode, engine, workers, ants, repeat in configs:
+            if mode == "bf":
+                # A força bruta não depende do número de formigas nem do motor
+                if ants != args.ants[0] or engine != args.engines[0]:
+                    continue
+                if n > args.bf_max_n:
+                    log.info("[Benchmark] %s: pulando bf (n=%d > --bf-max-n)", name, n)
+                    continue
+                result = run_bf(matrix, workers)
+            elif args.worker_mode == "local":
+                if ACO_MODES[mode].get("islands"):
+                    log.info("[Benchmark] %s: pulando %s (sem suporte no modo local)", name, mode)
+                    continue
+                result = run_local(matrix, args.iterations, ants, workers, engine=engine,
+                                   seed=args.run_seed, **ACO_MODES[mode])
+            else:
+                result = run_aco(matrix, workers, ants, args.iterations,
+                                 args.worker_mode, dict(ACO_MODES[mode], seed=args.run_seed), engine)
+
+            best = result["best_cost"]
+            record = {
+                "graph": name,
+                "n": n,
+                "mode": mode,
+                "engine": engine if mode != "bf" else None,
+                "workers": workers,
+                "ants": ants if mode != "bf" else None,
+                "iterations": args.iterations if mode != "bf" else None,
+                "repeat": repeat,
+                "worker_mode": args.worker_mode,
+                "wall_time": result["wall_time"],
+                "best_cost": best,
+                "optimum": optimum,
+                "gap": (best - optimum) / optimum * 100 if optimum else None,
+                "target_cost": target,
+                "iterations_to_target": iterations_to_target(result["history"], target),
+                "bytes": result["bytes"],
+                "history": result["history"],
+            }
+            records.append(record)
+
+            # Resultado, não aviso: vai direto para a saída, como os resumos das outras CLIs
+            gap = f"{record['gap']:.1f}%" if record["gap"] is not None else "N/A"
+            print(f"[Benchmark] {name} | modo={mode} motor={record['engine']} workers={workers} "
+                  f"formigas={record['ants']} | tempo={record['wall_time']:.3f}s custo={best:.2f} gap={gap}", flush=True)
+
+    return records
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark reprodutível do ACO distribuído (e força bruta)')
+    parser.add_argument('--graphs', nargs='*', default=['graphs/5_nodes.json', 'graphs/10_nodes.json'],
+                        help='Arquivos JSON de grafos')
+    parser.add_argument('--sizes', nargs='*', type=int, default=[],
+                        help='Tamanhos de grafos aleatórios gerados com --seed')
+    parser.add_argument('--instances', nargs='*', type=instance_spec, default=[],
+                        help='Instâncias geradas com NumPy (ver utils_gen_instances), como TIPO:N, '
+                             'ex.: euclidean:2000 clustered:5000 uniform:1000')
+    parser.add_argument('--seed', type=int, default=42,
+                        help='Semente dos grafos aleatórios e das instâncias (padrão: 42)')
+    parser.add_argument('--run-seed', type=int, default=None,
+                        help='Semente das execuções ACO: todos os motores e repetições seguem as mesmas rotas '
+                             '(padrão: não determinístico)')
+    parser.add_argument('--modes', nargs='+', default=['aco', 'bf'],
+                        choices=sorted(ACO_MODES) + ['bf'], help='Modos a comparar (padrão: aco bf)')
+    parser.add_argument('--engines', nargs='+', default=['python'], choices=sorted(ENGINES),
+                        help='Motores de construção usados pelos workers (padrão: python)')
+    parser.add_argument('--workers', nargs='+', type=int, default=[2], help='Quantidades de workers (padrão: 2)')
+    parser.add_argument('--ants', nargs='+', type=int, default=[5], help='Formigas por worker (padrão: 5)')
+    parser.add_argument('--iterations', type=int, default=10, help='Iterações do ACO (padrão: 10)')
+    parser.add_argument('--repeats', type=int, default=1, help='Repetições de cada configuração (padrão: 1)')
+    parser.add_argument('--worker-mode', choices=['thread', 'process', 'local'], default='thread',
+                        help='Workers como threads no mesmo processo, subprocessos locais ou local '
+                             '(sem gRPC, ver aco_local) (padrão: thread)')
+    parser.add_argument('--target-cost', type=float, default=None,
+                        help='Custo alvo para "iterações até o alvo" (padrão: ótimo, se conhecido)')
+    parser.add_argument('--optimum-max-n', type=int, default=10,
+                        help='Calcula o ótimo exato para grafos com até N nós (padrão: 10)')
+    parser.add_argument('--bf-max-n', type=int, default=10,
+                        help='Executa o modo bf apenas para grafos com até N nós (padrão: 10)')
+    parser.add_argument('--output', type=str, default=RESULTS_FILE, help=f'Arquivo de resultados (padrão: {RESULTS_FILE})')
+    parser.add_argument('--no-plot', action='store_true', help='Não gera tabela/gráfico ao final')
+    add_logging_arguments(parser)
+    parser.set_defaults(log_level='WARNING')
+    args = parser.parse_args()
+    setup_logging(args.log_level, args.log_rate)
+
+    records = run_sweep(args)
+
+    directory = os.path.dirname(args.output)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory)
+    with open(args.output, 'w') as f:
+        json.dump(records, f, indent=2)
+    print(f"Resultados salvos em: {args.output} ({len(records)} execuções)")
+
+    if not args.no_plot:
+        from utils_plot_tests import load_benchmark_results, plot_all
+        plot_all(load_benchmark_results(args.output))
+
+
+if __name__ == '__main__':
+    main()
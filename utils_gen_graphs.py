@@ -4,19 +4,76 @@ import json
 import random
 
 
+class GraphError(Exception):
+    """Arquivo de grafo ausente, inválido ou com matriz de distâncias malformada"""
+
+
+def validate_matrix(matrix):
+    """Confere que a matriz de distâncias é quadrada com ao menos 2 nós"""
+    n = len(matrix)
+    if n < 2 or any(len(row) != n for row in matrix):
+        raise GraphError(f"A matriz de distâncias deve ser quadrada com ao menos 2 nós (recebido: {n} linhas)")
+    return matrix
+
+
+def edges_to_matrix(n, edges):
+    """Matriz densa simétrica a partir de arestas [i, j, peso]; 0 onde não há aresta"""
+    matrix = [[0 for _ in range(n)] for _ in range(n)]
+    for edge in edges:
+        if len(edge) != 3 or not (0 <= edge[0] < n and 0 <= edge[1] < n):
+            raise GraphError(f"Aresta inválida: {edge}")
+        i, j, weight = edge
+        matrix[i][j] = weight
+        matrix[j][i] = weight
+    return matrix
+
+
 def load_graph_from_json(file_path):
+    """
+    Lê a matriz de distâncias de um arquivo JSON; erros viram GraphError.
+
+    Além da matriz (lista de listas), aceita grafos esparsos como lista de
+    arestas: {"n": N, "edges": [[i, j, peso], ...]} (ver generate_sparse_graph).
+    """
     try:
         with open(file_path, 'r') as f:
             matrix = json.load(f)
-        return matrix
     except FileNotFoundError:
-        print(f"ERRO: Arquivo '{file_path}' não encontrado.")
-        sys.exit(1)
+        raise GraphError(f"Arquivo '{file_path}' não encontrado.") from None
     except json.JSONDecodeError:
-        print(f"ERRO: Arquivo '{file_path}' não é um JSON válido.")
+        raise GraphError(f"Arquivo '{file_path}' não é um JSON válido.") from None
+    if isinstance(matrix, dict) and "edges" in matrix:
+        matrix = edges_to_matrix(matrix.get("n", 0), matrix["edges"])
+    if not isinstance(matrix, list):
+        raise GraphError(f"Arquivo '{file_path}' não contém uma matriz de distâncias.")
+    return validate_matrix(matrix)
+
+
+def load_graph(file_path):
+    """
+    Lê o grafo de `file_path` pela extensão: .npy (matriz) e .npz
+    (coordenadas) são instâncias de utils_gen_instances; o resto é JSON.
+    """
+    if not file_path.endswith((".npy", ".npz")):
+        return load_graph_from_json(file_path)
+    from utils_gen_instances import load_instance
+    try:
+        matrix = load_instance(file_path)
+    except FileNotFoundError:
+        raise GraphError(f"Arquivo '{file_path}' não encontrado.") from None
+    except (ValueError, KeyError, OSError) as e:
+        raise GraphError(f"Arquivo '{file_path}' não é uma instância válida: {e}") from None
+    return validate_matrix(matrix)
+
+
+def load_graph_or_exit(file_path):
+    """Para as CLIs: como load_graph, mas imprime o erro e encerra"""
+    try:
+        return load_graph(file_path)
+    except GraphError as e:
+        print(f"ERRO: {e}")
         sys.exit(1)
-        
-        
+
 
 def generate_symmetric_matrix(n, min_weight=1, max_weight=50):
     # Cria matriz vazia NxN
@@ -30,6 +87,25 @@ def generate_symmetric_matrix(n, min_weight=1, max_weight=50):
             
     return matrix
 
+def generate_sparse_graph(n, degree=4, min_weight=1, max_weight=50):
+    """
+    Grafo esparso como lista de arestas [i, j, peso]: um ciclo com os nós
+    embaralhados (garante que existe rota) mais cordas aleatórias até o
+    grau médio `degree`.
+    """
+    order = list(range(n))
+    random.shuffle(order)
+    edges = {}
+    for k in range(n):
+        i, j = order[k], order[(k + 1) % n]
+        edges[(min(i, j), max(i, j))] = random.randint(min_weight, max_weight)
+    target = min(n * degree // 2, n * (n - 1) // 2)
+    while len(edges) < target:
+        i, j = random.sample(range(n), 2)
+        edges.setdefault((min(i, j), max(i, j)), random.randint(min_weight, max_weight))
+    return {"n": n, "edges": [[i, j, weight] for (i, j), weight in sorted(edges.items())]}
+
+
 def save_graph(filename, matrix):
     filepath = os.path.join("graphs", filename)
     with open(filepath, 'w') as f:
@@ -61,5 +137,8 @@ def main():
     graph_14 = generate_symmetric_matrix(14)
     save_graph("14_nodes.json", graph_14)
 
+    # 5. Grafo esparso (40 nós, grau médio 4) em lista de arestas - para o motor sparse
+    save_graph("sparse_40_nodes.json", generate_sparse_graph(40))
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
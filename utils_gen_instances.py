@@ -0,0 +1,178 @@
+import argparse
+import numpy as np
+
+
+# uniform: pesos inteiros aleatórios em [low, high], sem coordenadas (como generate_symmetric_matrix)
+# euclidean: pontos uniformes no quadrado [0, scale)²
+# clustered: pontos em torno de `clusters` centros, com desvio spread * scale
+KINDS = ("uniform", "euclidean", "clustered")
+COORDINATE_KINDS = ("euclidean", "clustered")
+
+# npy: matriz n x n float64 (np.save, lida com mmap); coords: .npz só com as coordenadas (n x 2)
+FORMATS = ("npy", "coords")
+
+DEFAULT_BLOCK_ROWS = 256
+
+# Pontos coincidentes não podem ter distância 0: nos motores 0 significa "sem aresta"
+MIN_DISTANCE = 1e-6
+
+
+def _splitmix64(x):
+    """Hash splitmix64 elemento a elemento (uint64, com overflow intencional)"""
+    with np.errstate(over="ignore"):
+        x = x + np.uint64(0x9E3779B97F4A7C15)
+        x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        return x ^ (x >> np.uint64(31))
+
+
+def uniform_rows(n, seed, start, stop, low=1, high=50):
+    """
+    Linhas [start, stop) de uma matriz simétrica de pesos inteiros em
+    [low, high]. O peso de (i, j) é um hash de (semente, min, max), então
+    cada bloco é gerado sozinho e a matriz sai simétrica sem ser montada
+    inteira na memória.
+    """
+    i = np.arange(start, stop, dtype=np.uint64)[:, None]
+    j = np.arange(n, dtype=np.uint64)[None, :]
+    with np.errstate(over="ignore"):
+        edge = np.minimum(i, j) * np.uint64(n) + np.maximum(i, j)
+        key = _splitmix64(edge + _splitmix64(np.uint64(seed)))
+    block = (low + key % np.uint64(high - low + 1)).astype(np.float64)
+    block[np.arange(stop - start), np.arange(start, stop)] = 0.0
+    return block
+
+
+def instance_coordinates(kind, n, seed, scale=1000.0, clusters=10, spread=0.05):
+    """Pontos (n x 2) de uma instância euclidean ou clustered"""
+    rng = np.random.default_rng(seed)
+    if kind == "euclidean":
+        return rng.uniform(0.0, scale, size=(n, 2))
+    if kind == "clustered":
+        centers = rng.uniform(0.0, scale, size=(clusters, 2))
+        labels = rng.integers(0, clusters, size=n)
+        return centers[labels] + rng.normal(0.0, spread * scale, size=(n, 2))
+    raise ValueError(f"Instância sem coordenadas: {kind}")
+
+
+def coordinate_rows(points, start, stop):
+    """Linhas [start, stop) da matriz de distâncias euclidianas entre `points`"""
+    diff = points[start:stop, None, :] - points[None, :, :]
+    block = np.maximum(np.sqrt(np.einsum("ijk,ijk->ij", diff, diff)), MIN_DISTANCE)
+    block[np.arange(stop - start), np.arange(start, stop)] = 0.0
+    return block
+
+
+def coordinate_blocks(points, block_rows=DEFAULT_BLOCK_ROWS):
+    """Gera (início, bloco) da matriz de distâncias de `points`, `block_rows` linhas por vez"""
+    n = len(points)
+    for start in range(0, n, block_rows):
+        yield start, coordinate_rows(points, start, min(start + block_rows, n))
+
+
+def instance_blocks(kind, n, seed, block_rows=DEFAULT_BLOCK_ROWS, low=1, high=50, **options):
+    """
+    Gera (início, bloco) da matriz de distâncias da instância, com
+    `block_rows` linhas por vez: a matriz inteira nunca existe na memória.
+    """
+    if kind not in KINDS:
+        raise ValueError(f"Tipo de instância desconhecido: {kind}")
+    if kind == "uniform":
+        for start in range(0, n, block_rows):
+            yield start, uniform_rows(n, seed, start, min(start + block_rows, n), low, high)
+    else:
+        yield from coordinate_blocks(instance_coordinates(kind, n, seed, **options), block_rows)
+
+
+def generate_instance(kind, n, seed, block_rows=DEFAULT_BLOCK_ROWS, **options):
+    """Matriz de distâncias (lista de listas) da instância, para uso em memória (ex.: utils_benchmark)"""
+    return [row for _, block in instance_blocks(kind, n, seed, block_rows, **options) for row in block.tolist()]
+
+
+def write_instance(path, kind, n, seed, fmt="npy", block_rows=DEFAULT_BLOCK_ROWS, **options):
+    """
+    Grava a instância em `path` e devolve o nome gravado (com a extensão
+    do formato, acrescentada se faltar). No formato npy a matriz (.npy
+    comum) é escrita bloco a bloco, sem nunca estar inteira na memória; no
+    coords (só euclidean e clustered) vão apenas as coordenadas, e as
+    distâncias são calculadas na leitura (ver load_instance).
+    """
+    # load_graph escolhe o leitor pela extensão: como np.save/np.savez, acrescentamos
+    # a do formato quando falta e devolvemos o nome do arquivo realmente gravado
+    extension = ".npz" if fmt == "coords" else ".npy"
+    if not path.endswith(extension):
+        path += extension
+
+    if fmt == "coords":
+        points = instance_coordinates(kind, n, seed, **options)
+        np.savez(path, coordinates=points, kind=kind, seed=seed)
+        return path
+
+    header = {"descr": np.lib.format.dtype_to_descr(np.dtype(np.float64)), "fortran_order": False, "shape": (n, n)}
+    with open(path, "wb") as f:
+        np.lib.format.write_array_header_1_0(f, header)
+        for _, block in instance_blocks(kind, n, seed, block_rows, **options):
+            block.tofile(f)
+    return path
+
+
+def load_instance(path, block_rows=DEFAULT_BLOCK_ROWS):
+    """
+    Lê uma instância .npy (matriz n x n) ou .npz (coordenadas) como lista
+    de listas, convertendo `block_rows` linhas por vez.
+    """
+    if path.endswith(".npz"):
+        with np.load(path) as data:
+            points = data["coordinates"]
+        return [row for _, block in coordinate_blocks(points, block_rows) for row in block.tolist()]
+
+    matrix = np.load(path, mmap_mode="r")
+    if matrix.ndim != 2 or matrix.shape[0] != matrix.shape[1]:
+        raise ValueError(f"matriz com formato {matrix.shape}, esperado (n, n)")
+    n = matrix.shape[0]
+    return [row for start in range(0, n, block_rows) for row in matrix[start:start + block_rows].tolist()]
+
+
+def instance_spec(value):
+    """Tipo argparse para TIPO:N (ex.: euclidean:2000)"""
+    kind, _, n = value.partition(":")
+    if kind not in KINDS or not n.isdigit() or int(n) < 2:
+        raise argparse.ArgumentTypeError(f"Instância inválida '{value}' (use TIPO:N com TIPO em {', '.join(KINDS)})")
+    return kind, int(n)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Gera instâncias grandes do TSP (NumPy, em blocos de linhas)')
+    parser.add_argument('--kind', type=str, default='euclidean', choices=KINDS,
+                        help='Tipo da instância (padrão: euclidean)')
+    parser.add_argument('--nodes', type=int, required=True, help='Número de nós')
+    parser.add_argument('--seed', type=int, default=0, help='Semente da instância (padrão: 0)')
+    parser.add_argument('--format', type=str, default='npy', choices=FORMATS,
+                        help='npy (matriz n x n) ou coords (.npz só com coordenadas) (padrão: npy)')
+    parser.add_argument('--output', type=str, default=None,
+                        help='Arquivo de saída (padrão: graphs/<tipo>_<n>_seed<semente>.npy ou .npz)')
+    parser.add_argument('--block-rows', type=int, default=DEFAULT_BLOCK_ROWS,
+                        help=f'Linhas geradas por vez (padrão: {DEFAULT_BLOCK_ROWS})')
+    parser.add_argument('--low', type=int, default=1, help='Menor peso das instâncias uniform (padrão: 1)')
+    parser.add_argument('--high', type=int, default=50, help='Maior peso das instâncias uniform (padrão: 50)')
+    parser.add_argument('--scale', type=float, default=1000.0,
+                        help='Lado do quadrado das coordenadas (padrão: 1000)')
+    parser.add_argument('--clusters', type=int, default=10, help='Centros das instâncias clustered (padrão: 10)')
+    parser.add_argument('--spread', type=float, default=0.05,
+                        help='Desvio em torno de cada centro, em fração de --scale (padrão: 0.05)')
+    args = parser.parse_args()
+
+    if args.format == "coords" and args.kind not in COORDINATE_KINDS:
+        parser.error(f"--format coords exige --kind {' ou '.join(COORDINATE_KINDS)}")
+    extension = ".npz" if args.format == "coords" else ".npy"
+    output = args.output or f"graphs/{args.kind}_{args.nodes}_seed{args.seed}{extension}"
+
+    options = {"low": args.low, "high": args.high}
+    if args.kind in COORDINATE_KINDS:
+        options = {"scale": args.scale, "clusters": args.clusters, "spread": args.spread}
+    output = write_instance(output, args.kind, args.nodes, args.seed, args.format, args.block_rows, **options)
+    print(f"Gerado: {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+import logging
+import threading
+from concurrent import futures
+import grpc
+
+
+log = logging.getLogger("aco.grpc")
+
+COMPRESSIONS = {
+    "none": grpc.Compression.NoCompression,
+    "gzip": grpc.Compression.Gzip,
+    "deflate": grpc.Compression.Deflate,
+}
+
+
+class ChannelConfig:
+    """
+    Opções comuns de canais e servidores gRPC do mestre e dos workers.
+
+    - `max_message_mb`: limite de envio/recebimento. O padrão do gRPC (4 MB)
+      não comporta a matriz de um grafo com mais de ~700 nós em float64.
+    - `keepalive_ms`: intervalo dos pings HTTP/2 em conexões ociosas, para
+      detectar cedo um par que caiu (0 = desabilitado).
+    - `compression`: none, gzip ou deflate, aplicada a todas as mensagens
+      do canal/servidor; compensa nas matrizes, que dominam o tráfego.
+    - `chunk_rows`: matrizes com mais linhas que isso são enviadas por
+      streaming em blocos de `chunk_rows` linhas (0 = sempre inteiras na
+      própria mensagem).
+    """
+
+    def __init__(self, max_message_mb=256, keepalive_ms=30000, keepalive_timeout_ms=10000, compression="none",
+                 chunk_rows=64):
+        self.max_message_mb = max_message_mb
+        self.keepalive_ms = keepalive_ms
+        self.keepalive_timeout_ms = keepalive_timeout_ms
+        self.compression = compression
+        self.chunk_rows = chunk_rows
+
+    @property
+    def compression_algorithm(self):
+        return COMPRESSIONS[self.compression]
+
+    def streams(self, n):
+        """Se uma matriz n x n vai por streaming em vez de na própria mensagem"""
+        return 0 < self.chunk_rows < n
+
+    def _size_options(self):
+        limit = int(self.max_message_mb * 1024 * 1024)
+        return [("grpc.max_send_message_length", limit), ("grpc.max_receive_message_length", limit)]
+
+    def channel_options(self):
+        options = self._size_options()
+        if self.keepalive_ms > 0:
+            options += [
+                ("grpc.keepalive_time_ms", self.keepalive_ms),
+                ("grpc.keepalive_timeout_ms", self.keepalive_timeout_ms),
+                ("grpc.keepalive_permit_without_calls", 1),
+                ("grpc.http2.max_pings_without_data", 0),
+            ]
+        return options
+
+    def server_options(self):
+        options = self._size_options()
+        if self.keepalive_ms > 0:
+            # Aceita os pings dos clientes com folga (metade do intervalo): um ping que chega um
+            # pouco adiantado não conta como abuso, e o servidor não responde GOAWAY too_many_pings
+            options += [
+                ("grpc.keepalive_permit_without_calls", 1),
+                ("grpc.http2.min_ping_interval_without_data_ms", self.keepalive_ms // 2),
+                ("grpc.http2.max_pings_without_data", 0),
+            ]
+        return options
+
+    def describe(self):
+        keepalive = f"{self.keepalive_ms}ms" if self.keepalive_ms > 0 else "desligado"
+        streaming = f"blocos de {self.chunk_rows} linhas" if self.chunk_rows > 0 else "desligado"
+        return (f"mensagens até {self.max_message_mb} MB | keepalive {keepalive} | compressão {self.compression} | "
+                f"streaming {streaming}")
+
+
+DEFAULT_CONFIG = ChannelConfig()
+
+
+def create_channel(address, config=None):
+    """Canal inseguro com as opções de `config` (padrão: DEFAULT_CONFIG)"""
+    config = config or DEFAULT_CONFIG
+    return grpc.insecure_channel(address, options=config.channel_options(),
+                                 compression=config.compression_algorithm)
+
+
+def make_server(max_workers=10, config=None):
+    """grpc.server com pool de threads e as opções de `config`"""
+    config = config or DEFAULT_CONFIG
+    return grpc.server(futures.ThreadPoolExecutor(max_workers=max_workers),
+                       options=config.server_options(), compression=config.compression_algorithm)
+
+
+def matrix_chunks(rows, chunk_rows, chunk_class):
+    """
+    Gera a matriz `rows` (lista de listas) em mensagens `chunk_class` de até
+    `chunk_rows` linhas: só um bloco achatado existe por vez na memória.
+    """
+    for start in range(0, len(rows), chunk_rows):
+        yield chunk_class(row_start=start, values=[value for row in rows[start:start + chunk_rows] for value in row])
+
+
+def receive_matrix(chunks, n, matrix):
+    """
+    Copia os blocos de um stream de matrix_chunks direto nas linhas de
+    `matrix`, já alocada (lista de n linhas ou array n x n), e a devolve.
+    """
+    received = 0
+    for chunk in chunks:
+        values = chunk.values
+        rows = len(values) // n
+        for offset in range(rows):
+            matrix[chunk.row_start + offset] = values[offset * n:(offset + 1) * n]
+        received += rows
+    if received != n:
+        raise ValueError(f"Stream incompleto: {received} de {n} linhas recebidas")
+    return matrix
+
+
+class ChannelPool:
+    """
+    Um canal por endereço, compartilhado por todos os stubs que falam com
+    ele (inclusive entre sessões do mesmo mestre). Canais de endereços que
+    saíram de uso são fechados por `release`; `close` fecha todos.
+    """
+
+    def __init__(self, config=None):
+        self.config = config or DEFAULT_CONFIG
+        self.channels = {}
+        self.stubs = {}
+        self.lock = threading.Lock()
+
+    def channel(self, address):
+        with self.lock:
+            channel = self.channels.get(address)
+            if channel is None:
+                channel = self.channels[address] = create_channel(address, self.config)
+                log.debug("[Canais] Canal aberto para %s", address)
+            return channel
+
+    def stub(self, address, stub_class):
+        """Stub de `stub_class` sobre o canal compartilhado de `address`"""
+        key = (address, stub_class)
+        with self.lock:
+            stub = self.stubs.get(key)
+        if stub is None:
+            stub = stub_class(self.channel(address))
+            with self.lock:
+                stub = self.stubs.setdefault(key, stub)
+        return stub
+
+    def release(self, address):
+        """Fecha o canal de `address` (ex.: o worker mudou de endereço)"""
+        with self.lock:
+            channel = self.channels.pop(address, None)
+            for key in [key for key in self.stubs if key[0] == address]:
+                del self.stubs[key]
+        if channel is not None:
+            channel.close()
+            log.debug("[Canais] Canal para %s fechado", address)
+
+    def close(self):
+        with self.lock:
+            channels = list(self.channels.values())
+            self.channels.clear()
+            self.stubs.clear()
+        for channel in channels:
+            channel.close()
+
+
+def add_grpc_arguments(parser):
+    """Adiciona as opções de canal/servidor gRPC comuns a mestres e workers"""
+    parser.add_argument('--max-message-mb', type=float, default=DEFAULT_CONFIG.max_message_mb,
+                        help=f'Tamanho máximo das mensagens gRPC em MB (padrão: {DEFAULT_CONFIG.max_message_mb})')
+    parser.add_argument('--keepalive-ms', type=int, default=DEFAULT_CONFIG.keepalive_ms,
+                        help=f'Intervalo de keepalive das conexões em ms (padrão: {DEFAULT_CONFIG.keepalive_ms}; '
+                             f'0 = desabilitado)')
+    parser.add_argument('--compression', type=str, default=DEFAULT_CONFIG.compression, choices=sorted(COMPRESSIONS),
+                        help=f'Compressão das mensagens gRPC (padrão: {DEFAULT_CONFIG.compression})')
+    parser.add_argument('--chunk-rows', type=int, default=DEFAULT_CONFIG.chunk_rows,
+                        help=f'Matrizes com mais linhas que isso vão por streaming, em blocos desse tamanho '
+                             f'(padrão: {DEFAULT_CONFIG.chunk_rows}; 0 = sempre na própria mensagem)')
+
+
+def grpc_config(args):
+    """Constrói o ChannelConfig a partir dos argumentos de add_grpc_arguments"""
+    return ChannelConfig(max_message_mb=args.max_message_mb, keepalive_ms=args.keepalive_ms,
+                         compression=args.compression, chunk_rows=args.chunk_rows)
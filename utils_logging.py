@@ -0,0 +1,72 @@
+import time
+import logging
+import threading
+
+
+LOG_FORMAT = "%(asctime)s %(levelname)-7s %(message)s"
+DATE_FORMAT = "%H:%M:%S"
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Limita quantas vezes a mesma mensagem pode ser emitida por segundo.
+
+    A chave é o template da mensagem (antes da formatação), então linhas
+    do tipo "Worker %s enviou solução" contam juntas independente dos
+    argumentos. Mensagens suprimidas são contadas e informadas na próxima
+    emissão daquele template. ERROR e CRITICAL nunca são suprimidos.
+    """
+
+    def __init__(self, max_per_second=20):
+        super().__init__()
+        self.max_per_second = max_per_second
+        self.windows = {}
+        self.lock = threading.Lock()
+
+    def filter(self, record):
+        if self.max_per_second <= 0 or record.levelno >= logging.ERROR:
+            return True
+
+        now = time.monotonic()
+        key = (record.name, record.msg)
+
+        with self.lock:
+            window = self.windows.get(key)
+            if window is None or now - window[0] >= 1.0:
+                suppressed = window[2] if window else 0
+                self.windows[key] = [now, 1, 0]
+                if suppressed:
+                    record.msg = f"{record.msg} (+{suppressed} mensagens semelhantes suprimidas)"
+                return True
+
+            if window[1] < self.max_per_second:
+                window[1] += 1
+                return True
+
+            window[2] += 1
+            return False
+
+
+def setup_logging(level="INFO", max_per_second=20):
+    """
+    Configura o logging do processo (console, com nível e limite de taxa).
+
+    Chamado apenas pelos pontos de entrada (main/serve); módulos usam
+    logging.getLogger(...) e nunca configuram handlers por conta própria.
+    """
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter(LOG_FORMAT, DATE_FORMAT))
+    handler.addFilter(RateLimitFilter(max_per_second))
+
+    root = logging.getLogger()
+    root.handlers[:] = [handler]
+    root.setLevel(level.upper() if isinstance(level, str) else level)
+
+
+def add_logging_arguments(parser):
+    """Adiciona as opções de logging comuns a todos os executáveis"""
+    parser.add_argument('--log-level', type=str, default='INFO',
+                        choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'],
+                        help='Nível de log (padrão: INFO; DEBUG mostra cada formiga/RPC)')
+    parser.add_argument('--log-rate', type=int, default=20,
+                        help='Máximo de mensagens iguais por segundo (0 = sem limite, padrão: 20)')
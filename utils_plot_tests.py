@@ -1,5 +1,7 @@
 import matplotlib.pyplot as plt
 import os
+import json
+import argparse
 import numpy as np
 
 
@@ -14,28 +16,60 @@ TEST_DATA = {
 }
 
 OUTPUT_DIR = "./results"
+RESULTS_FILE = os.path.join(OUTPUT_DIR, "benchmark.json")
+
+
+def _mean(values):
+    values = [v for v in values if v is not None]
+    return sum(values) / len(values) if values else None
+
+def load_benchmark_results(file_path, aco_mode=None):
+    """
+    Converte o arquivo gerado por utils_benchmark.py no formato de TEST_DATA.
+
+    Para cada tamanho de grafo usa a média das execuções: as de modo "bf"
+    viram as colunas de Brute Force e as demais (ou apenas `aco_mode`)
+    viram as colunas do ACO.
+    """
+    with open(file_path, 'r') as f:
+        records = json.load(f)
+
+    nodes = sorted({r["n"] for r in records})
+    data = {"nodes": nodes, "bf_times": [], "aco_times": [], "bf_costs": [], "aco_costs": []}
+
+    for n in nodes:
+        bf_rows = [r for r in records if r["n"] == n and r["mode"] == "bf"]
+        aco_rows = [r for r in records if r["n"] == n and r["mode"] != "bf"
+                    and (aco_mode is None or r["mode"] == aco_mode)]
+
+        data["bf_times"].append(_mean([r["wall_time"] for r in bf_rows]))
+        data["bf_costs"].append(_mean([r["best_cost"] for r in bf_rows]))
+        data["aco_times"].append(_mean([r["wall_time"] for r in aco_rows]))
+        data["aco_costs"].append(_mean([r["best_cost"] for r in aco_rows]))
+
+    return data
 
 def ensure_dir():
     if not os.path.exists(OUTPUT_DIR):
         os.makedirs(OUTPUT_DIR)
         print(f"Diretório '{OUTPUT_DIR}' criado.")
 
-def plot_results_table():
-    nodes = TEST_DATA["nodes"]
+def plot_results_table(data=TEST_DATA):
+    nodes = data["nodes"]
     
     cell_text = []
     for i, n in enumerate(nodes):
         # Formatação do BF
-        bf_t = f"{TEST_DATA['bf_times'][i]:.4f}s" if TEST_DATA['bf_times'][i] is not None else "TIMEOUT"
-        bf_c = f"{TEST_DATA['bf_costs'][i]:.1f}" if TEST_DATA['bf_costs'][i] is not None else "-"
+        bf_t = f"{data['bf_times'][i]:.4f}s" if data['bf_times'][i] is not None else "TIMEOUT"
+        bf_c = f"{data['bf_costs'][i]:.1f}" if data['bf_costs'][i] is not None else "-"
         
         # Formatação do ACO
-        aco_t = f"{TEST_DATA['aco_times'][i]:.4f}s"
-        aco_c = f"{TEST_DATA['aco_costs'][i]:.1f}"
+        aco_t = f"{data['aco_times'][i]:.4f}s" if data['aco_times'][i] is not None else "-"
+        aco_c = f"{data['aco_costs'][i]:.1f}" if data['aco_costs'][i] is not None else "-"
         
         # Comparação de Custo (Gap)
-        if TEST_DATA['bf_costs'][i] and TEST_DATA['aco_costs'][i]:
-            gap = ((TEST_DATA['aco_costs'][i] - TEST_DATA['bf_costs'][i]) / TEST_DATA['bf_costs'][i]) * 100
+        if data['bf_costs'][i] and data['aco_costs'][i]:
+            gap = ((data['aco_costs'][i] - data['bf_costs'][i]) / data['bf_costs'][i]) * 100
             gap_str = f"{gap:.1f}%"
         else:
             gap_str = "N/A"
@@ -69,11 +103,11 @@ def plot_results_table():
     print(f"Tabela salva em: {filepath}")
     plt.close()
 
-def plot_execution_time():
+def plot_execution_time(data=TEST_DATA):
     """Gera gráfico comparativo de tempo"""
-    nodes = TEST_DATA["nodes"]
-    bf_times = TEST_DATA["bf_times"]
-    aco_times = TEST_DATA["aco_times"]
+    nodes = data["nodes"]
+    bf_times = data["bf_times"]
+    aco_times = data["aco_times"]
     
     # Filtra dados None para o gráfico não quebrar
     valid_bf_indices = [i for i, v in enumerate(bf_times) if v is not None]
@@ -86,7 +120,9 @@ def plot_execution_time():
     plt.plot(valid_bf_nodes, valid_bf_times, marker='o', color='red', label='Brute Force (Exato)', linestyle='--', linewidth=2)
     
     # Plot ACO
-    plt.plot(nodes, aco_times, marker='s', color='green', label='ACO Distribuído (Heurística)', linewidth=2)
+    valid_aco_indices = [i for i, v in enumerate(aco_times) if v is not None]
+    plt.plot([nodes[i] for i in valid_aco_indices], [aco_times[i] for i in valid_aco_indices],
+             marker='s', color='green', label='ACO Distribuído (Heurística)', linewidth=2)
     
     plt.xlabel('Tamanho do Grafo (Número de Cidades)', fontsize=12)
     plt.ylabel('Tempo de Execução (segundos)', fontsize=12)
@@ -106,8 +142,28 @@ def plot_execution_time():
     print(f"Gráfico salvo em: {filepath}")
     plt.close()
 
-if __name__ == "__main__":
+def plot_all(data=TEST_DATA):
     ensure_dir()
-    plot_results_table()
-    plot_execution_time()
-    print("\nProcesso concluído! Verifique a pasta ./results/")
\ No newline at end of file
+    plot_results_table(data)
+    plot_execution_time(data)
+    print("\nProcesso concluído! Verifique a pasta ./results/")
+
+def main():
+    parser = argparse.ArgumentParser(description='Gera tabela e gráfico a partir dos resultados do benchmark')
+    parser.add_argument('--results', type=str, default=RESULTS_FILE,
+                        help=f'Arquivo gerado por utils_benchmark.py (padrão: {RESULTS_FILE})')
+    parser.add_argument('--aco-mode', type=str, default=None,
+                        help='Usa apenas as execuções deste modo do ACO (padrão: todas)')
+    args = parser.parse_args()
+
+    if os.path.exists(args.results):
+        print(f"Usando resultados de: {args.results}")
+        data = load_benchmark_results(args.results, args.aco_mode)
+    else:
+        print(f"'{args.results}' não encontrado, usando TEST_DATA")
+        data = TEST_DATA
+
+    plot_all(data)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
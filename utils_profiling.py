@@ -0,0 +1,56 @@
+import os
+import logging
+from contextlib import contextmanager
+
+
+log = logging.getLogger("profiling")
+
+
+class IterationProfiler:
+    """
+    Perfil opcional (cProfile) por iteração.
+
+    Quando `output_dir` é None o profiler fica desligado e `iteration()`
+    não adiciona custo. Caso contrário cada iteração gera um arquivo
+    `<prefixo>_iter<N>.prof`, que pode ser aberto com pstats/snakeviz.
+    Apenas a thread que executa o bloco é medida.
+    """
+
+    def __init__(self, output_dir=None, prefix="profile", top=0):
+        self.output_dir = output_dir
+        self.prefix = prefix
+        self.top = top
+        if output_dir and not os.path.exists(output_dir):
+            os.makedirs(output_dir)
+
+    @property
+    def enabled(self):
+        return self.output_dir is not None
+
+    @contextmanager
+    def iteration(self, number):
+        if not self.enabled:
+            yield
+            return
+
+        # Importados só com o profiler ligado (inicialização mais rápida do worker)
+        import cProfile
+        import pstats
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            file_path = os.path.join(self.output_dir, f"{self.prefix}_iter{number:04d}.prof")
+            profiler.dump_stats(file_path)
+            log.debug("[Profile] Iteração %d gravada em %s", number, file_path)
+            if self.top:
+                pstats.Stats(profiler).sort_stats("cumulative").print_stats(self.top)
+
+
+def add_profiling_arguments(parser):
+    """Adiciona a opção --profile comum ao mestre e ao worker"""
+    parser.add_argument('--profile', type=str, default=None, metavar='DIR',
+                        help='Grava um perfil cProfile por iteração em DIR (padrão: desabilitado)')
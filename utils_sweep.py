@@ -0,0 +1,154 @@
+import os
+import csv
+import time
+import argparse
+import itertools
+import threading
+from concurrent import futures
+import aco_distributed_pb2_grpc
+from aco_master import ACOMaster
+from aco_worker import ACOWorker
+from aco_sessions import SessionRouter
+from aco_strategies import STRATEGIES
+from aco_engine import ENGINES
+from utils_benchmark import _free_worker_ids, WORKER_PORT_BASE
+from utils_gen_graphs import load_graph_or_exit
+from utils_logging import setup_logging, add_logging_arguments
+from utils_grpc import make_server
+
+
+RESULTS_FILE = os.path.join("results", "sweep.csv")
+
+COLUMNS = ["session", "strategy", "alpha", "beta", "rho", "ants", "repeat",
+           "best_cost", "iterations", "wall_time"]
+
+
+def build_configs(args):
+    """Produto cartesiano das opções da varredura, cada uma com seu session_id"""
+    grid = itertools.product(args.strategies, args.alpha, args.beta, args.rho, args.ants, range(args.repeats))
+    configs = []
+    for index, (strategy, alpha, beta, rho, ants, repeat) in enumerate(grid, start=1):
+        configs.append({
+            "session": f"s{index:03d}",
+            "strategy": strategy,
+            "alpha": alpha,
+            "beta": beta,
+            "rho": rho,
+            "ants": ants,
+            "repeat": repeat,
+        })
+    return configs
+
+
+def run_session(router, graph, config, iterations, workers):
+    """Executa uma configuração como sessão do roteador e devolve sua linha na tabela"""
+    master = ACOMaster(graph, total_iterations=iterations, num_ants=config["ants"],
+                       alpha=config["alpha"], beta=config["beta"], rho=config["rho"],
+                       strategy=config["strategy"], session_id=config["session"],
+                       channel_pool=router.channel_pool)
+    router.add_session(master)
+    try:
+        master.run_coordination(workers)
+    finally:
+        master.event_log.close()
+
+    print(f"[Sweep] {config['session']} concluída | {config['strategy']} alpha={config['alpha']} "
+          f"beta={config['beta']} rho={config['rho']} formigas={config['ants']} | custo={master.best_cost:.2f} | "
+          f"{master.total_duration:.2f}s", flush=True)
+
+    return dict(config, best_cost=master.best_cost, iterations=master.current_iteration,
+                wall_time=round(master.total_duration, 3))
+
+
+def run_sweep(args, graph):
+    configs = build_configs(args)
+    router = SessionRouter()
+
+    server = make_server(max(10, 2 * args.workers))
+    aco_distributed_pb2_grpc.add_ACOMasterServiceServicer_to_server(router, server)
+    server.add_insecure_port(f'[::]:{args.port}')
+    server.start()
+    print(f"[Sweep] {len(configs)} configurações, até {args.max_sessions} sessões simultâneas, "
+          f"{args.workers} workers | porta {args.port}", flush=True)
+
+    local_workers = []
+    for worker_id in _free_worker_ids(args.local_workers):
+        worker = ACOWorker(worker_id, f'localhost:{args.port}', WORKER_PORT_BASE + worker_id, engine=args.engine)
+        thread = threading.Thread(target=worker.run, daemon=True)
+        thread.start()
+        local_workers.append((worker, thread))
+
+    try:
+        with futures.ThreadPoolExecutor(max_workers=args.max_sessions) as pool:
+            jobs = [pool.submit(run_session, router, graph, config, args.iterations, args.workers)
+                    for config in configs]
+            rows = [job.result() for job in jobs]
+    finally:
+        router.close()
+        for worker, thread in local_workers:
+            thread.join(timeout=30)
+            worker.close()
+        if not local_workers:
+            # Dá tempo para os workers externos receberem finished antes de derrubar o servidor
+            time.sleep(3)
+        server.stop(grace=1)
+        router.channel_pool.close()
+
+    return rows
+
+
+def print_table(rows):
+    ordered = sorted(rows, key=lambda row: row["best_cost"])
+    widths = {column: max(len(column), *(len(str(row[column])) for row in ordered)) for column in COLUMNS}
+    lines = ["  ".join(column.ljust(widths[column]) for column in COLUMNS)]
+    lines.append("  ".join("-" * widths[column] for column in COLUMNS))
+    for row in ordered:
+        lines.append("  ".join(str(row[column]).ljust(widths[column]) for column in COLUMNS))
+    print("\n".join(lines))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Varredura de hiperparâmetros do ACO: várias configurações como sessões simultâneas')
+    parser.add_argument('--graph', type=str, default='graphs/10_nodes.json', help='Caminho do arquivo JSON do grafo')
+    parser.add_argument('--port', type=int, default=50051, help='Porta do mestre (padrão: 50051)')
+    parser.add_argument('--workers', type=int, default=2,
+                        help='Número de workers que atendem todas as sessões (padrão: 2)')
+    parser.add_argument('--local-workers', type=int, default=0,
+                        help='Sobe N workers como threads neste processo (padrão: 0 = workers externos)')
+    parser.add_argument('--engine', type=str, default='python', choices=sorted(ENGINES),
+                        help='Motor dos workers locais (padrão: python)')
+    parser.add_argument('--max-sessions', type=int, default=4, help='Sessões executadas ao mesmo tempo (padrão: 4)')
+    parser.add_argument('--iterations', type=int, default=10, help='Iterações por configuração (padrão: 10)')
+    parser.add_argument('--strategies', nargs='+', default=['as'], choices=sorted(STRATEGIES),
+                        help='Estratégias de atualização (padrão: as)')
+    parser.add_argument('--alpha', nargs='+', type=float, default=[1.0], help='Valores de alpha (padrão: 1.0)')
+    parser.add_argument('--beta', nargs='+', type=float, default=[3.0], help='Valores de beta (padrão: 3.0)')
+    parser.add_argument('--rho', nargs='+', type=float, default=[0.5], help='Valores de rho (padrão: 0.5)')
+    parser.add_argument('--ants', nargs='+', type=int, default=[5], help='Formigas por worker (padrão: 5)')
+    parser.add_argument('--repeats', type=int, default=1, help='Repetições de cada configuração (padrão: 1)')
+    parser.add_argument('--output', type=str, default=RESULTS_FILE, help=f'Tabela CSV de resultados (padrão: {RESULTS_FILE})')
+    add_logging_arguments(parser)
+    parser.set_defaults(log_level='WARNING')
+    args = parser.parse_args()
+    setup_logging(args.log_level, args.log_rate)
+
+    if args.local_workers and args.local_workers != args.workers:
+        parser.error('--local-workers deve ser igual a --workers (todas as sessões esperam os mesmos workers)')
+
+    rows = run_sweep(args, load_graph_or_exit(args.graph))
+
+    directory = os.path.dirname(args.output)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory)
+    with open(args.output, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=COLUMNS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+    print_table(rows)
+    print(f"Resultados salvos em: {args.output} ({len(rows)} configurações)")
+
+
+if __name__ == '__main__':
+    main()